@@ -1,13 +1,20 @@
 import os
-import pickle
 import random
 import time
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
 import json
+import tempfile
+import uuid
 from datetime import datetime
+import detector
+import batch_score
+from chatbot import get_hf_token
+from llm_client import LLMCascade, CASCADE_BAND, CASCADE_MAX_CONCURRENCY
+from audit_log import AuditLog, AUDIT_LOG_PATH
+from online_learning import OnlineLearner, FEEDBACK_LOG_PATH
+from model_registry import HotReloader, REGISTRY_DIR
 
 # -----------------------------
 # Page Config
@@ -22,23 +29,59 @@ st.set_page_config(
 # -----------------------------
 # Paths & Resources
 # -----------------------------
-VECTOR_PATH = "vectorizer.pkl"
-MODEL_PATH = "fake_news_model.pkl"
+VECTOR_PATH = detector.VECTOR_PATH
+MODEL_PATH = detector.MODEL_PATH
+SCORER_DIR = detector.SCORER_DIR
+MODEL_REGISTRY = os.getenv("MODEL_REGISTRY", REGISTRY_DIR)
+MODEL_POLL_INTERVAL = float(os.getenv("MODEL_POLL_INTERVAL", "2"))
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+AUDIT_LOG = os.getenv("AUDIT_LOG", AUDIT_LOG_PATH)  # Empty string disables the audit trail
+AUDIT_LOG_STORE_TEXT = os.getenv("AUDIT_LOG_STORE_TEXT", "0") == "1"  # Keep raw texts (needed for replay)
+ONLINE_MODEL = os.getenv("ONLINE_MODEL", "")  # Shadow model directory (e.g. models/online); off unless set, it needs sklearn
+
+def build_serving_model(scorer, path):
+    explainer = detector.Explainer(scorer, scorer)
+    # Cache lives with the artifacts it was filled from
+    prediction_cache = detector.PredictionCache(
+        maxsize=PREDICTION_CACHE_SIZE,
+        model_version=scorer.model_version,
+    )
+    return scorer, explainer, prediction_cache, path
 
 @st.cache_resource
 def load_model():
-    with open(VECTOR_PATH, "rb") as f:
-        vectorizer = pickle.load(f)
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-    return vectorizer, model
+    # Numpy-only scorer for the registry's CURRENT version (the repo-root artifacts until
+    # one is published); newly published versions are swapped in without a restart
+    return HotReloader(MODEL_REGISTRY, build_serving_model, MODEL_POLL_INTERVAL, SCORER_DIR, VECTOR_PATH, MODEL_PATH)
 
-vectorizer, model = load_model()
+model_reloader = load_model()
+# One model version for the whole script run, even if a newer one is swapped in meanwhile
+scorer, explainer, prediction_cache, scorer_path = model_reloader.get()
+
+@st.cache_resource
+def load_audit_log():
+    # One background writer shared by every session
+    return AuditLog(AUDIT_LOG, store_text=AUDIT_LOG_STORE_TEXT) if AUDIT_LOG else None
+
+audit_log = load_audit_log()
+
+@st.cache_resource
+def load_online_learner():
+    # User corrections update a hashed-feature shadow model in the background;
+    # `python online_learning.py promote` publishes them to the registry for serving
+    return OnlineLearner(ONLINE_MODEL, FEEDBACK_LOG_PATH) if ONLINE_MODEL else None
+
+online_learner = load_online_learner()
+
+@st.cache_resource(max_entries=4)
+def load_parallel_scorer(workers, scorer_dir):
+    # Keyed on the artifact directory, so a model swap starts workers on the new version
+    return batch_score.ParallelScorer(scorer_dir, VECTOR_PATH, MODEL_PATH, workers)
 
 # -----------------------------
 # Variables
 # -----------------------------
-CLASS_LABELS = {0: "FAKE", 1: "REAL"}
+CLASS_LABELS = detector.CLASS_LABELS
 COLOR_MAP = {"FAKE": "#ff4b4b", "REAL": "#00d26a"}
 
 # Headline pools
@@ -95,6 +138,8 @@ HINTS = [
     "⚠️ Heuristic detects clickbait!"
 ]
 
+BATCH_PREVIEW_ROWS = 200
+
 LEADERBOARD_FILE = "leaderboard.json"
 ACHIEVEMENTS_FILE = "achievements.json"
 
@@ -649,57 +694,32 @@ st.markdown("""
 # -----------------------------
 # Functions
 # -----------------------------
+def run_analysis(text):
+    start = time.perf_counter()
+    result = prediction_cache.get_or_compute(
+        text, lambda t: detector.analyze(t, scorer, scorer, explainer)
+    )
+    if audit_log is not None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        audit_log.record(text, result.label, result.prob, latency_ms, scorer.model_version)
+    return result
+
+def record_correction(text, label):
+    if online_learner is not None:
+        if "feedback_session" not in st.session_state:
+            st.session_state.feedback_session = uuid.uuid4().hex
+        online_learner.submit(text, label, "correction", session=st.session_state.feedback_session,
+                              player=st.session_state.get("player_name"))
+
 def analyze_text(text):
-    X = vectorizer.transform([text])
-    prob = model.predict_proba(X)[0][1]
-    pred = 1 if prob>=0.5 else 0
-    return CLASS_LABELS[pred], prob
-
-def explain_fake(text, top_n=5):
-    try:
-        X = vectorizer.transform([text])
-        coef = model.coef_[0]
-        feature_names = vectorizer.get_feature_names_out()
-        indices = X.nonzero()[1]
-        word_scores = {feature_names[i]: coef[i]*X[0,i] for i in indices}
-        top_words = sorted(word_scores.items(), key=lambda x: abs(x[1]), reverse=True)[:top_n]
-        return [w for w,s in top_words if s<0]
-    except:
-        return []
-
-def highlight_suspicious(text):
-    ml_words = explain_fake(text)
-    def repl(match):
-        word = match.group(0)
-        if word.lower() in [w.lower() for w in ml_words]:
-            return f"<span class='suspicious' title='ML signal: contributes to FAKE'>{word}</span>"
-        return word
-    return re.sub(r'\b\w+\b', repl, text, flags=re.IGNORECASE)
-
-def explain_reasoning(text, top_n=5):
-    reasons = []
-    try:
-        X = vectorizer.transform([text])
-        if hasattr(model,"coef_"):
-            coef = model.coef_[0]
-            feature_names = vectorizer.get_feature_names_out()
-            indices = X.nonzero()[1]
-            word_scores = {feature_names[i]: coef[i]*X[0,i] for i in indices}
-            top_words = sorted(word_scores.items(), key=lambda x: abs(x[1]), reverse=True)[:top_n]
-            for word, score in top_words:
-                if score < 0:
-                    reasons.append(f"🔴 ML indicates '{word}' contributes to FAKE")
-                else:
-                    reasons.append(f"🟢 ML indicates '{word}' contributes to REAL")
-    except:
-        pass
-    if "!!!" in text or text.isupper():
-        reasons.append("⚠️ Heuristic: Excessive punctuation or all-caps detected")
-    clickbait_words = ["shocking","unbelievable","you won't believe"]
-    for w in clickbait_words:
-        if w.lower() in text.lower():
-            reasons.append(f"🎯 Heuristic: Clickbait word detected '{w}'")
-    return reasons
+    result = run_analysis(text)
+    return result.label, result.prob
+
+def highlight_suspicious(result):
+    return detector.highlight_suspicious(result)
+
+def explain_reasoning(result):
+    return detector.explain_reasoning(result)
 
 def load_leaderboard():
     if os.path.exists(LEADERBOARD_FILE):
@@ -907,6 +927,10 @@ if "accuracy_started" not in st.session_state:
 if "accuracy_player" not in st.session_state:
     st.session_state.accuracy_player = "Player"
 
+# CSV/Batch: scored output of the last upload, see tab2
+if "batch_result" not in st.session_state:
+    st.session_state.batch_result = None
+
 # Auto Booth
 if "auto_index" not in st.session_state:
     st.session_state.auto_index = 0
@@ -949,6 +973,30 @@ with st.sidebar:
     else:
         st.warning("No records yet!")
     
+    st.markdown("---")
+    st.markdown("### ⚡ Prediction Cache")
+    cache_stats = prediction_cache.stats()
+    st.caption(
+        f"**Hit rate:** {cache_stats['hit_rate']*100:.1f}% • "
+        f"**Hits:** {cache_stats['hits']} • **Misses:** {cache_stats['misses']} • "
+        f"**Evictions:** {cache_stats['evictions']}\n\n"
+        f"**Entries:** {cache_stats['size']}/{cache_stats['maxsize']} • "
+        f"**Model:** `{cache_stats['model_version']}`"
+    )
+    reload_stats = model_reloader.stats()
+    st.caption(f"**Serving:** `{reload_stats['version']}` • {reload_stats['reloads']} hot reloads"
+               + (" • loading new version…" if reload_stats["loading"] else ""))
+    if audit_log is not None:
+        log_stats = audit_log.stats()
+        st.caption(f"**Audit log:** {log_stats['written']} written • {log_stats['pending']} pending"
+                   + (f" • {log_stats['dropped']} dropped" if log_stats["dropped"] else ""))
+    if online_learner is not None:
+        online_stats = online_learner.stats()
+        st.caption(
+            f"**Shadow model:** v{online_stats['version']} • {online_stats['applied']} corrections learned • "
+            f"{online_stats['pending']} pending • {online_stats['duplicates']} repeats ignored"
+        )
+    
     st.markdown("---")
     st.markdown("### ℹ️ About")
     st.caption("This AI-powered tool uses machine learning to detect fake news by analyzing linguistic patterns, clickbait indicators, and content authenticity markers.")
@@ -979,7 +1027,8 @@ with tab1:
         st.markdown("</div>", unsafe_allow_html=True)
     
     if analyze_btn and news_text.strip():
-        pred, prob = analyze_text(news_text)
+        result = run_analysis(news_text)
+        pred, prob = result.label, result.prob
         
         # Store the analyzed text to manage chat history
         if news_text != st.session_state.last_analyzed_text:
@@ -1003,15 +1052,24 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
+        # Corrections for the online shadow model (callbacks run before the rerun the click triggers)
+        if online_learner is not None:
+            other = "REAL" if pred == "FAKE" else "FAKE"
+            online_labels, online_probs = online_learner.predict([news_text])
+            st.caption(f"Shadow model v{online_learner.version} (learns from corrections, not used for the verdict): "
+                       f"**{online_labels[0]}** ({max(online_probs[0], 1 - online_probs[0])*100:.1f}%)")
+            st.button(f"✏️ Wrong – it's {other}", key="fb_correct", use_container_width=True,
+                      on_click=record_correction, args=(news_text, other))
+        
         # Highlighted text (for fake news)
         if pred == "FAKE":
             st.markdown("### 🔍 Suspicious Words Detected")
             st.markdown("<div class='main-card'>", unsafe_allow_html=True)
-            st.markdown(highlight_suspicious(news_text), unsafe_allow_html=True)
+            st.markdown(highlight_suspicious(result), unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Standard reasoning box (still there)
-        reasons = explain_reasoning(news_text)
+        reasons = explain_reasoning(result)
         if reasons:
             st.markdown("### 🧠 AI Analysis Reasoning")
             st.markdown("<div class='reasoning-box'>", unsafe_allow_html=True)
@@ -1034,7 +1092,7 @@ with tab1:
             if st.button("❓ Why is this fake/real?", key="q1"):
                 response = f"The headline is **{pred}** because:"
                 if pred == "FAKE":
-                    suspicious = explain_fake(news_text)
+                    suspicious = result.suspicious_words()
                     if suspicious:
                         response += " The model detected suspicious words: " + ", ".join([f"`{w}`" for w in suspicious])
                     else:
@@ -1047,7 +1105,7 @@ with tab1:
         
         with col_q2:
             if st.button("🔍 Which words are suspicious?", key="q2"):
-                suspicious = explain_fake(news_text)
+                suspicious = result.suspicious_words()
                 if suspicious:
                     response = "The words that most contribute to the FAKE classification are: " + ", ".join([f"`{w}`" for w in suspicious])
                 else:
@@ -1088,52 +1146,107 @@ with tab1:
             st.rerun()
 
 # -----------------------------
-# CSV/Batch (unchanged)
+# CSV/Batch (streaming)
 # -----------------------------
 with tab2:
     st.markdown("<div class='main-card'>", unsafe_allow_html=True)
     st.markdown("### 📊 Batch Analysis")
     st.info("Upload a CSV file with a 'text' column containing news articles to analyze multiple items at once.")
     
+    batch_workers = st.number_input("⚙️ Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1,
+                                    help="Use more than one to shard large files across CPU cores.")
+    cascade_on = st.checkbox("🤖 LLM second opinion for borderline rows",
+                             help="Only rows whose probability falls inside the band are sent to the AI assistant.")
+    if cascade_on:
+        cascade_band = st.slider("Uncertainty band", 0.0, 1.0, CASCADE_BAND, step=0.05)
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
-        if 'text' not in df.columns:
-            st.error("❌ CSV must have a 'text' column!")
-        else:
+        # Streamlit reruns the script on every widget click (and on Auto Booth ticks);
+        # the upload is only scored again when the file, settings or model change
+        batch_key = (uploaded_file.file_id, batch_workers, tuple(cascade_band) if cascade_on else None,
+                     scorer.model_version)
+        batch = st.session_state.batch_result
+        if (batch is None or batch["key"] != batch_key or not batch["complete"]
+                or not os.path.exists(batch["path"])):
+            # Results stream to a temp file so memory stays flat for any upload size
+            if batch is not None and os.path.exists(batch["path"]):
+                os.remove(batch["path"])
+            with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+                batch = {"key": batch_key, "path": tmp.name, "stats": {"rows": 0, "fake": 0, "real": 0},
+                         "preview": None, "cascade": None, "error": None, "complete": False}
+            st.session_state.batch_result = batch
+            
             with st.spinner("Analyzing articles..."):
-                results = []
                 progress_bar = st.progress(0)
-                for idx, row in df.iterrows():
-                    pred, prob = analyze_text(row['text'])
-                    results.append({
-                        "text": row['text'][:100] + "..." if len(row['text']) > 100 else row['text'],
-                        "prediction": pred,
-                        "confidence": f"{prob*100:.1f}%"
-                    })
-                    progress_bar.progress((idx + 1) / len(df))
-                
-                df_result = pd.DataFrame(results)
-                
-                col1, col2, col3 = st.columns(3)
-                fake_count = len(df_result[df_result['prediction'] == 'FAKE'])
-                real_count = len(df_result[df_result['prediction'] == 'REAL'])
-                
-                with col1:
-                    st.metric("Total Articles", len(df_result))
-                with col2:
-                    st.metric("Fake News", fake_count, delta=None, delta_color="inverse")
-                with col3:
-                    st.metric("Real News", real_count, delta=None)
-                
-                st.markdown("### 📋 Results")
-                st.dataframe(df_result, use_container_width=True, height=400)
-                
-                csv_data = df_result.to_csv(index=False).encode('utf-8')
+                status = st.empty()
+                preview = st.empty()
+                preview_rows = []
+                if batch_workers > 1:
+                    score_fn = load_parallel_scorer(batch_workers, scorer_path).score
+                    chunk_size = max(detector.BATCH_CHUNK_SIZE, batch_score.SHARD_SIZE * batch_workers)
+                else:
+                    score_fn = None
+                    chunk_size = detector.BATCH_CHUNK_SIZE
+                cascade = None
+                if cascade_on:
+                    cascade = LLMCascade(score_fn or (lambda texts: detector.score_texts(texts, scorer, scorer)),
+                                         cascade_band, CASCADE_MAX_CONCURRENCY, token=get_hf_token())
+                    score_fn = cascade.score
+                try:
+                    for stats in detector.stream_score_csv(uploaded_file, batch["path"], scorer, scorer,
+                                                           chunk_size=chunk_size, score_fn=score_fn):
+                        progress_bar.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0))
+                        status.caption(f"Scored {stats['rows']:,} rows • {stats['rows_per_sec']:,.0f} rows/sec")
+                        batch["stats"] = {k: stats[k] for k in ("rows", "fake", "real")}
+                        if sum(len(c) for c in preview_rows) < BATCH_PREVIEW_ROWS:
+                            preview_rows.append(stats["chunk"])
+                            preview.dataframe(pd.concat(preview_rows).head(BATCH_PREVIEW_ROWS), use_container_width=True, height=400)
+                except ValueError as e:
+                    batch["error"] = str(e)
+                finally:
+                    if cascade is not None:
+                        cascade.close()
+                        batch["cascade"] = cascade.stats()
+                if preview_rows:
+                    batch["preview"] = pd.concat(preview_rows).head(BATCH_PREVIEW_ROWS)
+                # A run interrupted by a rerun stays incomplete and is scored again
+                batch["complete"] = True
+                preview.empty()
+                progress_bar.progress(1.0)
+        
+        if batch["error"]:
+            st.error(f"❌ {batch['error']}")
+        else:
+            if batch["preview"] is not None:
+                st.dataframe(batch["preview"], use_container_width=True, height=400)
+            stats = batch["stats"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Articles", stats["rows"])
+            with col2:
+                st.metric("Fake News", stats["fake"], delta=None, delta_color="inverse")
+            with col3:
+                st.metric("Real News", stats["real"], delta=None)
+            
+            if batch["cascade"] is not None:
+                c = batch["cascade"]
+                st.caption(f"🤖 **LLM tier:** {c['llm']['items']:,} of {c['linear']['items']:,} rows "
+                           f"({c['llm']['share']:.1%}) • {c['llm']['answered']:,} answered • "
+                           f"{c['llm']['overridden']:,} verdicts changed • p50 {c['llm']['latency_p50_ms']:,.0f} ms")
+                if c["llm"]["skipped"]:
+                    st.warning(f"⚠️ The AI assistant failed repeatedly; {c['llm']['skipped']:,} borderline rows "
+                               "kept the model's verdict without a second opinion.")
+                st.caption("The **verdict_source** column shows whether each prediction came from the model or "
+                           "the AI assistant; confidence is always the model's probability.")
+            
+            if stats["rows"] > BATCH_PREVIEW_ROWS:
+                st.caption(f"Showing the first {BATCH_PREVIEW_ROWS} results – download the file for all {stats['rows']:,}.")
+            
+            with open(batch["path"], "rb") as f:
                 st.download_button(
                     "📥 Download Results",
-                    csv_data,
+                    f,
                     "fake_news_results.csv",
                     "text/csv",
                     use_container_width=True
@@ -1167,7 +1280,8 @@ with tab3:
     
     if st.session_state.auto_running:
         headline = ALL_HEADLINES[st.session_state.auto_index % len(ALL_HEADLINES)]
-        pred, prob = analyze_text(headline)
+        result = run_analysis(headline)
+        pred, prob = result.label, result.prob
         
         result_class = "fake" if pred == "FAKE" else "real"
         
@@ -1187,9 +1301,9 @@ with tab3:
         """, unsafe_allow_html=True)
         
         if pred == "FAKE":
-            st.markdown(highlight_suspicious(headline), unsafe_allow_html=True)
+            st.markdown(highlight_suspicious(result), unsafe_allow_html=True)
         
-        reasons = explain_reasoning(headline)
+        reasons = explain_reasoning(result)
         if reasons:
             st.markdown("**🧠 Analysis:**")
             for r in reasons:
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Buffered audit log of scoring events.
+
+AuditLog.record() only appends to an in-memory buffer; a background
+thread writes JSONL when the buffer reaches flush_events or every
+flush_interval seconds, rotates the file past max_bytes and gzips the
+rotated file. At most max_pending events wait for the writer; beyond
+that, and when a write fails, events are dropped and counted instead of
+growing memory or raising into the request path.
+
+Only a hash of each text is logged unless store_text=True. The replay
+tool re-scores logged texts with the current model for benchmarking and
+drift checks, so it needs logs written with store_text=True.
+
+Usage:
+  python audit_log.py replay logs/requests.jsonl logs/requests.*.jsonl.gz
+  python audit_log.py replay logs/requests.jsonl --single   # One analyze() call per event
+"""
+
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+import numpy as np
+
+AUDIT_LOG_PATH = os.path.join("logs", "requests.jsonl")
+MAX_BYTES = 50 * 1024 * 1024
+BACKUP_COUNT = 20
+FLUSH_EVENTS = 256
+FLUSH_INTERVAL = 1.0
+MAX_PENDING = 100_000
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class AuditLog:
+    """Append-only JSONL event log written from a background thread"""
+
+    def __init__(self, path=AUDIT_LOG_PATH, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                 flush_events=FLUSH_EVENTS, flush_interval=FLUSH_INTERVAL, store_text=False,
+                 max_pending=MAX_PENDING):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval
+        self.store_text = store_text
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.last_error = None
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, text, label, prob, latency_ms, model_version, **extra):
+        """Queue one scoring event; hashing and disk I/O happen on the writer thread"""
+        event = {
+            "ts": time.time(),
+            "prediction": label,
+            "probability": float(prob),
+            "latency_ms": latency_ms,
+            "model_version": model_version,
+            "text": text,
+        }
+        event.update(extra)
+        self.log(event)
+
+    def log(self, event):
+        with self._cond:
+            if self._closed or len(self._buffer) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._buffer.append(event)
+            if len(self._buffer) >= self.flush_events:
+                self._cond.notify()
+
+    # -------------------------------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.flush_events and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                events, self._buffer = self._buffer, []
+                closed = self._closed
+            if events:
+                try:
+                    self._write(events)
+                except Exception as e:
+                    # Losing a batch beats killing the writer and buffering forever
+                    self.write_errors += 1
+                    self.dropped += len(events)
+                    self.last_error = repr(e)
+            if closed:
+                return
+
+    def _write(self, events):
+        for e in events:
+            if "text" in e and "text_sha1" not in e:
+                e["text_sha1"] = text_hash(e["text"])
+                if not self.store_text:
+                    del e["text"]
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+        if self._file.closed:
+            self._file = open(self.path, "ab")  # A failed rotation left it closed
+        if self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self.written += len(events)
+
+    def _rotate(self):
+        """Move the live file aside, gzip it and keep the newest backup_count archives"""
+        self._file.close()
+        base, ext = os.path.splitext(self.path)
+        rotated = f"{base}.{datetime.now():%Y%m%d-%H%M%S-%f}{ext}"
+        os.replace(self.path, rotated)
+        self._file = open(self.path, "ab")
+
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+
+        archives = sorted(glob.glob(f"{glob.escape(base)}.*{ext}.gz"))
+        for old in archives[:-self.backup_count] if self.backup_count > 0 else archives:
+            os.remove(old)
+
+    def close(self):
+        """Flush everything still buffered and stop the writer"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._buffer)
+        return {"written": self.written, "pending": pending, "dropped": self.dropped,
+                "write_errors": self.write_errors, "last_error": self.last_error, "path": self.path}
+
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+
+def read_events(paths):
+    """Yield logged events from plain or gzipped JSONL files, in the order given"""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def replay(paths, chunk_size=2000, single=False, scorer=None):
+    """Re-score logged texts with scorer (default: the registry's CURRENT); returns a summary dict"""
+    import detector
+    from model_registry import load_serving
+
+    scorer = scorer or load_serving()[0]
+    explainer = detector.Explainer(scorer, scorer)
+    summary = {"events": 0, "replayed": 0, "no_text": 0, "agree": 0}
+    shifts, logged_latency, texts, logged = [], [], [], []
+    elapsed = 0.0
+
+    def flush():
+        nonlocal elapsed
+        start = time.perf_counter()
+        if single:
+            results = [detector.analyze(t, scorer, scorer, explainer) for t in texts]
+            labels = [r.label for r in results]
+            probs = np.array([r.prob for r in results])
+        else:
+            labels, probs = detector.score_texts(texts, scorer, scorer)
+        elapsed += time.perf_counter() - start
+        for event, label, prob in zip(logged, labels, probs):
+            summary["agree"] += label == event.get("prediction")
+            shifts.append(abs(float(prob) - event.get("probability", 0.0)))
+        summary["replayed"] += len(texts)
+        texts.clear()
+        logged.clear()
+
+    for event in read_events(paths):
+        summary["events"] += 1
+        if event.get("latency_ms") is not None:
+            logged_latency.append(event["latency_ms"])
+        if "text" not in event:
+            summary["no_text"] += 1
+            continue
+        texts.append(event["text"])
+        logged.append(event)
+        if len(texts) >= chunk_size:
+            flush()
+    if texts:
+        flush()
+
+    n = summary["replayed"]
+    summary.update({
+        "model_version": scorer.model_version,
+        "seconds": elapsed,
+        "texts_per_sec": n / elapsed if elapsed else 0.0,
+        "replay_ms_per_text": 1000.0 * elapsed / n if n else 0.0,
+        "agreement": summary["agree"] / n if n else 0.0,
+        "mean_abs_shift": float(np.mean(shifts)) if shifts else 0.0,
+        "max_abs_shift": float(np.max(shifts)) if shifts else 0.0,
+        "logged_latency_p50_ms": float(np.percentile(logged_latency, 50)) if logged_latency else None,
+        "logged_latency_p99_ms": float(np.percentile(logged_latency, 99)) if logged_latency else None,
+    })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("replay", help="Re-score logged texts with the current model")
+    rp.add_argument("logs", nargs="+", help="Log files (.jsonl or .jsonl.gz)")
+    rp.add_argument("--chunk-size", type=int, default=2000)
+    rp.add_argument("--single", action="store_true", help="Replay one analyze() call per event")
+    rp.add_argument("--registry", default=None, help="Model registry whose CURRENT version is used")
+    rp.add_argument("--scorer-dir", default=None, help="Exported artifact directory (overrides --registry)")
+    args = parser.parse_args()
+
+    from model_registry import REGISTRY_DIR, load_serving
+    scorer, _ = load_serving(args.registry or REGISTRY_DIR, args.scorer_dir)
+    s = replay(args.logs, args.chunk_size, args.single, scorer)
+    print(f"Replayed {s['replayed']}/{s['events']} events against model {s['model_version']}"
+          f" ({s['no_text']} without text)")
+    if s["events"] and not s["replayed"]:
+        print("  No logged texts to replay; log with store_text=True (AUDIT_LOG_STORE_TEXT=1 in the app)")
+        return 1
+    print(f"  Throughput: {s['texts_per_sec']:,.0f} texts/s • {s['replay_ms_per_text']:.3f} ms/text")
+    if s["logged_latency_p50_ms"] is not None:
+        print(f"  Logged latency: p50 {s['logged_latency_p50_ms']:.2f} ms • p99 {s['logged_latency_p99_ms']:.2f} ms")
+    print(f"  Verdict agreement: {s['agreement']:.2%} • mean |Δp| {s['mean_abs_shift']:.4f}"
+          f" • max |Δp| {s['max_abs_shift']:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Multi-core batch scoring for the Fake News Detector.
+Shards texts across a process pool; each worker loads the model once.
+
+Usage:
+  python batch_score.py news.csv                         # Writes news_results.csv
+  python batch_score.py news.csv -o out.csv --workers 16  # Choose output and worker count
+  python batch_score.py news.csv --scorer-dir DIR        # Exported artifact instead of the registry's CURRENT
+  python batch_score.py news.csv --cascade --band 0.4 0.6  # LLM second opinion for borderline rows only
+"""
+
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import detector
+from model_registry import REGISTRY_DIR, load_serving, load_path
+
+SHARD_SIZE = 500
+
+# Per-process model state, filled by _init_worker
+_worker_state = {}
+
+
+def _init_worker(scorer_dir, vector_path, model_path):
+    # Artifact arrays are memory-mapped, so workers share one page-cached copy
+    _worker_state["scorer"] = load_path(scorer_dir, vector_path, model_path)
+
+
+def _score_shard(texts):
+    scorer = _worker_state["scorer"]
+    return detector.score_texts(texts, scorer, scorer)
+
+
+class ParallelScorer:
+    """
+    Process pool that scores texts in input order.
+    Workers are spawned once and keep their model loaded between calls.
+    scorer_dir is an artifact directory as returned by model_registry.load_current
+    (None: compile the pickles), so the workers serve exactly that version.
+    """
+
+    def __init__(self, scorer_dir=None, vector_path=detector.VECTOR_PATH,
+                 model_path=detector.MODEL_PATH, workers=None, shard_size=SHARD_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(scorer_dir, vector_path, model_path),
+        )
+
+    def score(self, texts):
+        """Return (labels, probs) for texts, in the same order"""
+        texts = list(texts)
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        results = list(self._pool.map(_score_shard, shards))
+        if not results:
+            return np.array([], dtype=object), np.array([], dtype=np.float64)
+        labels = np.concatenate([r[0] for r in results])
+        probs = np.concatenate([r[1] for r in results])
+        return labels, probs
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV of news texts in parallel")
+    parser.add_argument("input", help="Path to CSV (column: text)")
+    parser.add_argument("--output", "-o", help="Output CSV (default: <input>_results.csv)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Rows read from the CSV at a time")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Rows sent to a worker at a time")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="Model registry whose CURRENT version is used")
+    parser.add_argument("--scorer-dir", default=None, help="Exported artifact directory (overrides --registry)")
+    parser.add_argument("--vectorizer", default=detector.VECTOR_PATH)
+    parser.add_argument("--model", default=detector.MODEL_PATH)
+    parser.add_argument("--cascade", action="store_true",
+                        help="Send rows whose probability falls inside --band to the LLM for a second opinion")
+    parser.add_argument("--band", type=float, nargs=2, metavar=("LOW", "HIGH"), default=None,
+                        help="Uncertainty band for --cascade (default: CASCADE_LOW/CASCADE_HIGH or 0.35 0.65)")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="Concurrent LLM calls with --cascade")
+    parser.add_argument("--prefer-local", action="store_true", help="Try Ollama before Hugging Face with --cascade")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.input)[0] + "_results.csv"
+
+    model, path = load_serving(args.registry, args.scorer_dir, args.vectorizer, args.model)
+    print(f"Scoring {args.input} with model {model.model_version} on {args.workers} workers...")
+    stats = {"rows": 0, "fake": 0, "real": 0, "elapsed": 0.0, "rows_per_sec": 0.0}
+    start = time.perf_counter()
+    cascade = None
+    with ParallelScorer(path, args.vectorizer, args.model, args.workers, args.shard_size) as scorer:
+        score_fn = scorer.score
+        if args.cascade:
+            from llm_client import LLMCascade, CASCADE_BAND, CASCADE_MAX_CONCURRENCY
+            cascade = LLMCascade(scorer.score, args.band or CASCADE_BAND,
+                                 args.llm_concurrency or CASCADE_MAX_CONCURRENCY, args.prefer_local)
+            score_fn = cascade.score
+        try:
+            for stats in detector.stream_score_csv(args.input, output, None, None,
+                                                   chunk_size=args.chunk_size, score_fn=score_fn):
+                print(f"  {stats['rows']:,} rows • {stats['rows_per_sec']:,.0f} rows/sec")
+        finally:
+            if cascade is not None:
+                cascade.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {stats['rows']:,} rows in {elapsed:.1f}s ({stats['fake']:,} fake, {stats['real']:,} real)")
+    if cascade is not None:
+        c = cascade.stats()
+        linear, llm = c["linear"], c["llm"]
+        print(f"  Linear tier: {linear['items']:,} rows • {linear['ms_per_item']:.3f} ms/row")
+        print(f"  LLM tier: {llm['items']:,} rows ({llm['share']:.1%}) in band {c['band'][0]:g}–{c['band'][1]:g} • "
+              f"{llm['answered']:,} answered, {llm['failed']:,} failed, {llm['skipped']:,} skipped, "
+              f"{llm['overridden']:,} verdicts changed • "
+              f"p50 {llm['latency_p50_ms']:,.0f} ms, p95 {llm['latency_p95_ms']:,.0f} ms")
+    print(f"Saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
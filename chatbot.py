@@ -1,11 +1,9 @@
-import requests
 import streamlit as st
 import time
 import os
-from dotenv import load_dotenv
 
-# Load .env (for local development)
-load_dotenv()
+import llm_client
+from llm_client import is_ollama_available, chat_with_ollama
 
 # =============================================================================
 # TOKEN MANAGEMENT (SECURE)
@@ -29,7 +27,7 @@ def get_hf_token():
 
 
 # =============================================================================
-# CLOUD AI - HUGGING FACE
+# AI CALLS (llm_client, with the token from Streamlit secrets)
 # =============================================================================
 
 def chat_with_huggingface(message, context=""):
@@ -37,227 +35,15 @@ def chat_with_huggingface(message, context=""):
     Chat using Hugging Face API (cloud-based)
     Returns structured response dict
     """
+    return llm_client.chat_with_huggingface(message, context, token=get_hf_token())
 
-    HF_TOKEN = get_hf_token()
-
-    if not HF_TOKEN:
-        return {
-            "success": False,
-            "response": None,
-            "error": "Hugging Face token not configured."
-        }
-
-    API_URL = "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
-    headers = {"Authorization": f"Bearer {HF_TOKEN}"}
-
-    system_prompt = """
-You are a media literacy assistant.
-Your role:
-- Explain misinformation clearly
-- Encourage verification
-- Avoid certainty claims
-- Keep responses concise (max 3 paragraphs)
-
-Never claim information is 100% true or false.
-Always encourage cross-checking with reliable sources.
-"""
-
-    if context:
-        system_prompt += f"\n\nContext from analysis:\n{context}"
-
-    full_prompt = f"{system_prompt}\n\nUser: {message}\n\nAssistant:"
-
-    payload = {
-        "inputs": full_prompt,
-        "parameters": {
-            "max_new_tokens": 300,
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "return_full_text": False
-        }
-    }
-
-    # Retry logic (3 attempts)
-    for attempt in range(3):
-        try:
-            response = requests.post(
-                API_URL,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-
-            # Model loading
-            if response.status_code == 503:
-                time.sleep(5)
-                continue
-
-            response.raise_for_status()
-            result = response.json()
-
-            if isinstance(result, list) and len(result) > 0:
-                generated_text = result[0].get("generated_text", "").strip()
-            elif isinstance(result, dict):
-                generated_text = result.get("generated_text", "").strip()
-            else:
-                return {
-                    "success": False,
-                    "response": None,
-                    "error": "Unexpected API response format."
-                }
-
-            return {
-                "success": True,
-                "response": generated_text,
-                "error": None
-            }
-
-        except requests.exceptions.Timeout:
-            if attempt < 2:
-                time.sleep(3)
-                continue
-            return {
-                "success": False,
-                "response": None,
-                "error": "Request timed out."
-            }
-
-        except requests.exceptions.HTTPError as e:
-            return {
-                "success": False,
-                "response": None,
-                "error": f"HTTP Error {e.response.status_code}"
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "response": None,
-                "error": str(e)
-            }
-
-    return {
-        "success": False,
-        "response": None,
-        "error": "Model loading timeout."
-    }
-
-
-# =============================================================================
-# LOCAL AI - OLLAMA
-# =============================================================================
-
-def is_ollama_available():
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
-        return response.status_code == 200
-    except Exception:
-        return False
-
-
-def chat_with_ollama(message, context=""):
-    """
-    Chat using local Ollama
-    Returns structured response dict
-    """
-
-    if not is_ollama_available():
-        return {
-            "success": False,
-            "response": None,
-            "error": "Ollama not running."
-        }
-
-    url = "http://localhost:11434/api/generate"
-
-    system_prompt = """
-You are a media literacy assistant.
-Keep responses concise and educational.
-"""
-
-    if context:
-        system_prompt += f"\n\nContext:\n{context}"
-
-    full_prompt = f"{system_prompt}\n\nUser: {message}\n\nAssistant:"
-
-    payload = {
-        "model": "llama3.2:3b",
-        "prompt": full_prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.7,
-            "num_predict": 300
-        }
-    }
-
-    try:
-        response = requests.post(url, json=payload, timeout=60)
-        response.raise_for_status()
-
-        result = response.json()
-
-        return {
-            "success": True,
-            "response": result.get("response", ""),
-            "error": None
-        }
-
-    except requests.exceptions.Timeout:
-        return {
-            "success": False,
-            "response": None,
-            "error": "Ollama timeout."
-        }
-
-    except Exception as e:
-        return {
-            "success": False,
-            "response": None,
-            "error": str(e)
-        }
-
-
-# =============================================================================
-# HYBRID SYSTEM WITH CLEAN FALLBACK
-# =============================================================================
 
 def get_ai_response(message, context="", prefer_local=False):
     """
     Hybrid AI system with structured fallback
     Returns (text_response, source_label)
     """
-
-    if prefer_local:
-
-        # Try local first
-        local_response = chat_with_ollama(message, context)
-
-        if local_response["success"]:
-            return local_response["response"], "local"
-
-        # Fallback to cloud
-        cloud_response = chat_with_huggingface(message, context)
-
-        if cloud_response["success"]:
-            return cloud_response["response"], "cloud (fallback)"
-
-        return cloud_response["error"], "cloud (fallback failed)"
-
-    else:
-
-        # Try cloud first
-        cloud_response = chat_with_huggingface(message, context)
-
-        if cloud_response["success"]:
-            return cloud_response["response"], "cloud"
-
-        # Fallback to local
-        local_response = chat_with_ollama(message, context)
-
-        if local_response["success"]:
-            return local_response["response"], "local (fallback)"
-
-        return cloud_response["error"], "cloud (failed)"
+    return llm_client.get_ai_response(message, context, prefer_local, token=get_hf_token())
 
 
 # =============================================================================
@@ -0,0 +1,160 @@
+"""
+Compact vocabulary for the serving scorer.
+
+Replaces the TfidfVectorizer's term -> index dict with flat numpy arrays:
+a UTF-8 blob of all terms with offsets (in feature-index order) and an
+open-addressing hash table keyed on CRC32. Every array can be
+memory-mapped, so millions of features cost no per-term Python objects.
+"""
+
+import os
+import zlib
+
+import numpy as np
+
+FILES = {
+    "blob": "vocab_blob.npy",
+    "offsets": "vocab_offsets.npy",
+    "table": "vocab_table.npy",
+    "hashes": "vocab_hashes.npy",
+}
+
+
+class TermsView:
+    """Read-only sequence of terms decoded on demand from the blob"""
+
+    def __init__(self, vocab):
+        self._vocab = vocab
+
+    def __len__(self):
+        return len(self._vocab)
+
+    def __getitem__(self, i):
+        return self._vocab.term(int(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class CompactVocabulary:
+    """Array-backed mapping of term -> feature index with a dict-like API"""
+
+    def __init__(self, blob, offsets, table, hashes):
+        self.blob = blob
+        self.offsets = offsets
+        self.table = table
+        self.hashes = hashes
+        self._mask = len(table) - 1
+        self._raw = memoryview(np.asarray(blob)).cast("B")
+
+    @classmethod
+    def from_terms(cls, terms):
+        """Build from terms listed in feature-index order"""
+        encoded = [t.encode("utf-8") for t in terms]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+        hashes = np.array([zlib.crc32(b) for b in encoded], dtype=np.uint32)
+
+        # Power-of-two table at most half full keeps probe chains short
+        size = 1
+        while size < 2 * max(len(encoded), 1):
+            size <<= 1
+        table = np.full(size, -1, dtype=np.int32 if len(encoded) < 2**31 else np.int64)
+        mask = size - 1
+        for i, h in enumerate(hashes.tolist()):
+            slot = h & mask
+            while table[slot] >= 0:
+                slot = (slot + 1) & mask
+            table[slot] = i
+        return cls(blob, offsets, table, hashes)
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        terms = [None] * len(vocabulary)
+        for term, i in vocabulary.items():
+            terms[i] = term
+        return cls.from_terms(terms)
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def _raw_term(self, i):
+        return self._raw[self.offsets[i]:self.offsets[i + 1]]
+
+    def term(self, i):
+        return bytes(self._raw_term(i)).decode("utf-8")
+
+    def get(self, term, default=None):
+        encoded = term.encode("utf-8")
+        h = zlib.crc32(encoded)
+        slot = h & self._mask
+        while True:
+            i = int(self.table[slot])
+            if i < 0:
+                return default
+            if self.hashes[i] == h and self._raw_term(i) == encoded:
+                return i
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, terms):
+        """Feature index for each term (-1 when missing), probing all terms at once"""
+        n = len(terms)
+        result = np.full(n, -1, dtype=np.int64)
+        if n == 0 or len(self) == 0:
+            return result
+        encoded = [t.encode("utf-8") for t in terms]
+        h = np.fromiter((zlib.crc32(b) for b in encoded), dtype=np.uint32, count=n)
+        slots = (h & self._mask).astype(np.int64)
+        active = np.arange(n)
+        while active.size:
+            idx = np.asarray(self.table[slots[active]], dtype=np.int64)
+            occupied = idx >= 0
+            candidate = np.zeros(active.size, dtype=bool)
+            candidate[occupied] = self.hashes[idx[occupied]] == h[active[occupied]]
+            found = np.zeros(active.size, dtype=bool)
+            for k in np.flatnonzero(candidate).tolist():
+                if self._raw_term(idx[k]) == encoded[active[k]]:
+                    found[k] = True
+            result[active[found]] = idx[found]
+            # Keep probing only where the slot was taken by a different term
+            active = active[occupied & ~found]
+            slots[active] = (slots[active] + 1) & self._mask
+        return result
+
+    def __getitem__(self, term):
+        i = self.get(term)
+        if i is None:
+            raise KeyError(term)
+        return i
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def terms(self):
+        return TermsView(self)
+
+    def items(self):
+        for i in range(len(self)):
+            yield self.term(i), i
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, out_dir, prefix=""):
+        """Write the arrays as .npy files; returns the file names for the manifest"""
+        files = {key: prefix + name for key, name in FILES.items()}
+        for key, name in files.items():
+            np.save(os.path.join(out_dir, name), np.asarray(getattr(self, key)))
+        return files
+
+    @classmethod
+    def load(cls, artifact_dir, files=FILES, mmap_mode="r"):
+        arrays = {key: np.load(os.path.join(artifact_dir, files[key]), mmap_mode=mmap_mode) for key in FILES}
+        return cls(**arrays)
@@ -0,0 +1,45 @@
+"""
+Shared pytest fixtures.
+
+Tests fit their own small TF-IDF + Logistic Regression pair on the
+built-in demo data instead of loading the committed pickles, so results
+do not depend on the installed scikit-learn version.
+"""
+
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from train_model import DEMO_FAKE, DEMO_REAL
+
+
+@pytest.fixture(scope="session")
+def demo_data():
+    """(texts, labels) of the built-in demo data, duplicates included"""
+    return list(DEMO_FAKE) + list(DEMO_REAL), [0] * len(DEMO_FAKE) + [1] * len(DEMO_REAL)
+
+
+@pytest.fixture(scope="session")
+def sample_texts(demo_data):
+    """Demo texts plus the booth sample headlines: unseen n-grams, punctuation, casing"""
+    texts = list(dict.fromkeys(demo_data[0]))
+    for path in ["booth_samples.csv", "auto_booth_combined.csv"]:
+        texts += pd.read_csv(path)["text"].fillna("").astype(str).tolist()
+    return texts + ["", "!!!", "a the of", "Ünïcödé naïve café résumé"]
+
+
+@pytest.fixture(scope="session")
+def fitted_pair(demo_data):
+    """(vectorizer, model) trained the way train_model.py trains them"""
+    texts, labels = demo_data
+    vectorizer = TfidfVectorizer(max_features=10000, stop_words="english", ngram_range=(1, 2))
+    model = LogisticRegression(max_iter=1000, random_state=42)
+    model.fit(vectorizer.fit_transform(texts), labels)
+    return vectorizer, model
+
+
+@pytest.fixture(scope="session")
+def scorer(fitted_pair):
+    from linear_scorer import LinearScorer
+    return LinearScorer.from_sklearn(*fitted_pair)
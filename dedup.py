@@ -0,0 +1,169 @@
+"""
+Duplicate removal for training data.
+
+Exact duplicates are found by hashing a normalized form of each text
+(lowercased, punctuation and extra whitespace removed). Near duplicates
+(syndicated copies with small edits) are found with MinHash signatures
+over word shingles and LSH banding: a text is dropped when an earlier
+text in one of its buckets reaches the estimated Jaccard threshold, so
+each cluster of copies keeps its first occurrence. All hashing and
+bucket comparisons are vectorized with numpy.
+"""
+
+import re
+import time
+import zlib
+import hashlib
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: candidate pairs from roughly 0.5 Jaccard upwards
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = 0.8
+SIGNATURE_CHUNK = 1 << 16  # Shingles hashed per numpy pass
+PAIR_CHUNK = 1 << 18  # Candidate pairs compared per numpy pass
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_for_dedup(text):
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+    Words are hashed once (CRC32, cached), shingle hashes are combined
+    from consecutive word hashes in numpy, and every permutation is a
+    multiply-shift hash ((a * x + b) mod 2^64) >> 32.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self.mix = rng.integers(0, 1 << 63, size=shingle_size, dtype=np.uint64) | np.uint64(1)
+        self._word_hashes = {}
+
+    def _hash_words(self, words):
+        cache = self._word_hashes
+        out = []
+        for w in words:
+            h = cache.get(w)
+            if h is None:
+                h = cache[w] = zlib.crc32(w.encode("utf-8")) + 1  # 0 marks "past the end of the text"
+            out.append(h)
+        return out
+
+    def _shingle_hashes(self, docs):
+        """Flat shingle hashes for a chunk of word lists, plus each document's first shingle index"""
+        lengths = np.array([max(len(d), 1) for d in docs], dtype=np.int64)
+        words = np.array([h for d in docs for h in (self._hash_words(d) or [0])], dtype=np.uint64)
+        doc = np.repeat(np.arange(len(docs)), lengths)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        pos = np.arange(len(words))
+
+        shingle = words * self.mix[0]
+        for k in range(1, self.shingle_size):
+            nxt = np.zeros(len(words), dtype=np.uint64)
+            nxt[:-k] = np.where(doc[k:] == doc[:-k], words[k:], 0)
+            shingle += nxt * self.mix[k]
+        # Full windows only; a text shorter than one window becomes a single shingle
+        ends = starts + lengths
+        valid = (pos + self.shingle_size <= ends[doc]) | (pos == starts[doc])
+        first = np.concatenate([[0], np.cumsum(np.bincount(doc[valid], minlength=len(docs)))[:-1]])
+        return shingle[valid], first
+
+    def signatures(self, docs):
+        """(len(docs), num_perm) uint32 signatures for lists of words, hashed in large chunks"""
+        out = np.empty((len(docs), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(docs):
+            end, total = start, 0
+            while end < len(docs) and (total == 0 or total + len(docs[end]) <= SIGNATURE_CHUNK):
+                total += len(docs[end])
+                end += 1
+            shingles, first = self._shingle_hashes(docs[start:end])
+            hashed = ((shingles[:, None] * self.a + self.b) >> np.uint64(32)).astype(np.uint32)
+            out[start:end] = np.minimum.reduceat(hashed, first, axis=0)
+            start = end
+        return out
+
+
+def _candidate_pairs(band_keys):
+    """
+    Yield (later, earlier) index arrays per band: every text paired with
+    the first and the preceding text that share its bucket. Chained
+    comparisons keep one text per cluster of near duplicates.
+    """
+    n = len(band_keys)
+    idx = np.arange(n)
+    for band in band_keys.T:
+        order = np.lexsort((idx, band))
+        same = band[order[1:]] == band[order[:-1]]
+        # Preceding member of the same bucket
+        yield order[1:][same], order[:-1][same]
+        # First member of the bucket
+        starts = np.flatnonzero(np.concatenate([[True], ~same]))
+        first = order[starts[np.cumsum(np.concatenate([[True], ~same])) - 1]]
+        not_first = first != order
+        yield order[not_first], first[not_first]
+
+
+def dedupe_texts(texts, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """
+    Return (keep mask, stats) for texts.
+    threshold=None only removes exact duplicates.
+    """
+    start = time.time()
+    n = len(texts)
+    keep = np.ones(n, dtype=bool)
+    if n == 0:
+        return keep, {"rows": 0, "exact_duplicates": 0, "near_duplicates": 0, "kept": 0,
+                      "seconds": time.time() - start}
+    normalized = [normalize_for_dedup(t) for t in texts]
+
+    seen = set()
+    exact = 0
+    for i, norm in enumerate(normalized):
+        digest = hashlib.sha1(norm.encode("utf-8")).digest()
+        if digest in seen:
+            keep[i] = False
+            exact += 1
+        else:
+            seen.add(digest)
+
+    near = 0
+    if threshold is not None:
+        candidates_idx = np.flatnonzero(keep)
+        sigs = MinHasher(num_perm).signatures([normalized[i].split() for i in candidates_idx])
+        rows = num_perm // bands
+        # One integer key per band: the band's rows mixed with fixed odd multipliers
+        mix = np.random.default_rng(2).integers(0, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+        band_keys = (sigs[:, :bands * rows].reshape(len(sigs), bands, rows).astype(np.uint64) * mix).sum(axis=2)
+
+        dup = np.zeros(len(sigs), dtype=bool)
+        for later, earlier in _candidate_pairs(band_keys):
+            for lo in range(0, len(later), PAIR_CHUNK):
+                a, b = later[lo:lo + PAIR_CHUNK], earlier[lo:lo + PAIR_CHUNK]
+                similar = np.count_nonzero(sigs[a] == sigs[b], axis=1) >= threshold * num_perm
+                dup[a[similar]] = True
+        keep[candidates_idx[dup]] = False
+        near = int(dup.sum())
+
+    return keep, {
+        "rows": n,
+        "exact_duplicates": exact,
+        "near_duplicates": near,
+        "kept": int(keep.sum()),
+        "seconds": time.time() - start,
+    }
+
+
+def dedupe_frame(df, threshold=NEAR_DUP_THRESHOLD, text_column="text"):
+    """Drop duplicate rows of a DataFrame, keeping the first occurrence"""
+    keep, stats = dedupe_texts(df[text_column].fillna("").astype(str).tolist(), threshold)
+    return df[keep].reset_index(drop=True), stats
@@ -0,0 +1,428 @@
+"""
+Core scoring logic for the Fake News Detector.
+
+Everything here is free of Streamlit so it can be shared by the app,
+command-line tools and background workers.
+"""
+
+import os
+import html
+import json
+import hashlib
+import pickle
+import re
+import threading
+import time
+import warnings
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from heuristics import HeuristicEngine
+from linear_scorer import LinearScorer, load_scorer
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+CLASS_LABELS = {0: "FAKE", 1: "REAL"}
+
+VECTOR_PATH = "vectorizer.pkl"
+MODEL_PATH = "fake_news_model.pkl"
+SCORER_DIR = os.path.join("models", "scorer")
+
+BATCH_CHUNK_SIZE = 2000
+
+
+# =============================================================================
+# MODEL LOADING
+# =============================================================================
+
+def load_artifacts(vector_path=VECTOR_PATH, model_path=MODEL_PATH):
+    """Load the pickled vectorizer and model"""
+    with open(vector_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    return vectorizer, model
+
+
+def load_serving_scorer(scorer_dir=SCORER_DIR, vector_path=VECTOR_PATH, model_path=MODEL_PATH):
+    """
+    Load the LinearScorer used for serving.
+    Prefers the memory-mapped artifact directory; falls back to compiling
+    the pickled sklearn pair when no artifacts have been exported, or when
+    the export was made from different pickles than the ones on disk.
+    """
+    if scorer_dir and os.path.exists(os.path.join(scorer_dir, "manifest.json")):
+        if not _export_is_stale(scorer_dir, vector_path, model_path):
+            return load_scorer(scorer_dir)
+    vectorizer, model = load_artifacts(vector_path, model_path)
+    scorer = LinearScorer.from_sklearn(vectorizer, model)
+    scorer.model_version = artifact_version(vector_path, model_path)
+    return scorer
+
+
+def _export_is_stale(scorer_dir, vector_path, model_path):
+    """
+    True when the pickles no longer match the export in scorer_dir (by the
+    manifest's source_version). Exports without one are only compared by
+    modification time, which warns but keeps serving the export.
+    """
+    if not (os.path.exists(vector_path) and os.path.exists(model_path)):
+        return False
+    manifest_path = os.path.join(scorer_dir, "manifest.json")
+    with open(manifest_path) as f:
+        source_version = json.load(f).get("source_version")
+    if source_version is not None:
+        current = artifact_version(vector_path, model_path)
+        if current != source_version:
+            warnings.warn(f"{scorer_dir} was exported from pickles {source_version}, but {vector_path} and "
+                          f"{model_path} are now {current}; serving the pickles. Re-export with: "
+                          f"python linear_scorer.py --export {scorer_dir}", stacklevel=3)
+            return True
+        return False
+    if max(os.path.getmtime(vector_path), os.path.getmtime(model_path)) > os.path.getmtime(manifest_path):
+        warnings.warn(f"{vector_path}/{model_path} are newer than the export in {scorer_dir}, which may be "
+                      f"stale. Re-export with: python linear_scorer.py --export {scorer_dir}", stacklevel=3)
+    return False
+
+
+# =============================================================================
+# ANALYSIS RESULT
+# =============================================================================
+
+@dataclass
+class AnalysisResult:
+    """
+    Everything derived from one piece of text.
+    The text is vectorized once; prediction, explanation and highlighting
+    all read from this object.
+    """
+    text: str
+    X: object
+    prob: float
+    label: str
+    contributions: list = field(default_factory=list)
+    flags: list = field(default_factory=list)
+    contribution_features: list = field(default_factory=list)
+    feature_spans: tuple = None
+
+    def suspicious_words(self):
+        """Top contributing features that push towards FAKE"""
+        return [w for w, s in self.contributions if s < 0]
+
+    def suspicious_features(self):
+        """Feature indices of the top contributions that push towards FAKE"""
+        return [j for j, (w, s) in zip(self.contribution_features, self.contributions) if s < 0]
+
+
+# =============================================================================
+# EXPLAINER
+# =============================================================================
+
+class Explainer:
+    """
+    Precompiled view of a fitted vectorizer/model pair.
+    Built once at load time so explanations never rebuild the
+    feature-name array or sort every nonzero feature.
+    """
+
+    def __init__(self, vectorizer, model):
+        # Any indexable sequence; compact vocabularies decode names on demand
+        self.feature_names = vectorizer.get_feature_names_out()
+        self.vocabulary = vectorizer.vocabulary_
+        if hasattr(model, "coef_"):
+            self.coef = np.ascontiguousarray(model.coef_[0], dtype=np.float64)
+        else:
+            self.coef = None
+
+    def top_contributions(self, X, top_n=5):
+        """Signed per-feature contributions (coef * tfidf), largest magnitude first"""
+        return [(self.feature_names[j], s) for j, s in self.top_features(X, top_n)]
+
+    def top_features(self, X, top_n=5):
+        """(feature index, signed contribution) pairs, largest magnitude first"""
+        if self.coef is None or top_n <= 0:
+            return []
+        row = X.tocsr()
+        indices = row.indices
+        scores = self.coef[indices] * row.data
+        if len(scores) > top_n:
+            part = np.argpartition(-np.abs(scores), top_n - 1)[:top_n]
+        else:
+            part = np.arange(len(scores))
+        order = part[np.argsort(-np.abs(scores[part]), kind="stable")]
+        return [(int(indices[i]), float(scores[i])) for i in order]
+
+
+# =============================================================================
+# ANALYSIS
+# =============================================================================
+
+_heuristic_engine = None
+
+
+def get_heuristic_engine():
+    """Heuristic engine compiled once from heuristics.json"""
+    global _heuristic_engine
+    if _heuristic_engine is None:
+        _heuristic_engine = HeuristicEngine.from_file()
+    return _heuristic_engine
+
+
+def get_heuristic_flags(text):
+    """Rule-based clickbait indicators, each with its character span"""
+    return get_heuristic_engine().scan(text)
+
+
+def analyze(text, vectorizer, model, explainer=None, top_n=5):
+    """Vectorize once and build the full AnalysisResult"""
+    if explainer is None:
+        explainer = Explainer(vectorizer, model)
+    if hasattr(vectorizer, "transform_with_spans"):
+        # Same tokenization pass yields the features and their character spans
+        X, feature_spans = vectorizer.transform_with_spans(text)
+    else:
+        X, feature_spans = vectorizer.transform([text]), None
+    prob = model.predict_proba(X)[0][1]
+    pred = 1 if prob >= 0.5 else 0
+    try:
+        top = explainer.top_features(X, top_n)
+    except Exception:
+        top = []
+    return AnalysisResult(
+        text=text,
+        X=X,
+        prob=prob,
+        label=CLASS_LABELS[pred],
+        contributions=[(explainer.feature_names[j], s) for j, s in top],
+        flags=get_heuristic_flags(text),
+        contribution_features=[j for j, s in top],
+        feature_spans=feature_spans,
+    )
+
+
+# =============================================================================
+# BATCH SCORING
+# =============================================================================
+
+def score_texts(texts, vectorizer, model):
+    """Score many texts with one transform and one predict_proba call"""
+    if len(texts) == 0:
+        return np.array([], dtype=object), np.array([], dtype=np.float64)
+    X = vectorizer.transform(texts)
+    probs = model.predict_proba(X)[:, 1]
+    labels = np.where(probs >= 0.5, CLASS_LABELS[1], CLASS_LABELS[0])
+    return labels, probs
+
+
+def format_batch_results(texts, labels, probs, verdict_sources=None):
+    """
+    Results table shown in the CSV/Batch tab. confidence is the model's
+    probability; verdict_sources, when given, says where each prediction
+    came from (see llm_client.LLMCascade).
+    """
+    texts = pd.Series(texts).reset_index(drop=True)
+    result = pd.DataFrame({
+        "text": texts.where(texts.str.len() <= 100, texts.str[:100] + "..."),
+        "prediction": labels,
+        "confidence": [f"{p*100:.1f}%" for p in probs]
+    })
+    if verdict_sources is not None:
+        result["verdict_source"] = list(verdict_sources)
+    return result
+
+
+def stream_score_csv(source, out_path, vectorizer, model,
+                     chunk_size=BATCH_CHUNK_SIZE, text_column="text", score_fn=None):
+    """
+    Read a CSV in chunks, score each chunk and append the results to out_path.
+    Only one chunk is held in memory at a time. Yields a progress dict
+    (rows, fake, real, elapsed, rows_per_sec, chunk) after every chunk.
+    score_fn(texts) -> (labels, probs) replaces in-process scoring when given;
+    a third returned item is written as the verdict_source column.
+    """
+    if score_fn is None:
+        def score_fn(texts):
+            return score_texts(texts, vectorizer, model)
+    start = time.perf_counter()
+    rows = fake = 0
+    header = True
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        for chunk in pd.read_csv(source, chunksize=chunk_size):
+            if text_column not in chunk.columns:
+                raise ValueError(f"CSV must have a '{text_column}' column!")
+            texts = chunk[text_column].fillna("").astype(str)
+            scored = score_fn(texts)
+            labels = scored[0]
+            result = format_batch_results(texts, *scored)
+            result.to_csv(out, index=False, header=header)
+            out.flush()
+            header = False
+
+            rows += len(result)
+            fake += int((labels == CLASS_LABELS[0]).sum())
+            elapsed = time.perf_counter() - start
+            yield {
+                "rows": rows,
+                "fake": fake,
+                "real": rows - fake,
+                "elapsed": elapsed,
+                "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+                "chunk": result,
+            }
+        if header:
+            # Same columns as a non-empty result (score_fn may add verdict_source)
+            format_batch_results([], *score_fn([])).to_csv(out, index=False)
+
+# =============================================================================
+# EXPLANATION & HIGHLIGHTING
+# =============================================================================
+
+def explain_reasoning(result):
+    """Human-readable reasons for an AnalysisResult"""
+    reasons = []
+    for word, score in result.contributions:
+        if score < 0:
+            reasons.append(f"🔴 ML indicates '{word}' contributes to FAKE")
+        else:
+            reasons.append(f"🟢 ML indicates '{word}' contributes to REAL")
+    if any(flag["kind"] in ("punctuation", "caps") for flag in result.flags):
+        reasons.append("⚠️ Heuristic: Excessive punctuation or all-caps detected")
+    seen = set()
+    for flag in result.flags:
+        if flag["kind"] == "clickbait" and flag["match"] not in seen:
+            seen.add(flag["match"])
+            reasons.append(f"🎯 Heuristic: Clickbait word detected '{flag['match']}'")
+    return reasons
+
+
+def highlight_suspicious(result):
+    """Wrap the unigrams and bigrams that push the verdict towards FAKE in a highlight span"""
+    if result.feature_spans is None:
+        return _highlight_words(result)
+
+    feats, starts, ends = result.feature_spans
+    suspicious = np.isin(feats, result.suspicious_features())
+    order = np.argsort(starts[suspicious], kind="stable")
+    spans = zip(starts[suspicious][order].tolist(), ends[suspicious][order].tolist())
+
+    # One left-to-right pass; overlapping spans (e.g. "big" inside "big pharma") merge
+    text = result.text
+    parts = []
+    pos = 0
+    current = None
+    for start, end in spans:
+        if current and start <= current[1]:
+            current[1] = max(current[1], end)
+            continue
+        if current:
+            parts.append(_suspicious_span(text, pos, *current))
+            pos = current[1]
+        current = [start, end]
+    if current:
+        parts.append(_suspicious_span(text, pos, *current))
+        pos = current[1]
+    parts.append(html.escape(text[pos:], quote=False))
+    return "".join(parts)
+
+
+def _suspicious_span(text, pos, start, end):
+    return (html.escape(text[pos:start], quote=False)
+            + "<span class='suspicious' title='ML signal: contributes to FAKE'>"
+            + html.escape(text[start:end], quote=False) + "</span>")
+
+
+def _highlight_words(result):
+    """Word-by-word fallback for vectorizers that cannot report spans"""
+    ml_words = {w.lower() for w in result.suspicious_words()}
+    text = result.text
+    parts = []
+    pos = 0
+    for match in re.finditer(r'\b\w+\b', text):
+        if match.group(0).lower() in ml_words:
+            parts.append(_suspicious_span(text, pos, match.start(), match.end()))
+            pos = match.end()
+    parts.append(html.escape(text[pos:], quote=False))
+    return "".join(parts)
+
+
+# =============================================================================
+# PREDICTION CACHE
+# =============================================================================
+
+def artifact_version(*paths):
+    """Short content hash of the model artifacts, used as the model version"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys"""
+    return unicodedata.normalize("NFC", str(text)).strip()
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of AnalysisResults keyed on normalized-text hash
+    plus model version, so results from older artifacts are never served.
+    """
+
+    def __init__(self, maxsize=1024, model_version=""):
+        self.maxsize = maxsize
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, text):
+        payload = f"{self.model_version}\0{normalize_text(text)}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get_or_compute(self, text, compute):
+        """Return the cached result for text, calling compute(text) on a miss"""
+        key = self.key(text)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        result = compute(text)
+        if self.maxsize <= 0:
+            return result
+
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "model_version": self.model_version,
+        }
@@ -0,0 +1,233 @@
+"""
+Specialized analyzer for the serving path.
+
+Tokenizes once and emits vocabulary indices directly: every token is
+mapped to an integer id, unigram features come from an id -> feature
+array and bigram features from a sorted array of packed (id, id) keys.
+No n-gram strings are ever built.
+
+The tables are built from the vocabulary on first use, or loaded from
+an exported artifact: compact-vocabulary exports store the token table
+as CompactVocabulary arrays and the rest as .npy files, all of which
+can be memory-mapped, so loading costs no per-term Python objects.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from compact_vocab import CompactVocabulary
+
+UNKNOWN = -1
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+TOKENS_PREFIX = "analyzer_"
+FILES = {
+    "unigram": "analyzer_unigram.npy",
+    "bigram_keys": "analyzer_bigram_keys.npy",
+    "bigram_feats": "analyzer_bigram_feats.npy",
+}
+
+
+class FastAnalyzer:
+    """Maps raw texts straight to (row, feature index) pairs for unigram/bigram vocabularies"""
+
+    def __init__(self, tokens, unigram, bigram_keys, bigram_feats, stop_words=(), lowercase=True,
+                 token_pattern=TOKEN_PATTERN):
+        """
+        tokens maps each vocabulary token to its id (a dict, or a CompactVocabulary
+        listing the tokens in id order); unigram[id] is the token's feature index
+        or -1, and bigram_keys (sorted) / bigram_feats hold the bigram features.
+        """
+        self.lowercase = lowercase
+        self.stop_words = frozenset(stop_words)
+        token_re = re.compile(token_pattern)
+        self._findall = token_re.findall
+        self._finditer = token_re.finditer
+        self._tokens = tokens
+        self.n_tokens = len(unigram)
+        self._unigram = unigram
+        self._bigram_keys = bigram_keys
+        self._bigram_feats = bigram_feats
+
+    @classmethod
+    def from_items(cls, items, stop_words=(), lowercase=True, token_pattern=TOKEN_PATTERN):
+        """Build the tables from the (term, feature index) pairs of a fitted vocabulary"""
+        stop_words = frozenset(stop_words)
+        token_ids = {}
+        unigram = []
+        pairs = []
+        for term, j in items:
+            parts = term.split(" ")
+            if len(parts) > 2:
+                raise ValueError("FastAnalyzer supports unigram and bigram vocabularies only.")
+            if any(part in stop_words for part in parts):
+                # Stop words are dropped before n-grams are formed, so this term can never match
+                continue
+            ids = []
+            for part in parts:
+                tid = token_ids.get(part)
+                if tid is None:
+                    tid = token_ids[part] = len(unigram)
+                    unigram.append(-1)
+                ids.append(tid)
+            if len(ids) == 1:
+                unigram[ids[0]] = j
+            else:
+                pairs.append((ids[0], ids[1], j))
+
+        unigram = np.asarray(unigram, dtype=np.int64)
+        if pairs:
+            pairs = np.asarray(pairs, dtype=np.int64)
+            keys = pairs[:, 0] * len(unigram) + pairs[:, 1]
+            order = np.argsort(keys)
+            bigram_keys, bigram_feats = keys[order], pairs[order, 2]
+        else:
+            bigram_keys = np.zeros(0, dtype=np.int64)
+            bigram_feats = np.zeros(0, dtype=np.int64)
+        return cls(token_ids, unigram, bigram_keys, bigram_feats, stop_words, lowercase, token_pattern)
+
+    @classmethod
+    def from_scorer(cls, scorer):
+        if tuple(scorer.ngram_range) not in ((1, 1), (1, 2)):
+            raise ValueError(f"Unsupported ngram_range: {scorer.ngram_range}")
+        return cls.from_items(scorer.vocabulary_.items(), scorer.stop_words, scorer.lowercase, scorer.token_pattern)
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, out_dir):
+        """Write the tables as .npy files; returns the file names for the manifest"""
+        tokens = self._tokens
+        if not isinstance(tokens, CompactVocabulary):
+            names = [None] * len(tokens)
+            for token, i in tokens.items():
+                names[i] = token
+            tokens = CompactVocabulary.from_terms(names)
+        files = {"tokens": tokens.save(out_dir, prefix=TOKENS_PREFIX)}
+        for key, name in FILES.items():
+            np.save(os.path.join(out_dir, name), np.asarray(getattr(self, "_" + key)))
+            files[key] = name
+        return files
+
+    @classmethod
+    def load(cls, artifact_dir, files, stop_words=(), lowercase=True, token_pattern=TOKEN_PATTERN, mmap_mode="r"):
+        tokens = CompactVocabulary.load(artifact_dir, files["tokens"], mmap_mode=mmap_mode)
+        arrays = {key: np.load(os.path.join(artifact_dir, files[key]), mmap_mode=mmap_mode) for key in FILES}
+        return cls(tokens, **arrays, stop_words=stop_words, lowercase=lowercase, token_pattern=token_pattern)
+
+    # -------------------------------------------------------------------------
+    # Analysis
+    # -------------------------------------------------------------------------
+
+    def _lookup(self, words):
+        """Token id of each word; UNKNOWN for out-of-vocabulary words"""
+        if isinstance(self._tokens, CompactVocabulary):
+            return self._tokens.lookup(words)
+        get = self._tokens.get
+        return np.fromiter((get(w, UNKNOWN) for w in words), dtype=np.int64, count=len(words))
+
+    def _words(self, text):
+        if self.lowercase:
+            text = text.lower()
+        stop_words = self.stop_words
+        return [w for w in self._findall(text) if w not in stop_words]
+
+    def token_ids(self, text):
+        """Token ids of one text with stop words removed; UNKNOWN for out-of-vocabulary tokens"""
+        return self._lookup(self._words(text))
+
+    def token_spans(self, text):
+        """
+        Token ids plus (start, end) character offsets in text, stop words removed.
+        Offsets are None when they cannot be mapped back to text.
+        """
+        lowered = text.lower() if self.lowercase else text
+        stop_words = self.stop_words
+        words, starts, ends = [], [], []
+        for m in self._finditer(lowered):
+            w = m.group()
+            if w not in stop_words:
+                words.append(w)
+                starts.append(m.start())
+                ends.append(m.end())
+        ids = self._lookup(words)
+        if len(lowered) != len(text):
+            # Some characters lowercase to several (e.g. "İ"); map offsets back per character
+            offsets = _original_offsets(text, len(lowered))
+            if offsets is None:
+                return ids, None, None
+            starts = offsets[np.asarray(starts, dtype=np.int64)].tolist()
+            ends = (offsets[np.asarray(ends, dtype=np.int64) - 1] + 1).tolist()
+        return ids, starts, ends
+
+    def _match(self, ids, rows):
+        """
+        Positions in the flat id array where a unigram or bigram feature occurs.
+        Returns (unigram positions, unigram features, bigram start positions, bigram features).
+        """
+        known = np.flatnonzero(ids >= 0)
+        uni_feats = np.asarray(self._unigram[ids[known]], dtype=np.int64)
+        keep = uni_feats >= 0
+        uni_pos, uni_feats = known[keep], uni_feats[keep]
+
+        # Adjacent pairs inside the same text form the bigrams
+        first, second = ids[:-1], ids[1:]
+        valid = np.flatnonzero((rows[:-1] == rows[1:]) & (first >= 0) & (second >= 0))
+        keys = first[valid] * self.n_tokens + second[valid]
+        pos = np.searchsorted(self._bigram_keys, keys)
+        pos[pos == len(self._bigram_keys)] = 0
+        hit = self._bigram_keys[pos] == keys if len(self._bigram_keys) else np.zeros(len(keys), dtype=bool)
+        return uni_pos, uni_feats, valid[hit], np.asarray(self._bigram_feats[pos[hit]], dtype=np.int64)
+
+    def features(self, texts):
+        """(rows, feature indices) for every unigram and bigram occurrence found in the vocabulary"""
+        lengths = []
+        words = []
+        for text in texts:
+            doc_words = self._words(text)
+            words.extend(doc_words)
+            lengths.append(len(doc_words))
+
+        # One lookup for the whole batch
+        ids = self._lookup(words)
+        rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        uni_pos, uni_feats, bi_pos, bi_feats = self._match(ids, rows)
+        return np.concatenate([rows[uni_pos], rows[bi_pos]]), np.concatenate([uni_feats, bi_feats])
+
+    def feature_spans(self, text):
+        """
+        Features of one text with the character span of each occurrence.
+        Returns (feature indices, starts, ends); starts/ends are None when
+        offsets cannot be mapped back to the original text.
+        """
+        ids, starts, ends = self.token_spans(text)
+        uni_pos, uni_feats, bi_pos, bi_feats = self._match(ids, np.zeros(len(ids), dtype=np.int64))
+        feats = np.concatenate([uni_feats, bi_feats])
+        if starts is None:
+            return feats, None, None
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        return (feats,
+                np.concatenate([starts[uni_pos], starts[bi_pos]]),
+                np.concatenate([ends[uni_pos], ends[bi_pos + 1]]))
+
+
+def _original_offsets(text, lowered_length):
+    """Index in text of every character of text.lower(); None when lowercasing is not per character"""
+    offsets = np.repeat(np.arange(len(text), dtype=np.int64), [len(c.lower()) for c in text])
+    return offsets if len(offsets) == lowered_length else None
+
+
+def check_equivalence(vectorizer, scorer, texts, tol=1e-12):
+    """True when the scorer's fast path yields the trained vectorizer's features"""
+    expected = vectorizer.transform(texts).tocsr()
+    actual = scorer.transform(texts).tocsr()
+    expected.sort_indices()
+    actual.sort_indices()
+    if not (np.array_equal(expected.indptr, actual.indptr) and np.array_equal(expected.indices, actual.indices)):
+        return False, float("inf")
+    diff = float(np.max(np.abs(expected.data - actual.data))) if expected.nnz else 0.0
+    return diff <= tol, diff
@@ -0,0 +1,98 @@
+"""
+Feature-matrix cache for training.
+
+Stores the vectorized train/test split (sparse .npz), labels, and the
+fitted TF-IDF vocabulary + idf under a key derived from the dataset
+contents, the vectorizer parameters and the split settings. A later
+training run with the same key rebuilds the vectorizer from the cache
+and skips tokenization and vectorization entirely.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+FEATURE_CACHE_DIR = os.path.join("models", "feature_cache")
+CACHE_FORMAT_VERSION = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    """sha256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def texts_digest(texts, labels):
+    """sha256 of an in-memory dataset (e.g. the built-in demo data)"""
+    digest = hashlib.sha256()
+    for text, label in zip(texts, labels):
+        digest.update(f"{label}\t{text}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_key(dataset_digest, vectorizer_params, split_params):
+    payload = json.dumps({
+        "format_version": CACHE_FORMAT_VERSION,
+        "sklearn": sklearn.__version__,
+        "dataset": dataset_digest,
+        "vectorizer": {k: repr(v) for k, v in sorted(vectorizer_params.items())},
+        "split": split_params,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_features(key, vectorizer_params, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Return (vectorizer, X_train, X_test, y_train, y_test) for key, or None on a miss.
+    The vectorizer is rebuilt from the cached vocabulary and idf, not refitted.
+    """
+    entry = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(entry, "meta.json")):
+        return None
+
+    X_train = sp.load_npz(os.path.join(entry, "X_train.npz"))
+    X_test = sp.load_npz(os.path.join(entry, "X_test.npz"))
+    labels = np.load(os.path.join(entry, "labels.npz"))
+    with open(os.path.join(entry, "vocabulary.txt"), "rb") as f:
+        terms = f.read().decode("utf-8").split("\n")
+
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms)}
+    vectorizer.fixed_vocabulary_ = False
+    vectorizer.idf_ = np.load(os.path.join(entry, "idf.npy"))
+    return vectorizer, X_train, X_test, labels["y_train"], labels["y_test"]
+
+
+def save_features(key, vectorizer, X_train, X_test, y_train, y_test, cache_dir=FEATURE_CACHE_DIR):
+    """Write one cache entry; it appears under its key only once complete"""
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, key)
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    try:
+        terms = list(vectorizer.get_feature_names_out())
+        sp.save_npz(os.path.join(tmp, "X_train.npz"), sp.csr_matrix(X_train), compressed=False)
+        sp.save_npz(os.path.join(tmp, "X_test.npz"), sp.csr_matrix(X_test), compressed=False)
+        np.savez(os.path.join(tmp, "labels.npz"), y_train=np.asarray(y_train), y_test=np.asarray(y_test))
+        np.save(os.path.join(tmp, "idf.npy"), vectorizer.idf_)
+        with open(os.path.join(tmp, "vocabulary.txt"), "wb") as f:
+            f.write("\n".join(terms).encode("utf-8"))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"format_version": CACHE_FORMAT_VERSION, "key": key, "n_features": len(terms),
+                       "n_train": X_train.shape[0], "n_test": X_test.shape[0]}, f, indent=2)
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return entry
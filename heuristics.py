@@ -0,0 +1,132 @@
+"""
+Heuristic rules engine for clickbait indicators.
+
+The lexicon (clickbait phrases, punctuation patterns, caps ratio) lives
+in heuristics.json. Phrases are compiled into one word-level
+Aho-Corasick automaton, so the normalized text is scanned once no matter
+how many phrases the lexicon holds. Every flag carries its character span.
+"""
+
+import os
+import re
+import json
+from collections import deque
+
+LEXICON_PATH = "heuristics.json"
+
+DEFAULT_LEXICON = {
+    "clickbait_phrases": ["shocking", "unbelievable", "you won't believe"],
+    "punctuation_patterns": ["!{3,}"],
+    "caps": {"min_letters": 12, "min_ratio": 0.7},
+}
+
+# Apostrophe and quote variants folded before matching ("won’t" == "won't")
+_QUOTE_TABLE = str.maketrans({
+    "’": "'", "‘": "'", "ʼ": "'", "′": "'", "`": "'",
+    "“": '"', "”": '"',
+})
+_WORD_RE = re.compile(r"\w+(?:'\w+)*")
+
+
+def normalize(text):
+    """Lowercase and fold quotes without changing the text length, so spans map back"""
+    folded = text.translate(_QUOTE_TABLE)
+    lowered = folded.lower()
+    if len(lowered) != len(folded):
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in folded)
+    return lowered
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over word tokens"""
+
+    def __init__(self, phrases):
+        self.phrases = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for phrase in phrases:
+            words = _WORD_RE.findall(normalize(phrase))
+            if not words:
+                continue
+            state = 0
+            for w in words:
+                nxt = self._goto[state].get(w)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][w] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(self.phrases), len(words)))
+            self.phrases.append(phrase)
+
+        # Breadth-first fail links; outputs inherit from their fail state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for w, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and w not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(w, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find(self, normalized):
+        """Yield (phrase, start, end) for every phrase occurrence, overlaps included"""
+        goto, fail, out = self._goto, self._fail, self._out
+        starts = []
+        state = 0
+        for m in _WORD_RE.finditer(normalized):
+            w = m.group()
+            starts.append(m.start())
+            while state and w not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(w, 0)
+            for pid, n_words in out[state]:
+                yield self.phrases[pid], starts[-n_words], m.end()
+
+
+class HeuristicEngine:
+    """Scans text once for clickbait phrases, punctuation patterns and shouting"""
+
+    def __init__(self, lexicon=None):
+        lexicon = lexicon or DEFAULT_LEXICON
+        self.automaton = PhraseAutomaton(lexicon.get("clickbait_phrases", []))
+        patterns = lexicon.get("punctuation_patterns", [])
+        self.punctuation_re = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+        caps = lexicon.get("caps", {})
+        self.caps_min_letters = caps.get("min_letters", 12)
+        self.caps_min_ratio = caps.get("min_ratio", 0.7)
+
+    @classmethod
+    def from_file(cls, path=LEXICON_PATH):
+        """Load the lexicon from JSON, falling back to the built-in defaults"""
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        return cls(DEFAULT_LEXICON)
+
+    def scan(self, text):
+        """All heuristic flags as dicts with kind, match and span"""
+        flags = []
+
+        if self.punctuation_re is not None:
+            for m in self.punctuation_re.finditer(text):
+                flags.append({"kind": "punctuation", "match": m.group(), "span": m.span()})
+
+        upper = sum(map(str.isupper, text))
+        letters = upper + sum(map(str.islower, text))
+        if letters and (text.isupper() or (letters >= self.caps_min_letters and upper / letters >= self.caps_min_ratio)):
+            flags.append({"kind": "caps", "match": None, "span": None, "ratio": upper / letters})
+
+        for phrase, start, end in self.automaton.find(normalize(text)):
+            flags.append({"kind": "clickbait", "match": phrase, "span": (start, end)})
+
+        return flags
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Numpy-only scorer for the TF-IDF + Logistic Regression model.
+
+Holds just the vocabulary, IDF weights, coefficients and intercept, and
+computes the sigmoid directly. It exposes the same transform/predict_proba
+interface as the sklearn pair, so it can be passed to detector.analyze in
+place of both the vectorizer and the model.
+
+Artifacts are a directory of .npy arrays, a vocabulary file and a JSON
+manifest, loadable with np.load(mmap_mode="r") so processes share one
+page-cached copy and never unpickle anything. The served export lives in
+models/scorer/; save_scorer builds a directory next to the target and
+swaps it in, so a re-export never leaves files of the previous one.
+
+Serving artifacts can be made smaller with prune_features (drop features
+whose |coef| is below a tolerance) and quantize (float16, or int8 plus a
+scale factor, for the stored coefficients); compare_scorers reports the
+effect on verdicts, probabilities and accuracy.
+
+Usage:
+  python linear_scorer.py                    # Check probabilities against sklearn on the sample data
+  python linear_scorer.py --export models/scorer   # Export vectorizer.pkl + fake_news_model.pkl for serving
+  python linear_scorer.py --export DIR --compact-vocab   # ...with the array-backed vocabulary
+  python linear_scorer.py --export DIR --prune-tol 0.05 --coef-dtype int8   # Pruned, quantized, with a report
+  python linear_scorer.py --vectorizer models/vectorizer.pkl --model models/fake_news_model.pkl \
+      --publish --prune-tol 0.05 --coef-dtype int8   # Compress train_model.py output into the registry
+  python linear_scorer.py --version 8cd599793ed4 --publish --coef-dtype float16 --no-activate
+                                             # Compress a published version; activate with model_registry.py use
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+
+from compact_vocab import CompactVocabulary
+from fast_analyzer import FastAnalyzer
+
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+ARTIFACT_FORMAT = "linear-scorer"
+ARTIFACT_FORMAT_VERSION = 3  # 2 adds coef_dtype/coef_scale, 3 the analyzer tables of compact exports
+FAST_NGRAM_RANGES = ((1, 1), (1, 2))
+MANIFEST_FILE = "manifest.json"
+COEF_DTYPES = ("float64", "float32", "float16", "int8")
+
+
+class LinearScorer:
+    """Compiled TfidfVectorizer + LogisticRegression for serving"""
+
+    def __init__(self, vocabulary, idf, coef, intercept, stop_words=(),
+                 ngram_range=(1, 2), lowercase=True, token_pattern=TOKEN_PATTERN,
+                 sublinear_tf=False, norm="l2", coef_dtype="float64"):
+        self.vocabulary_ = vocabulary
+        self.idf_ = np.ascontiguousarray(idf, dtype=np.float64)
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64).reshape(1, -1)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64).reshape(1)
+        self.stop_words = frozenset(stop_words)
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.coef_dtype = coef_dtype  # Storage type of coef.npy; coef_ itself is always float64
+        self.classes_ = np.array([0, 1])
+        self._token_re = re.compile(token_pattern)
+        self._feature_names = None
+        self._fast_analyzer = None
+        self.model_version = None
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model):
+        """Export a fitted TfidfVectorizer/LogisticRegression pair"""
+        if vectorizer.analyzer != "word" or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            raise ValueError("Only the default word analyzer can be compiled.")
+        if vectorizer.strip_accents is not None:
+            raise ValueError("strip_accents is not supported by the compiled scorer.")
+        if vectorizer.norm not in ("l2", None):
+            raise ValueError(f"Unsupported norm: {vectorizer.norm}")
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary models can be compiled.")
+        idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vectorizer.vocabulary_))
+        return cls(
+            vocabulary={term: int(i) for term, i in vectorizer.vocabulary_.items()},
+            idf=idf,
+            coef=model.coef_[0],
+            intercept=model.intercept_[0],
+            stop_words=vectorizer.get_stop_words() or (),
+            ngram_range=vectorizer.ngram_range,
+            lowercase=vectorizer.lowercase,
+            token_pattern=vectorizer.token_pattern,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm,
+        )
+
+    # -------------------------------------------------------------------------
+    # Vectorizer interface
+    # -------------------------------------------------------------------------
+
+    def get_feature_names_out(self):
+        if isinstance(self.vocabulary_, CompactVocabulary):
+            return self.vocabulary_.terms()
+        if self._feature_names is None:
+            names = np.empty(len(self.vocabulary_), dtype=object)
+            for term, i in self.vocabulary_.items():
+                names[i] = term
+            self._feature_names = names
+        return self._feature_names
+
+    def build_analyzer(self):
+        """Same terms as sklearn's word analyzer: tokens, stop words removed, then n-grams"""
+        min_n, max_n = self.ngram_range
+        stop_words = self.stop_words
+        findall = self._token_re.findall
+        lowercase = self.lowercase
+
+        def analyze(doc):
+            if lowercase:
+                doc = doc.lower()
+            tokens = [w for w in findall(doc) if w not in stop_words]
+            if max_n == 1:
+                return tokens
+            terms = list(tokens) if min_n == 1 else []
+            n_tokens = len(tokens)
+            for n in range(max(min_n, 2), min(max_n, n_tokens) + 1):
+                for i in range(n_tokens - n + 1):
+                    terms.append(" ".join(tokens[i:i + n]))
+            return terms
+
+        return analyze
+
+    def lookup(self, terms):
+        """Feature index for each term, -1 when out of vocabulary"""
+        if isinstance(self.vocabulary_, CompactVocabulary):
+            return self.vocabulary_.lookup(terms)
+        get = self.vocabulary_.get
+        return np.fromiter((get(t, -1) for t in terms), dtype=np.int64, count=len(terms))
+
+    def _analyzer(self):
+        """
+        FastAnalyzer for unigram/bigram vocabularies, or None to look up n-gram strings.
+        Dict vocabularies build it on first use; compact ones only use the tables
+        loaded from the artifact, since building them would create an object per term.
+        """
+        if (self._fast_analyzer is None and tuple(self.ngram_range) in FAST_NGRAM_RANGES
+                and not isinstance(self.vocabulary_, CompactVocabulary)):
+            self._fast_analyzer = FastAnalyzer.from_scorer(self)
+        return self._fast_analyzer
+
+    def _features(self, texts):
+        """(rows, feature indices) of every in-vocabulary term occurrence"""
+        analyzer = self._analyzer()
+        if analyzer is not None:
+            return analyzer.features(texts)
+
+        analyze = self.build_analyzer()
+        terms = []
+        lengths = []
+        for text in texts:
+            doc_terms = analyze(text)
+            terms.extend(doc_terms)
+            lengths.append(len(doc_terms))
+        rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        indices = self.lookup(terms)
+        known = indices >= 0
+        return rows[known], indices[known]
+
+    def _tfidf(self, rows, indices, n_rows):
+        """L2-normalized TF-IDF CSR matrix from (row, feature) occurrences"""
+        n_features = len(self.vocabulary_)
+        # Count (row, feature) pairs; unique keys come out sorted by row, then feature
+        keys, counts = np.unique(rows * n_features + indices, return_counts=True)
+        rows = keys // n_features
+        indices = (keys % n_features).astype(np.int32 if n_features < 2**31 else np.int64)
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+
+        values = counts.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf_[indices]
+        if self.norm == "l2" and len(values):
+            norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_rows))
+            values /= norms[rows]
+        return sparse.csr_matrix((values, indices, indptr), shape=(n_rows, n_features))
+
+    def transform(self, texts):
+        """Sparse TF-IDF matrix, one row per text"""
+        if isinstance(texts, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        texts = list(texts)
+        rows, indices = self._features(texts)
+        return self._tfidf(rows, indices, len(texts))
+
+    def transform_with_spans(self, text):
+        """
+        One-row TF-IDF matrix plus the character span of every feature occurrence,
+        from a single tokenization pass. Spans are None when they are unavailable.
+        """
+        analyzer = self._analyzer()
+        if analyzer is None:
+            return self.transform([text]), None
+        feats, starts, ends = analyzer.feature_spans(text)
+        X = self._tfidf(np.zeros(len(feats), dtype=np.int64), feats, 1)
+        return X, (None if starts is None else (feats, starts, ends))
+
+    # -------------------------------------------------------------------------
+    # Model interface
+    # -------------------------------------------------------------------------
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef_[0]).ravel() + self.intercept_[0]
+
+    def predict_proba(self, X):
+        prob = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - prob, prob])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+
+# =============================================================================
+# PRUNING & QUANTIZATION
+# =============================================================================
+
+def _with_arrays(scorer, vocabulary, idf, coef, coef_dtype):
+    return LinearScorer(
+        vocabulary=vocabulary,
+        idf=idf,
+        coef=coef,
+        intercept=scorer.intercept_[0],
+        stop_words=scorer.stop_words,
+        ngram_range=scorer.ngram_range,
+        lowercase=scorer.lowercase,
+        token_pattern=scorer.token_pattern,
+        sublinear_tf=scorer.sublinear_tf,
+        norm=scorer.norm,
+        coef_dtype=coef_dtype,
+    )
+
+
+def prune_features(scorer, tol):
+    """
+    Scorer without the features whose |coef| < tol. Pruned terms no longer
+    count towards the L2 norm either, so probabilities shift slightly;
+    compare_scorers measures by how much.
+    """
+    coef = scorer.coef_[0]
+    keep = np.flatnonzero(np.abs(coef) >= tol)
+    terms = [str(t) for t in np.asarray(scorer.get_feature_names_out(), dtype=object)[keep]]
+    if isinstance(scorer.vocabulary_, CompactVocabulary):
+        vocabulary = CompactVocabulary.from_terms(terms)
+    else:
+        vocabulary = {term: i for i, term in enumerate(terms)}
+    return _with_arrays(scorer, vocabulary, scorer.idf_[keep], coef[keep], scorer.coef_dtype)
+
+
+def quantize_coef(coef, coef_dtype="float64"):
+    """(stored array, scale); int8 stores round(coef / scale) with scale = max|coef| / 127"""
+    if coef_dtype not in COEF_DTYPES:
+        raise ValueError(f"Unsupported coef_dtype: {coef_dtype}")
+    coef = np.asarray(coef, dtype=np.float64)
+    if coef_dtype != "int8":
+        return coef.astype(coef_dtype), 1.0
+    peak = float(np.max(np.abs(coef))) if len(coef) else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    return np.clip(np.round(coef / scale), -127, 127).astype(np.int8), scale
+
+
+def dequantize_coef(stored, scale=1.0):
+    if stored.dtype == np.float64 and scale == 1.0:
+        return stored  # Keeps a memory-mapped array shared
+    return np.asarray(stored, dtype=np.float64) * scale
+
+
+def quantize(scorer, coef_dtype):
+    """Scorer whose coefficients are rounded to what coef_dtype can store"""
+    coef = dequantize_coef(*quantize_coef(scorer.coef_[0], coef_dtype))
+    quantized = _with_arrays(scorer, scorer.vocabulary_, scorer.idf_, coef, coef_dtype)
+    quantized._fast_analyzer = scorer._fast_analyzer  # Same vocabulary, same tables
+    return quantized
+
+
+def artifact_bytes(scorer):
+    """Bytes of idf, stored coefficients and the text vocabulary"""
+    terms = scorer.get_feature_names_out()
+    vocab = sum(len(t.encode("utf-8")) + 1 for t in terms)
+    return scorer.idf_.nbytes + len(terms) * np.dtype(scorer.coef_dtype).itemsize + vocab
+
+
+def compare_scorers(reference, candidate, texts, labels=None, repeats=3):
+    """Verdict agreement, probability shift, accuracy and throughput of candidate vs reference"""
+    texts = list(texts)
+    report = {"texts": len(texts)}
+    probs = {}
+    for name, scorer in (("reference", reference), ("candidate", candidate)):
+        scorer.predict_proba(scorer.transform(texts[:1]))  # Builds the analyzer outside the timing
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            p = scorer.predict_proba(scorer.transform(texts))[:, 1]
+            best = min(best, time.perf_counter() - start)
+        probs[name] = p
+        report[name] = {
+            "n_features": len(scorer.vocabulary_),
+            "coef_dtype": scorer.coef_dtype,
+            "bytes": artifact_bytes(scorer),
+            "texts_per_sec": len(texts) / best if best > 0 else 0.0,
+        }
+        if labels is not None:
+            report[name]["accuracy"] = float(np.mean((p >= 0.5).astype(int) == np.asarray(labels)))
+
+    shift = np.abs(probs["candidate"] - probs["reference"])
+    report.update({
+        "verdict_agreement": float(np.mean((probs["candidate"] >= 0.5) == (probs["reference"] >= 0.5))),
+        "max_abs_shift": float(np.max(shift)) if len(shift) else 0.0,
+        "mean_abs_shift": float(np.mean(shift)) if len(shift) else 0.0,
+    })
+    return report
+
+
+# =============================================================================
+# ARTIFACT DIRECTORY
+# =============================================================================
+
+def _settings(scorer):
+    return {
+        "stop_words": sorted(scorer.stop_words),
+        "ngram_range": list(scorer.ngram_range),
+        "lowercase": scorer.lowercase,
+        "token_pattern": scorer.token_pattern,
+        "sublinear_tf": scorer.sublinear_tf,
+        "norm": scorer.norm,
+    }
+
+
+def save_scorer(scorer, out_dir, compact_vocab=False, meta=None):
+    """
+    Write the scorer as idf.npy, coef.npy, a vocabulary and manifest.json.
+    The vocabulary is vocabulary.txt, or CompactVocabulary arrays plus the
+    FastAnalyzer tables when compact_vocab is set, so loading never walks
+    the terms; coef.npy is stored as scorer.coef_dtype. meta is
+    merged into the manifest. Files are written to a temp directory next
+    to out_dir that then replaces it, so out_dir holds either the old or
+    the new export, never a mix.
+    """
+    terms = list(scorer.get_feature_names_out())
+    if any("\n" in t for t in terms):
+        raise ValueError("Vocabulary terms must not contain newlines.")
+    vocab_bytes = "\n".join(terms).encode("utf-8")
+    settings = _settings(scorer)
+    intercept = float(scorer.intercept_[0])
+    coef, coef_scale = quantize_coef(scorer.coef_[0], scorer.coef_dtype)
+
+    digest = hashlib.sha256()
+    digest.update(scorer.idf_.tobytes())
+    digest.update(scorer.coef_[0].tobytes())
+    if scorer.coef_dtype != "float64":
+        digest.update(f"{scorer.coef_dtype}:{coef_scale!r}".encode())
+    digest.update(repr(intercept).encode())
+    digest.update(vocab_bytes)
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+
+    out_dir = os.path.normpath(out_dir)
+    parent = os.path.dirname(out_dir) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{os.path.basename(out_dir)}-", dir=parent)
+    try:
+        manifest = _write_artifacts(scorer, tmp, compact_vocab, meta, terms, vocab_bytes, settings,
+                                    intercept, coef, coef_scale, digest.hexdigest()[:12])
+        _swap_in(tmp, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    scorer.model_version = manifest["model_version"]
+    return manifest
+
+
+def _write_artifacts(scorer, out_dir, compact_vocab, meta, terms, vocab_bytes, settings, intercept, coef,
+                     coef_scale, model_version):
+    np.save(os.path.join(out_dir, "idf.npy"), scorer.idf_)
+    np.save(os.path.join(out_dir, "coef.npy"), coef)
+    files = {"idf": "idf.npy", "coef": "coef.npy"}
+    if compact_vocab:
+        vocab = scorer.vocabulary_
+        if not isinstance(vocab, CompactVocabulary):
+            vocab = CompactVocabulary.from_terms(terms)
+        files.update(vocab.save(out_dir))
+        if tuple(scorer.ngram_range) in FAST_NGRAM_RANGES:
+            analyzer = scorer._fast_analyzer or FastAnalyzer.from_items(
+                ((term, i) for i, term in enumerate(terms)), scorer.stop_words, scorer.lowercase, scorer.token_pattern)
+            files["analyzer"] = analyzer.save(out_dir)
+    else:
+        with open(os.path.join(out_dir, "vocabulary.txt"), "wb") as f:
+            f.write(vocab_bytes)
+        files["vocabulary"] = "vocabulary.txt"
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": model_version,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "n_features": len(terms),
+        "intercept": intercept,
+        "coef_dtype": scorer.coef_dtype,
+        "coef_scale": coef_scale,
+        "vocabulary_format": "compact" if compact_vocab else "text",
+        "files": files,
+        **settings,
+        **(meta or {}),
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _swap_in(tmp, out_dir):
+    """Replace out_dir with the finished tmp directory"""
+    if not os.path.exists(out_dir):
+        os.replace(tmp, out_dir)
+        return
+    # A non-empty directory cannot be replaced in one rename: move the old one aside first
+    old = f"{tmp}.old"
+    os.replace(out_dir, old)
+    try:
+        os.replace(tmp, out_dir)
+    except BaseException:
+        os.replace(old, out_dir)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_scorer(artifact_dir, mmap_mode="r"):
+    """Load a scorer written by save_scorer; arrays are memory-mapped by default"""
+    with open(os.path.join(artifact_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Not a linear scorer artifact: {artifact_dir}")
+    if manifest.get("format_version") not in range(1, ARTIFACT_FORMAT_VERSION + 1):
+        raise ValueError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+
+    files = manifest["files"]
+    idf = np.load(os.path.join(artifact_dir, files["idf"]), mmap_mode=mmap_mode)
+    coef = dequantize_coef(np.load(os.path.join(artifact_dir, files["coef"]), mmap_mode=mmap_mode),
+                           manifest.get("coef_scale", 1.0))
+    if manifest.get("vocabulary_format", "text") == "compact":
+        vocabulary = CompactVocabulary.load(artifact_dir, files, mmap_mode=mmap_mode)
+    else:
+        with open(os.path.join(artifact_dir, files["vocabulary"]), encoding="utf-8") as f:
+            text = f.read()
+        terms = text.split("\n") if text else []
+        vocabulary = {term: i for i, term in enumerate(terms)}
+    if len(vocabulary) != manifest["n_features"]:
+        raise ValueError(f"Vocabulary has {len(vocabulary)} terms, manifest expects {manifest['n_features']}")
+
+    scorer = LinearScorer(
+        vocabulary=vocabulary,
+        idf=idf,
+        coef=coef,
+        intercept=manifest["intercept"],
+        stop_words=manifest["stop_words"],
+        ngram_range=manifest["ngram_range"],
+        lowercase=manifest["lowercase"],
+        token_pattern=manifest["token_pattern"],
+        sublinear_tf=manifest["sublinear_tf"],
+        norm=manifest["norm"],
+        coef_dtype=manifest.get("coef_dtype", "float64"),
+    )
+    if "analyzer" in files:
+        scorer._fast_analyzer = FastAnalyzer.load(artifact_dir, files["analyzer"], scorer.stop_words,
+                                                  scorer.lowercase, scorer.token_pattern, mmap_mode=mmap_mode)
+    scorer.model_version = manifest["model_version"]
+    return scorer
+
+
+def check_against_sklearn(vectorizer, model, texts, tol=1e-9):
+    """Largest probability difference between the compiled scorer and sklearn"""
+    scorer = LinearScorer.from_sklearn(vectorizer, model)
+    expected = model.predict_proba(vectorizer.transform(texts))[:, 1]
+    actual = scorer.predict_proba(scorer.transform(texts))[:, 1]
+    diff = float(np.max(np.abs(expected - actual))) if len(texts) else 0.0
+    return diff, diff <= tol
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    import detector
+    from model_registry import REGISTRY_DIR, publish, version_dir
+    from train_model import DEMO_FAKE, DEMO_REAL
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--export", metavar="DIR", help="Write the pickled model as an artifact directory")
+    parser.add_argument("--publish", action="store_true", help="Publish the (compressed) scorer to the registry")
+    parser.add_argument("--no-activate", action="store_true", help="With --publish, leave CURRENT unchanged")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="Registry for --version and --publish")
+    parser.add_argument("--version", help="Start from this published registry version instead of the pickles")
+    parser.add_argument("--vectorizer", default=detector.VECTOR_PATH, help="Pickled vectorizer to export or check")
+    parser.add_argument("--model", default=detector.MODEL_PATH, help="Pickled model to export or check")
+    parser.add_argument("--compact-vocab", action="store_true", help="Export the vocabulary as hash-table arrays")
+    parser.add_argument("--prune-tol", type=float, default=0.0,
+                        help="With --export/--publish, drop features whose |coef| is below this value")
+    parser.add_argument("--coef-dtype", choices=COEF_DTYPES, default="float64",
+                        help="With --export/--publish, storage type of the coefficients (int8 adds a scale factor)")
+    parser.add_argument("--eval", metavar="CSV", help="Labeled CSV for the export report (default: demo data)")
+    args = parser.parse_args()
+    if args.version and not (args.export or args.publish):
+        parser.error("--version needs --export or --publish")
+
+    if args.export or args.publish:
+        if args.version:
+            version_path = version_dir(args.version, args.registry)
+            if not os.path.exists(os.path.join(version_path, MANIFEST_FILE)):
+                parser.error(f"No such model version in {args.registry}: {args.version}")
+            full = load_scorer(version_path)
+            # Lets the registry listing show which version this one was compressed from
+            source = {"source_model_version": full.model_version}
+        else:
+            full = LinearScorer.from_sklearn(*detector.load_artifacts(args.vectorizer, args.model))
+            # Lets load_serving_scorer notice when the pickles are retrained after this export
+            source = {"source_version": detector.artifact_version(args.vectorizer, args.model)}
+        scorer = quantize(prune_features(full, args.prune_tol), args.coef_dtype)
+        meta = None
+        if args.prune_tol > 0 or args.coef_dtype != "float64":
+            from train_model import get_demo_data, load_csv
+            eval_df = load_csv(args.eval) if args.eval else get_demo_data()
+            report = compare_scorers(full, scorer, eval_df["text"].astype(str).tolist(), eval_df["label"].to_numpy())
+            ref, cand = report["reference"], report["candidate"]
+            print(f"Features: {ref['n_features']:,} → {cand['n_features']:,} • "
+                  f"size {ref['bytes'] / 1024:,.1f} KB → {cand['bytes'] / 1024:,.1f} KB • "
+                  f"{ref['texts_per_sec']:,.0f} → {cand['texts_per_sec']:,.0f} texts/s")
+            print(f"Accuracy: {ref['accuracy']:.2%} → {cand['accuracy']:.2%} on {report['texts']} texts • "
+                  f"verdict agreement {report['verdict_agreement']:.2%} • "
+                  f"|Δp| mean {report['mean_abs_shift']:.4f} max {report['max_abs_shift']:.4f}")
+            meta = {"compression": {"prune_tol": args.prune_tol, "full_n_features": ref["n_features"],
+                                    "verdict_agreement": report["verdict_agreement"],
+                                    "max_abs_shift": report["max_abs_shift"]}}
+        meta = {**(meta or {}), **source}
+        if args.export:
+            manifest = save_scorer(scorer, args.export, args.compact_vocab, meta)
+            print(f"Saved: {args.export} (model version {manifest['model_version']})")
+        if args.publish:
+            manifest = publish(scorer, args.registry, args.compact_vocab, meta, make_current=not args.no_activate)
+            print(f"Published {manifest['model_version']} to {args.registry}"
+                  f"{'' if args.no_activate else ' (now current)'}")
+    else:
+        vectorizer, model = detector.load_artifacts(args.vectorizer, args.model)
+        texts = list(DEMO_FAKE) + list(DEMO_REAL)
+        for path in ["booth_samples.csv", "auto_booth_combined.csv"]:
+            texts += pd.read_csv(path)["text"].fillna("").astype(str).tolist()
+
+        diff, ok = check_against_sklearn(vectorizer, model, texts)
+        print(f"Compared {len(texts)} texts • max |Δp| = {diff:.2e}")
+        print("✅ Compiled scorer matches sklearn" if ok else "❌ Compiled scorer differs from sklearn")
@@ -0,0 +1,462 @@
+"""
+LLM clients for the Fake News Detector, usable without Streamlit.
+
+Hugging Face (cloud) and Ollama (local) chat calls with a hybrid
+fallback, plus the confidence-gated cascade that asks the LLM for a
+second opinion on borderline batch rows. chatbot.py wraps these for the
+app and adds the Streamlit secrets lookup for the Hugging Face token.
+"""
+
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from dotenv import load_dotenv
+
+from microbatch import Histogram
+
+# Load .env (for local development)
+load_dotenv()
+
+# Cascade: only probabilities inside the band get an LLM second opinion
+CASCADE_BAND = (float(os.getenv("CASCADE_LOW", "0.35")), float(os.getenv("CASCADE_HIGH", "0.65")))
+CASCADE_MAX_CONCURRENCY = int(os.getenv("CASCADE_MAX_CONCURRENCY", "4"))
+LLM_LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Circuit breaker: after this many consecutive failed LLM calls, stop calling for the cooldown
+CIRCUIT_BREAKER_FAILURES = int(os.getenv("CASCADE_BREAKER_FAILURES", "3"))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CASCADE_BREAKER_COOLDOWN", "60"))
+
+# verdict_source values in batch results
+SOURCE_MODEL = "model"
+SOURCE_LLM = "llm"
+SOURCE_LLM_OVERRIDE = "llm_override"
+
+HF_API_URL = "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
+OLLAMA_URL = "http://localhost:11434"
+
+
+# =============================================================================
+# CLOUD AI - HUGGING FACE
+# =============================================================================
+
+def chat_with_huggingface(message, context="", token=None):
+    """
+    Chat using Hugging Face API (cloud-based)
+    token defaults to the HF_TOKEN environment variable
+    Returns structured response dict
+    """
+
+    HF_TOKEN = token or os.getenv("HF_TOKEN")
+
+    if not HF_TOKEN:
+        return {
+            "success": False,
+            "response": None,
+            "error": "Hugging Face token not configured."
+        }
+
+    headers = {"Authorization": f"Bearer {HF_TOKEN}"}
+
+    system_prompt = """
+You are a media literacy assistant.
+Your role:
+- Explain misinformation clearly
+- Encourage verification
+- Avoid certainty claims
+- Keep responses concise (max 3 paragraphs)
+
+Never claim information is 100% true or false.
+Always encourage cross-checking with reliable sources.
+"""
+
+    if context:
+        system_prompt += f"\n\nContext from analysis:\n{context}"
+
+    full_prompt = f"{system_prompt}\n\nUser: {message}\n\nAssistant:"
+
+    payload = {
+        "inputs": full_prompt,
+        "parameters": {
+            "max_new_tokens": 300,
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "return_full_text": False
+        }
+    }
+
+    # Retry logic (3 attempts)
+    for attempt in range(3):
+        try:
+            response = requests.post(
+                HF_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=30
+            )
+
+            # Model loading
+            if response.status_code == 503:
+                time.sleep(5)
+                continue
+
+            response.raise_for_status()
+            result = response.json()
+
+            if isinstance(result, list) and len(result) > 0:
+                generated_text = result[0].get("generated_text", "").strip()
+            elif isinstance(result, dict):
+                generated_text = result.get("generated_text", "").strip()
+            else:
+                return {
+                    "success": False,
+                    "response": None,
+                    "error": "Unexpected API response format."
+                }
+
+            return {
+                "success": True,
+                "response": generated_text,
+                "error": None
+            }
+
+        except requests.exceptions.Timeout:
+            if attempt < 2:
+                time.sleep(3)
+                continue
+            return {
+                "success": False,
+                "response": None,
+                "error": "Request timed out."
+            }
+
+        except requests.exceptions.HTTPError as e:
+            return {
+                "success": False,
+                "response": None,
+                "error": f"HTTP Error {e.response.status_code}"
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "response": None,
+                "error": str(e)
+            }
+
+    return {
+        "success": False,
+        "response": None,
+        "error": "Model loading timeout."
+    }
+
+
+# =============================================================================
+# LOCAL AI - OLLAMA
+# =============================================================================
+
+def is_ollama_available():
+    try:
+        response = requests.get(f"{OLLAMA_URL}/api/tags", timeout=2)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+def chat_with_ollama(message, context=""):
+    """
+    Chat using local Ollama
+    Returns structured response dict
+    """
+
+    if not is_ollama_available():
+        return {
+            "success": False,
+            "response": None,
+            "error": "Ollama not running."
+        }
+
+    system_prompt = """
+You are a media literacy assistant.
+Keep responses concise and educational.
+"""
+
+    if context:
+        system_prompt += f"\n\nContext:\n{context}"
+
+    full_prompt = f"{system_prompt}\n\nUser: {message}\n\nAssistant:"
+
+    payload = {
+        "model": "llama3.2:3b",
+        "prompt": full_prompt,
+        "stream": False,
+        "options": {
+            "temperature": 0.7,
+            "num_predict": 300
+        }
+    }
+
+    try:
+        response = requests.post(f"{OLLAMA_URL}/api/generate", json=payload, timeout=60)
+        response.raise_for_status()
+
+        result = response.json()
+
+        return {
+            "success": True,
+            "response": result.get("response", ""),
+            "error": None
+        }
+
+    except requests.exceptions.Timeout:
+        return {
+            "success": False,
+            "response": None,
+            "error": "Ollama timeout."
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "response": None,
+            "error": str(e)
+        }
+
+
+# =============================================================================
+# HYBRID SYSTEM WITH CLEAN FALLBACK
+# =============================================================================
+
+def get_ai_response(message, context="", prefer_local=False, token=None):
+    """
+    Hybrid AI system with structured fallback
+    Returns (text_response, source_label); failed sources contain "failed"
+    """
+
+    if prefer_local:
+
+        # Try local first
+        local_response = chat_with_ollama(message, context)
+
+        if local_response["success"]:
+            return local_response["response"], "local"
+
+        # Fallback to cloud
+        cloud_response = chat_with_huggingface(message, context, token)
+
+        if cloud_response["success"]:
+            return cloud_response["response"], "cloud (fallback)"
+
+        return cloud_response["error"], "cloud (fallback failed)"
+
+    else:
+
+        # Try cloud first
+        cloud_response = chat_with_huggingface(message, context, token)
+
+        if cloud_response["success"]:
+            return cloud_response["response"], "cloud"
+
+        # Fallback to local
+        local_response = chat_with_ollama(message, context)
+
+        if local_response["success"]:
+            return local_response["response"], "local (fallback)"
+
+        return cloud_response["error"], "cloud (failed)"
+
+
+# =============================================================================
+# CONFIDENCE-GATED CASCADE
+# =============================================================================
+
+_VERDICT_TOKEN_RE = re.compile(r"\bVERDICT\s*:\s*\**\s*(REAL|FAKE)\b", re.IGNORECASE)
+_VERDICT_LINE_RE = re.compile(r"^[\W_]*(REAL|FAKE)[\W_]*$", re.IGNORECASE)
+
+
+def parse_llm_verdict(response):
+    """
+    REAL/FAKE from a "VERDICT: X" token, or from a first line that holds
+    nothing but the verdict word; None otherwise (including when the
+    response contains conflicting VERDICT tokens)
+    """
+    response = response or ""
+    tokens = {v.upper() for v in _VERDICT_TOKEN_RE.findall(response)}
+    if tokens:
+        return tokens.pop() if len(tokens) == 1 else None
+
+    first_line = next((line.strip() for line in response.splitlines() if line.strip()), "")
+    match = _VERDICT_LINE_RE.match(first_line)
+    return match.group(1).upper() if match else None
+
+
+def ask_llm_verdict(text, probability, prefer_local=False, token=None):
+    """
+    Ask the LLM for a REAL/FAKE second opinion on one text
+    Returns (label or None, response text, source label)
+    """
+
+    context = f"""
+Analyzed text (excerpt):
+"{text[:500]}"
+
+A fast statistical model is unsure about this text (probability of real news: {probability:.2f}).
+"""
+
+    question = """
+Is this text more likely REAL or FAKE news?
+Answer with exactly "VERDICT: REAL" or "VERDICT: FAKE" on the first line, then one sentence explaining why.
+"""
+
+    response, source = get_ai_response(question, context, prefer_local, token)
+
+    if "failed" in source:
+        return None, response, source
+
+    return parse_llm_verdict(response), response, source
+
+
+class LLMCascade:
+    """
+    Two-tier scoring: the linear model scores every text, and only texts
+    whose probability falls inside band are sent to the LLM. At most
+    max_concurrency LLM calls are in flight, across all score() calls.
+    After breaker_failures consecutive failed calls the LLM is skipped for
+    breaker_cooldown seconds, and borderline rows keep the linear verdict.
+    score(texts) -> (labels, probs, verdict_sources) can be passed anywhere
+    a score_fn is accepted (e.g. detector.stream_score_csv).
+    """
+
+    def __init__(self, score_fn, band=CASCADE_BAND, max_concurrency=CASCADE_MAX_CONCURRENCY,
+                 prefer_local=False, llm_fn=None, token=None,
+                 breaker_failures=CIRCUIT_BREAKER_FAILURES, breaker_cooldown=CIRCUIT_BREAKER_COOLDOWN):
+        self.score_fn = score_fn
+        self.band = (float(band[0]), float(band[1]))
+        self.max_concurrency = max_concurrency
+        self.llm_fn = llm_fn or (lambda text, prob: ask_llm_verdict(text, prob, prefer_local, token))
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-cascade")
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._tiers = {
+            "linear": {"items": 0, "seconds": 0.0},
+            "llm": {"items": 0, "seconds": 0.0, "answered": 0, "failed": 0, "skipped": 0,
+                    "overridden": 0, "breaker_trips": 0},
+        }
+        self._llm_latency = Histogram(LLM_LATENCY_BUCKETS_MS)
+
+    @property
+    def breaker_open(self):
+        return time.monotonic() < self._open_until
+
+    def _ask(self, text, prob):
+        """(label or None, source); source is "skipped" while the breaker is open"""
+        if self.breaker_open:
+            return None, "skipped"
+
+        start = time.perf_counter()
+        try:
+            label, _, source = self.llm_fn(text, prob)
+        except Exception:
+            label, source = None, "error"
+        self._llm_latency.observe((time.perf_counter() - start) * 1000)
+
+        # Unparseable answers still show the LLM is reachable; only failed calls count
+        failed = source == "error" or "failed" in source
+        with self._lock:
+            if not failed:
+                self._consecutive_failures = 0
+            else:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.breaker_failures and not self.breaker_open:
+                    self._open_until = time.monotonic() + self.breaker_cooldown
+                    self._consecutive_failures = 0
+                    self._tiers["llm"]["breaker_trips"] += 1
+        return label, source
+
+    def score_detailed(self, texts):
+        """
+        (labels, probs, verdict_sources, llm_sources): labels are the LLM
+        verdict where it answered, else the linear one; probs always come
+        from the linear model. verdict_sources says where each label came
+        from – "model", "llm" (agreed with the model) or "llm_override"
+        (changed the verdict, so the label no longer follows probs);
+        llm_sources is the LLM source label, "" for rows not sent to it.
+        """
+        texts = list(texts)
+
+        start = time.perf_counter()
+        labels, probs = self.score_fn(texts)[:2]
+        linear_seconds = time.perf_counter() - start
+
+        labels = np.array(labels, dtype=object)
+        verdict_sources = np.full(len(texts), SOURCE_MODEL, dtype=object)
+        llm_sources = np.full(len(texts), "", dtype=object)
+        low, high = self.band
+        uncertain = np.flatnonzero((probs >= low) & (probs <= high))
+
+        start = time.perf_counter()
+        futures = [self._pool.submit(self._ask, texts[i], float(probs[i])) for i in uncertain]
+        answered = failed = skipped = overridden = 0
+        for i, future in zip(uncertain, futures):
+            label, source = future.result()
+            llm_sources[i] = source
+            if source == "skipped":
+                skipped += 1
+            elif label is None:
+                failed += 1
+            else:
+                answered += 1
+                if label != labels[i]:
+                    overridden += 1
+                    verdict_sources[i] = SOURCE_LLM_OVERRIDE
+                else:
+                    verdict_sources[i] = SOURCE_LLM
+                labels[i] = label
+        llm_seconds = time.perf_counter() - start
+
+        with self._lock:
+            self._tiers["linear"]["items"] += len(texts)
+            self._tiers["linear"]["seconds"] += linear_seconds
+            llm = self._tiers["llm"]
+            llm["items"] += len(uncertain) - skipped
+            llm["seconds"] += llm_seconds
+            llm["answered"] += answered
+            llm["failed"] += failed
+            llm["skipped"] += skipped
+            llm["overridden"] += overridden
+
+        return labels, probs, verdict_sources, llm_sources
+
+    def score(self, texts):
+        """(labels, probs, verdict_sources) – see score_detailed"""
+        labels, probs, verdict_sources, _ = self.score_detailed(texts)
+        return labels, probs, verdict_sources
+
+    def stats(self):
+        """Per-tier counts and latencies"""
+        with self._lock:
+            linear = dict(self._tiers["linear"])
+            llm = dict(self._tiers["llm"])
+        linear["ms_per_item"] = 1000 * linear["seconds"] / linear["items"] if linear["items"] else 0.0
+        llm["share"] = llm["items"] / linear["items"] if linear["items"] else 0.0
+        llm["latency_p50_ms"] = self._llm_latency.quantile(0.5)
+        llm["latency_p95_ms"] = self._llm_latency.quantile(0.95)
+        llm["latency_ms"] = self._llm_latency.snapshot()
+        llm["breaker_open"] = self.breaker_open
+        return {"band": list(self.band), "max_concurrency": self.max_concurrency, "linear": linear, "llm": llm}
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
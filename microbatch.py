@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Dynamic micro-batching for concurrent scoring requests.
+
+Requests from many threads are queued and scored together: the batcher
+waits at most max_wait_ms after the first queued request, or until
+max_batch_size requests are waiting, then runs one transform and one
+predict_proba over the whole batch and hands each caller its own row.
+
+Usage:
+  python microbatch.py      # Compare per-request and batched scoring under concurrent load
+"""
+
+import time
+import queue
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+_STOP = object()
+
+
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts values <= its upper bound"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = q * self.count
+            seen = 0
+            for bound, n in zip(self.bounds, self.counts):
+                seen += n
+                if seen >= target:
+                    return min(bound, self.max)
+            return self.max
+
+    def snapshot(self):
+        with self._lock:
+            buckets = [[str(b), n] for b, n in zip(self.bounds, self.counts)]
+            buckets.append(["+inf", self.counts[-1]])
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+                "buckets": buckets,
+            }
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests into batches on one background thread.
+    score_fn(texts) must return (labels, probs) in input order.
+    """
+
+    def __init__(self, score_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self.batches = 0
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue one text; the returned Future resolves to (label, prob)"""
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def score(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def _collect(self, first):
+        """Gather requests until the batch is full or the first one has waited max_wait"""
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+
+            try:
+                labels, probs = self.score_fn([text for text, _, _ in batch])
+            except Exception as e:
+                self.errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), label, prob in zip(batch, labels, probs):
+                future.set_result((label, float(prob)))
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "errors": self.errors,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
+    import detector
+
+    scorer = detector.load_serving_scorer()
+    texts = pd.read_csv("auto_booth_combined.csv")["text"].fillna("").astype(str).tolist()
+    texts = (texts * (4000 // max(len(texts), 1) + 1))[:4000]
+    clients = 32
+
+    def one_by_one(text):
+        labels, probs = detector.score_texts([text], scorer, scorer)
+        return labels[0], float(probs[0])
+
+    def timed(fn):
+        def call(text):
+            t = time.perf_counter()
+            result = fn(text)
+            return result, time.perf_counter() - t
+        return call
+
+    def run(fn):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            out = list(pool.map(timed(fn), texts))
+        elapsed = time.perf_counter() - start
+        latencies = sorted(lat for _, lat in out)
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000.0
+        return [r for r, _ in out], len(texts) / elapsed, p99
+
+    print(f"Scoring {len(texts)} texts from {clients} concurrent clients")
+    direct, direct_rps, direct_p99 = run(one_by_one)
+    print(f"  Per-request: {direct_rps:8.0f} texts/s • p99 {direct_p99:.1f} ms")
+
+    with MicroBatcher(lambda batch: detector.score_texts(batch, scorer, scorer)) as batcher:
+        batched, batched_rps, batched_p99 = run(batcher.score)
+        stats = batcher.stats()
+    print(f"  Micro-batch: {batched_rps:8.0f} texts/s • p99 {batched_p99:.1f} ms")
+    print(f"  Batches: {stats['batches']} • mean size {stats['batch_size']['mean']:.1f}"
+          f" • mean queue wait {stats['queue_wait_ms']['mean']:.2f} ms")
+
+    same = all(a[0] == b[0] and abs(a[1] - b[1]) < 1e-12 for a, b in zip(direct, batched))
+    print("✅ Batched results match per-request scoring" if same else "❌ Batched results differ")
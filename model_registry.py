@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Versioned model registry with hot reload.
+
+Each published model is a linear-scorer artifact directory named after
+its model_version under models/registry/, and the CURRENT file names the
+one to serve. Publishing writes the version directory through a temp
+directory and then replaces CURRENT with os.replace, so a reader sees
+either the old or the new version, never a partial one.
+
+HotReloader polls CURRENT with one os.stat at most every poll_interval
+seconds. When it changes, the new version is loaded and warmed up on a
+background thread and swapped in with a single reference assignment;
+until then, and for as long as callers hold them, the old objects keep
+serving. Command-line tools resolve their model with load_serving, so
+they score with the same version as the app.
+
+Usage:
+  python model_registry.py list                       # Versions, newest first; * marks CURRENT
+  python model_registry.py publish                    # Publish the exported scorer (or the pickles)
+  python model_registry.py publish --scorer-dir DIR   # Publish another artifact directory
+  python model_registry.py use 8cd599793ed4           # Point CURRENT at an older version (rollback)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+import detector
+from linear_scorer import MANIFEST_FILE, save_scorer, load_scorer
+
+REGISTRY_DIR = os.path.join("models", "registry")
+CURRENT_POINTER = "CURRENT"
+POLL_INTERVAL = 2.0
+KEEP_VERSIONS = 5
+WARMUP_TEXT = "Scientists confirm water found on Moon."
+
+
+# =============================================================================
+# POINTER FILES
+# =============================================================================
+
+def read_pointer(directory, name=CURRENT_POINTER):
+    """Contents of a pointer file, or None when it does not exist"""
+    try:
+        with open(os.path.join(directory, name), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_pointer(directory, value, name=CURRENT_POINTER):
+    """Replace a pointer file atomically"""
+    tmp = os.path.join(directory, f".{name}.tmp")
+    with open(tmp, "w") as f:
+        f.write(value + "\n")
+    os.replace(tmp, os.path.join(directory, name))
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Manifests of every complete version, newest first"""
+    if not os.path.isdir(registry_dir):
+        return []
+    manifests = []
+    for name in os.listdir(registry_dir):
+        path = os.path.join(registry_dir, name, MANIFEST_FILE)
+        if not name.startswith(".") and os.path.exists(path):
+            with open(path) as f:
+                manifests.append(json.load(f))
+    return sorted(manifests, key=lambda m: m.get("published", m["created"]), reverse=True)
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    return read_pointer(registry_dir)
+
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, version)
+
+
+def set_current(version, registry_dir=REGISTRY_DIR):
+    if not os.path.exists(os.path.join(version_dir(version, registry_dir), MANIFEST_FILE)):
+        raise ValueError(f"No such model version: {version}")
+    write_pointer(registry_dir, version)
+
+
+def publish(scorer, registry_dir=REGISTRY_DIR, compact_vocab=False, meta=None, make_current=True,
+            keep_versions=KEEP_VERSIONS):
+    """Add scorer as a new version (a no-op if it is already there) and optionally make it current"""
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".publish-", dir=registry_dir)
+    try:
+        published = {"published": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")}
+        manifest = save_scorer(scorer, tmp, compact_vocab, {**published, **(meta or {})})
+        final = version_dir(manifest["model_version"], registry_dir)
+        if os.path.exists(os.path.join(final, MANIFEST_FILE)):
+            shutil.rmtree(tmp)
+        else:
+            shutil.rmtree(final, ignore_errors=True)  # Leftover of an interrupted publish
+            os.replace(tmp, final)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if make_current:
+        write_pointer(registry_dir, manifest["model_version"])
+    prune(registry_dir, keep_versions)
+    return manifest
+
+
+def prune(registry_dir=REGISTRY_DIR, keep_versions=KEEP_VERSIONS):
+    """Delete all but the newest keep_versions versions; CURRENT is always kept"""
+    current = current_version(registry_dir)
+    for manifest in list_versions(registry_dir)[keep_versions:]:
+        if manifest["model_version"] != current:
+            shutil.rmtree(version_dir(manifest["model_version"], registry_dir), ignore_errors=True)
+
+
+def _manifest_version(artifact_dir):
+    try:
+        with open(os.path.join(artifact_dir, MANIFEST_FILE)) as f:
+            return json.load(f).get("model_version")
+    except FileNotFoundError:
+        return None
+
+
+def load_current(registry_dir=REGISTRY_DIR, scorer_dir=detector.SCORER_DIR,
+                 vector_path=detector.VECTOR_PATH, model_path=detector.MODEL_PATH):
+    """
+    (scorer, artifact dir) for the CURRENT version; falls back to
+    detector.load_serving_scorer while the registry is empty or
+    registry_dir is None. The directory is None when the scorer was
+    compiled from the pickles.
+    """
+    version = current_version(registry_dir) if registry_dir else None
+    if version is not None:
+        path = version_dir(version, registry_dir)
+        if _manifest_version(path) is None:
+            raise FileNotFoundError(f"{CURRENT_POINTER} names {version}, which is not published in {registry_dir}")
+        return load_scorer(path), path
+    scorer = detector.load_serving_scorer(scorer_dir, vector_path, model_path)
+    # load_serving_scorer compiles the pickles instead of a stale export
+    from_export = scorer_dir and _manifest_version(scorer_dir) == scorer.model_version
+    return scorer, scorer_dir if from_export else None
+
+
+def load_serving(registry_dir=REGISTRY_DIR, scorer_dir=None, vector_path=detector.VECTOR_PATH,
+                 model_path=detector.MODEL_PATH):
+    """
+    (scorer, artifact dir) for command-line tools: an explicit scorer_dir
+    wins, otherwise the registry's CURRENT, as served by the app.
+    """
+    if scorer_dir:
+        return load_current(None, scorer_dir, vector_path, model_path)
+    return load_current(registry_dir, detector.SCORER_DIR, vector_path, model_path)
+
+
+def load_path(path, vector_path=detector.VECTOR_PATH, model_path=detector.MODEL_PATH):
+    """Scorer for an artifact directory returned by load_current (None: compile the pickles)"""
+    if path:
+        return load_scorer(path)
+    return detector.load_serving_scorer(None, vector_path, model_path)
+
+
+# =============================================================================
+# HOT RELOAD
+# =============================================================================
+
+class HotReloader:
+    """
+    Serves the registry's CURRENT model and swaps in new versions without a restart.
+    build(scorer, path) turns a loaded scorer into whatever get() returns
+    (e.g. scorer, explainer and prediction cache together).
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, build=None, poll_interval=POLL_INTERVAL,
+                 scorer_dir=detector.SCORER_DIR, vector_path=detector.VECTOR_PATH, model_path=detector.MODEL_PATH):
+        self.registry_dir = registry_dir
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.last_error = None
+        self._build = build or (lambda scorer, path: scorer)
+        self._fallback = (scorer_dir, vector_path, model_path)
+        self._lock = threading.Lock()
+        self._loading = False
+        self._next_poll = 0.0
+        self._pointer_stat = self._stat_pointer()
+        try:
+            self._current = self._load()
+        except Exception as e:
+            # A CURRENT naming a pruned or broken version must not keep the app from starting;
+            # the next changed pointer retries the registry
+            self.last_error = repr(e)
+            self._current = self._load(use_registry=False)
+
+    def _stat_pointer(self):
+        try:
+            st = os.stat(os.path.join(self.registry_dir, CURRENT_POINTER))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self, use_registry=True):
+        scorer, path = load_current(self.registry_dir if use_registry else None, *self._fallback)
+        # Builds the lazy analyzer tables before the first real request
+        scorer.predict_proba(scorer.transform([WARMUP_TEXT]))
+        return scorer.model_version, path, self._build(scorer, path)
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    @property
+    def path(self):
+        """Artifact directory of the served version (None when compiled from pickles)"""
+        return self._current[1]
+
+    def get(self):
+        """The built model for the newest loaded version; polls CURRENT on the side"""
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self._next_poll = now + self.poll_interval
+            self.poll()
+        return self._current[2]
+
+    def poll(self):
+        """Start a background reload if CURRENT changed; returns True when one was started"""
+        pointer_stat = self._stat_pointer()
+        with self._lock:
+            if pointer_stat == self._pointer_stat or self._loading:
+                return False
+            self._loading = True
+        threading.Thread(target=self._reload, args=(pointer_stat,), name="model-reload", daemon=True).start()
+        return True
+
+    def _reload(self, pointer_stat):
+        try:
+            if read_pointer(self.registry_dir) != self.version:
+                self._current = self._load()
+                self.reloads += 1
+            self.last_error = None
+        except Exception as e:
+            # Keep serving the old version; the next changed pointer retries
+            self.last_error = repr(e)
+        finally:
+            with self._lock:
+                self._pointer_stat = pointer_stat
+                self._loading = False
+
+    def wait(self, timeout=None):
+        """Block until no reload is in flight"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._loading:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        return {"version": self.version, "path": self.path, "reloads": self.reloads,
+                "loading": self._loading, "last_error": self.last_error}
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Model registry")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show published versions")
+    pp = sub.add_parser("publish", help="Publish a scorer and make it current")
+    pp.add_argument("--scorer-dir", default=detector.SCORER_DIR, help="Exported artifact directory")
+    pp.add_argument("--vectorizer", default=detector.VECTOR_PATH)
+    pp.add_argument("--model", default=detector.MODEL_PATH)
+    pp.add_argument("--no-activate", action="store_true", help="Publish without moving CURRENT")
+    up = sub.add_parser("use", help="Point CURRENT at a published version")
+    up.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = current_version(args.registry)
+        versions = list_versions(args.registry)
+        if not versions:
+            print(f"No versions in {args.registry}")
+        for m in versions:
+            mark = "*" if m["model_version"] == current else " "
+            print(f"{mark} {m['model_version']}  {m.get('published', m['created'])[:19]}  "
+                  f"{m['n_features']:,} features  {m.get('coef_dtype', 'float64')}")
+    elif args.command == "publish":
+        scorer = detector.load_serving_scorer(args.scorer_dir, args.vectorizer, args.model)
+        manifest = publish(scorer, args.registry, make_current=not args.no_activate)
+        print(f"Published {manifest['model_version']} to {args.registry}"
+              f"{'' if args.no_activate else ' (now current)'}")
+    else:
+        try:
+            set_current(args.version, args.registry)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"CURRENT → {args.version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
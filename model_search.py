@@ -0,0 +1,170 @@
+"""
+Parallel hyperparameter search for train_model.py --search.
+
+Cross-validates TF-IDF + Logistic Regression configurations in a
+process pool. Work is split into (vectorizer settings, fold) tasks: each
+task vectorizes its fold once and fits every C value on the same
+matrices. Results are written to a leaderboard with accuracy, fit time,
+serving model size and per-item latency, and configurations on the
+accuracy/latency frontier are marked.
+"""
+
+import os
+import json
+import time
+import random
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from linear_scorer import LinearScorer
+
+SEARCH_SPACE = {
+    "max_features": [5000, 10000, 50000, 200000],
+    "ngram_range": [(1, 1), (1, 2)],
+    "C": [0.1, 0.3, 1.0, 3.0, 10.0],
+}
+CV_FOLDS = 3
+LATENCY_SAMPLES = 200
+SEARCH_LEADERBOARD = os.path.join("models", "search_leaderboard.json")
+
+# Per-process dataset, filled by _init_worker
+_worker_state = {}
+
+
+def _init_worker(texts, labels, folds, seed):
+    _worker_state["texts"] = np.asarray(texts, dtype=object)
+    _worker_state["labels"] = np.asarray(labels)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    _worker_state["folds"] = list(splitter.split(_worker_state["texts"], _worker_state["labels"]))
+
+
+def model_bytes(scorer):
+    """Size of the serving artifact: idf + coef arrays plus the vocabulary text"""
+    terms = scorer.get_feature_names_out()
+    return 16 * len(terms) + sum(len(t.encode("utf-8")) + 1 for t in terms)
+
+
+def per_item_latency_us(scorer, texts):
+    """Mean time to score one text on its own with the serving scorer"""
+    if texts:
+        scorer.predict_proba(scorer.transform(texts[:1]))  # Builds the analyzer outside the timing
+    start = time.perf_counter()
+    for t in texts:
+        scorer.predict_proba(scorer.transform([t]))
+    return 1e6 * (time.perf_counter() - start) / max(len(texts), 1)
+
+
+def _run_fold(max_features, ngram_range, fold, Cs):
+    texts, labels = _worker_state["texts"], _worker_state["labels"]
+    train_idx, val_idx = _worker_state["folds"][fold]
+
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer(max_features=max_features, stop_words="english", ngram_range=ngram_range)
+    X_train = vectorizer.fit_transform(texts[train_idx])
+    X_val = vectorizer.transform(texts[val_idx])
+    vectorize_seconds = time.perf_counter() - start
+    latency_texts = list(texts[val_idx][:LATENCY_SAMPLES])
+
+    results = []
+    for C in Cs:
+        start = time.perf_counter()
+        model = LogisticRegression(max_iter=1000, random_state=42, C=C)
+        model.fit(X_train, labels[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        scorer = LinearScorer.from_sklearn(vectorizer, model)
+        results.append({
+            "C": C,
+            "accuracy": float(np.mean(model.predict(X_val) == labels[val_idx])),
+            "fit_seconds": fit_seconds,
+            "vectorize_seconds": vectorize_seconds,
+            "model_bytes": model_bytes(scorer),
+            "latency_us": per_item_latency_us(scorer, latency_texts),
+        })
+    return max_features, tuple(ngram_range), fold, results
+
+
+def sample_configs(space=SEARCH_SPACE, n_iter=None, seed=42):
+    """Full grid, or n_iter configurations drawn from it without replacement"""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if n_iter and n_iter < len(grid):
+        grid = random.Random(seed).sample(grid, n_iter)
+    return grid
+
+
+def pareto_front(rows):
+    """Mark rows no other row beats on both accuracy and latency"""
+    for row in rows:
+        row["pareto"] = not any(
+            other["accuracy"] >= row["accuracy"] and other["latency_us"] <= row["latency_us"]
+            and (other["accuracy"] > row["accuracy"] or other["latency_us"] < row["latency_us"])
+            for other in rows
+        )
+    return rows
+
+
+def run_search(texts, labels, configs, folds=CV_FOLDS, workers=None, seed=42):
+    """Cross-validate configs; returns leaderboard rows sorted by accuracy, then latency"""
+    by_vectorizer = {}
+    for cfg in configs:
+        by_vectorizer.setdefault((cfg["max_features"], tuple(cfg["ngram_range"])), []).append(cfg["C"])
+
+    workers = workers or os.cpu_count() or 1
+    fold_results = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(list(texts), list(labels), folds, seed),
+    ) as pool:
+        futures = [
+            pool.submit(_run_fold, max_features, ngram_range, fold, sorted(set(Cs)))
+            for (max_features, ngram_range), Cs in by_vectorizer.items()
+            for fold in range(folds)
+        ]
+        for done, future in enumerate(futures, 1):
+            max_features, ngram_range, fold, results = future.result()
+            for r in results:
+                fold_results.setdefault((max_features, ngram_range, r["C"]), []).append(r)
+            print(f"  Fold tasks: {done}/{len(futures)}", end="\r")
+    print()
+
+    rows = []
+    for (max_features, ngram_range, C), results in fold_results.items():
+        acc = [r["accuracy"] for r in results]
+        rows.append({
+            "max_features": max_features,
+            "ngram_range": list(ngram_range),
+            "C": C,
+            "accuracy": float(np.mean(acc)),
+            "accuracy_std": float(np.std(acc)),
+            "fit_seconds": float(np.mean([r["fit_seconds"] for r in results])),
+            "vectorize_seconds": float(np.mean([r["vectorize_seconds"] for r in results])),
+            "model_bytes": int(np.mean([r["model_bytes"] for r in results])),
+            "latency_us": float(np.mean([r["latency_us"] for r in results])),
+        })
+    rows.sort(key=lambda r: (-r["accuracy"], r["latency_us"]))
+    return pareto_front(rows)
+
+
+def save_leaderboard(rows, path=SEARCH_LEADERBOARD, meta=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({**(meta or {}), "results": rows}, f, indent=2)
+
+
+def print_leaderboard(rows, limit=20):
+    print(f"{'#':>3} {'max_feat':>8} {'ngram':>6} {'C':>6} {'accuracy':>14} {'fit s':>7} "
+          f"{'size KB':>8} {'latency µs':>10}  frontier")
+    for i, r in enumerate(rows[:limit], 1):
+        ngram = f"{r['ngram_range'][0]}-{r['ngram_range'][1]}"
+        print(f"{i:>3} {r['max_features']:>8} {ngram:>6} {r['C']:>6g} "
+              f"{r['accuracy']:>8.2%} ±{r['accuracy_std']:.3f} {r['fit_seconds']:>7.2f} "
+              f"{r['model_bytes'] / 1024:>8.0f} {r['latency_us']:>10.1f}  {'★' if r['pareto'] else ''}")
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Online model updates from explicit user corrections.
+
+OnlineLearner.submit() queues a labeled feedback event; a background
+thread applies queued events as partial_fit updates of a hashed-feature
+SGD model (the same setup as train_model.py --stream) once update_events
+have arrived or every update_interval seconds. Each update is fitted on a
+copy of the current model and published as a new version directory
+under models/online/, then the CURRENT pointer file is swapped with
+os.replace, so readers (in this process or another) only ever see a
+complete version. The starting point is the latest published version,
+else the --stream model in models/streaming/, else a model fitted on the
+built-in demo data.
+
+Only corrections a user made on purpose (and labeled files applied from
+the command line) are learned from; the model's own verdicts and game
+answers graded against them never are. Each text is learned once
+(deduplicated by hash, also across restarts through the feedback log,
+which is rotated past feedback_max_bytes with the newest
+feedback_backup_count archives kept, so restarts read a bounded amount),
+a session can submit at most max_per_session corrections, and one update
+carries at most MAX_UPDATE_WEIGHT of total sample weight at a constant,
+small learning rate, which bounds how far any verdict moves. Version numbers
+are claimed with an exclusive file create, so several processes can
+publish into one directory, and CURRENT only moves forward.
+
+The online model is a shadow model: the app shows its verdict next to
+the served TF-IDF model's, but never uses it for a verdict. Its hashed
+features cannot be compiled into a linear scorer, so promote() carries
+the logged corrections over to serving instead: it applies them to the
+registry's CURRENT scorer with the same bounded steps and publishes the
+result as a new registry version, which the app then hot-reloads.
+Each version records the newest correction it contains, so a
+correction is promoted once.
+
+Usage:
+  python online_learning.py status                      # Current version and feedback counts
+  python online_learning.py apply logs/feedback.jsonl   # Feed labeled JSONL events (text, label)
+  python online_learning.py apply labels.jsonl --feedback-log logs/feedback.jsonl  # ...and keep them for promote
+  python online_learning.py promote                     # Publish logged corrections as the served model
+  python online_learning.py promote --no-activate       # Publish without moving the registry's CURRENT
+"""
+
+import os
+import sys
+import copy
+import glob
+import gzip
+import json
+import time
+import atexit
+import hashlib
+import pickle
+import shutil
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+
+import detector
+from audit_log import read_events
+from dedup import normalize_for_dedup
+from model_registry import REGISTRY_DIR, list_versions, load_current, publish, read_pointer, write_pointer
+
+ONLINE_MODEL_DIR = os.path.join("models", "online")
+FEEDBACK_LOG_PATH = os.path.join("logs", "feedback.jsonl")
+FEEDBACK_MAX_BYTES = 5 * 1024 * 1024
+FEEDBACK_BACKUP_COUNT = 4
+UPDATE_EVENTS = 16
+UPDATE_INTERVAL = 5.0
+KEEP_VERSIONS = 5
+LABEL_SOURCES = ("correction", "import")  # Explicit user corrections and labeled files
+MAX_PER_SESSION = 20
+MAX_UPDATE_WEIGHT = 8.0  # Total sample weight of one update, however many events it holds
+ONLINE_LEARNING_RATE = 0.05  # Constant SGD step; with l2-normalized features one update moves
+                             # any text's log-odds by about MAX_UPDATE_WEIGHT * ONLINE_LEARNING_RATE at most
+
+LABEL_IDS = {name: i for i, name in detector.CLASS_LABELS.items()}
+
+
+def label_id(label):
+    """0/1 class id from "FAKE"/"REAL" or an int"""
+    if isinstance(label, str):
+        if label.upper() not in LABEL_IDS:
+            raise ValueError(f"Unknown label: {label!r}")
+        return LABEL_IDS[label.upper()]
+    if int(label) not in detector.CLASS_LABELS:
+        raise ValueError(f"Unknown label: {label!r}")
+    return int(label)
+
+
+def version_name(version):
+    return f"v{version:06d}"
+
+
+def feedback_hash(text):
+    """Identity of a text for deduplication: case, punctuation and spacing are ignored"""
+    return hashlib.sha1(normalize_for_dedup(text).encode("utf-8")).hexdigest()
+
+
+def _claim_name(version):
+    return f".{version_name(version)}.claim"
+
+
+def claimed_versions(model_dir):
+    return sorted(int(d[2:-6]) for d in os.listdir(model_dir)
+                  if d.startswith(".v") and d.endswith(".claim") and d[2:-6].isdigit())
+
+
+def claim_version(model_dir):
+    """Reserve the next version number; O_EXCL makes the claim unique across processes"""
+    version = max([0] + published_versions(model_dir) + claimed_versions(model_dir)) + 1
+    while True:
+        try:
+            fd = os.open(os.path.join(model_dir, _claim_name(version)), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            version += 1
+            continue
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return version
+
+
+def feedback_log_files(path):
+    """Rotated archives of a feedback log, oldest first, then the live file"""
+    if not path:
+        return []
+    base, ext = os.path.splitext(path)
+    files = sorted(glob.glob(f"{glob.escape(base)}.*{ext}.gz"))
+    return files + [path] if os.path.exists(path) else files
+
+
+def read_feedback_hashes(path):
+    """text hashes of every event in a feedback log and its kept archives"""
+    return {e.get("text_sha1") or feedback_hash(e["text"]) for e in read_events(feedback_log_files(path))}
+
+
+def _read_version(model_dir, name):
+    path = os.path.join(model_dir, name)
+    with open(os.path.join(path, "vectorizer.pkl"), "rb") as f:
+        vectorizer = pickle.load(f)
+    with open(os.path.join(path, "fake_news_model.pkl"), "rb") as f:
+        model = pickle.load(f)
+    return int(name[1:]), vectorizer, model
+
+
+def load_published(model_dir=ONLINE_MODEL_DIR):
+    """(version, vectorizer, model) that CURRENT points to, or None before the first publish"""
+    name = read_pointer(model_dir)
+    return None if name is None else _read_version(model_dir, name)
+
+
+def published_versions(model_dir=ONLINE_MODEL_DIR):
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(int(d[1:]) for d in os.listdir(model_dir) if d.startswith("v") and d[1:].isdigit())
+
+
+def bootstrap_model(passes=3, seed=42):
+    """Hashed model fitted on the built-in demo data"""
+    from train_model import get_demo_data, streaming_components
+
+    vectorizer, model = streaming_components()
+    demo = get_demo_data()
+    X = vectorizer.transform(demo["text"].astype(str).tolist())
+    y = demo["label"].to_numpy()
+    rng = np.random.default_rng(seed)
+    for _ in range(passes):
+        order = rng.permutation(len(y))
+        model.partial_fit(X[order], y[order], classes=[0, 1])
+    return vectorizer, model
+
+
+def load_starting_model(model_dir=ONLINE_MODEL_DIR):
+    """
+    (version, vectorizer, model, source): the latest published version,
+    else the --stream model, else a bootstrap fit on the demo data.
+    """
+    published = load_published(model_dir)
+    if published is not None:
+        return (*published, "published")
+
+    from train_model import STREAMING_MODEL_DIR
+    vec_path = os.path.join(STREAMING_MODEL_DIR, "vectorizer.pkl")
+    model_path = os.path.join(STREAMING_MODEL_DIR, "fake_news_model.pkl")
+    if os.path.exists(vec_path) and os.path.exists(model_path):
+        with open(vec_path, "rb") as f:
+            vectorizer = pickle.load(f)
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+        return 0, vectorizer, model, "streaming"
+
+    return (0, *bootstrap_model(), "demo")
+
+
+class OnlineLearner:
+    """Queues labeled corrections and publishes partial_fit updates of a shadow model from a background thread"""
+
+    def __init__(self, model_dir=ONLINE_MODEL_DIR, feedback_log=FEEDBACK_LOG_PATH, update_events=UPDATE_EVENTS,
+                 update_interval=UPDATE_INTERVAL, keep_versions=KEEP_VERSIONS, max_per_session=MAX_PER_SESSION,
+                 feedback_max_bytes=FEEDBACK_MAX_BYTES, feedback_backup_count=FEEDBACK_BACKUP_COUNT):
+        self.model_dir = model_dir
+        self.feedback_log = feedback_log
+        self.feedback_max_bytes = feedback_max_bytes
+        self.feedback_backup_count = feedback_backup_count
+        self.update_events = update_events
+        self.update_interval = update_interval
+        self.keep_versions = keep_versions
+        self.max_per_session = max_per_session
+        self.received = 0
+        self.applied = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.rate_limited = 0
+        self.last_error = None
+        self.last_update = None
+        self._queue = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._seen = read_feedback_hashes(feedback_log)
+        self._per_session = {}
+
+        os.makedirs(model_dir, exist_ok=True)
+        version, vectorizer, model, self.source = load_starting_model(model_dir)
+        # Replaced as a whole, never mutated: readers get one consistent version
+        self._current = (version, vectorizer, model)
+        if self.source != "published":
+            version = claim_version(model_dir)
+            self._publish(version, vectorizer, model, {"source": self.source, "events": 0})
+            self._current = (version, vectorizer, model)
+
+        self._log = None
+        if feedback_log:
+            os.makedirs(os.path.dirname(feedback_log) or ".", exist_ok=True)
+            self._log = open(feedback_log, "ab")
+        self._thread = threading.Thread(target=self._run, name="online-learner", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def current(self):
+        """(version, vectorizer, model) of the latest published update"""
+        return self._current
+
+    def predict(self, texts):
+        """(labels, probs) from the latest online version"""
+        _, vectorizer, model = self._current
+        return detector.score_texts(list(texts), vectorizer, model)
+
+    def submit(self, text, label, source="correction", session=None, **extra):
+        """
+        Queue one labeled text; the update itself happens on the learner thread.
+        Returns False when the text is blank, was already learned or the
+        session has used up its corrections.
+        """
+        if source not in LABEL_SOURCES:
+            raise ValueError(f"Only explicit labels are learned from, not {source!r}")
+        if not text or not text.strip():
+            return False
+        digest = feedback_hash(text)
+        event = {"ts": time.time(), "text": text, "text_sha1": digest, "label": label_id(label), "source": source}
+        event.update(extra)
+        with self._cond:
+            if self._closed:
+                return False
+            if digest in self._seen:
+                self.duplicates += 1
+                return False
+            if session is not None:
+                if self._per_session.get(session, 0) >= self.max_per_session:
+                    self.rate_limited += 1
+                    return False
+                self._per_session[session] = self._per_session.get(session, 0) + 1
+            self._seen.add(digest)
+            self._queue.append(event)
+            self.received += 1
+            if len(self._queue) >= self.update_events:
+                self._cond.notify()
+        return True
+
+    # -------------------------------------------------------------------------
+    # Learner thread
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.update_events and not self._closed:
+                    self._cond.wait(self.update_interval)
+                events, self._queue = self._queue, []
+                closed = self._closed
+            if events:
+                try:
+                    self._apply(events)
+                except Exception as e:
+                    self.failed += len(events)
+                    self.last_error = repr(e)
+            if closed:
+                return
+
+    def _apply(self, events):
+        # Another process may have published meanwhile: build on its version instead of discarding it
+        published = read_pointer(self.model_dir)
+        if published is not None and int(published[1:]) > self.version:
+            try:
+                self._current = _read_version(self.model_dir, published)
+            except FileNotFoundError:
+                pass  # Pruned already; a newer one will be picked up next time
+        base_version, vectorizer, model = self._current
+        X = vectorizer.transform([e["text"] for e in events])
+        y = np.array([e["label"] for e in events])
+        # A burst of corrections moves the model no further than MAX_UPDATE_WEIGHT events would
+        weight = min(1.0, MAX_UPDATE_WEIGHT / len(events))
+
+        # Copy-on-write: concurrent predict() calls keep using the published coefficients
+        updated = copy.deepcopy(model)
+        # The batch schedule's early steps are huge (alpha=1e-6): one label could flip any verdict
+        updated.set_params(learning_rate="constant", eta0=ONLINE_LEARNING_RATE)
+        updated.partial_fit(X, y, classes=[0, 1], sample_weight=np.full(len(events), weight))
+
+        version = claim_version(self.model_dir)
+        sources = {}
+        for e in events:
+            sources[e["source"]] = sources.get(e["source"], 0) + 1
+        self._publish(version, vectorizer, updated, {"events": len(events), "sources": sources,
+                                                     "base_version": base_version, "sample_weight": weight})
+        self._current = (version, vectorizer, updated)
+        self.applied += len(events)
+        self.last_update = time.time()
+
+        if self._log is not None:
+            data = "".join(json.dumps({**e, "applied_version": version}, ensure_ascii=False) + "\n"
+                           for e in events).encode("utf-8")
+            if self._log.closed:
+                self._log = open(self.feedback_log, "ab")  # A failed rotation left it closed
+            if self._log.tell() and self._log.tell() + len(data) > self.feedback_max_bytes:
+                self._rotate_log()
+            self._log.write(data)
+            self._log.flush()
+
+    def _rotate_log(self):
+        """Move the live feedback log aside, gzip it and keep the newest feedback_backup_count archives"""
+        self._log.close()
+        base, ext = os.path.splitext(self.feedback_log)
+        rotated = f"{base}.{datetime.now():%Y%m%d-%H%M%S-%f}{ext}"
+        os.replace(self.feedback_log, rotated)
+        self._log = open(self.feedback_log, "ab")
+
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+
+        archives = feedback_log_files(self.feedback_log)[:-1]
+        for old in archives[:-self.feedback_backup_count] if self.feedback_backup_count > 0 else archives:
+            os.remove(old)
+
+    def _publish(self, version, vectorizer, model, meta):
+        """Write a version directory, then point CURRENT at it; both steps are atomic renames"""
+        name = version_name(version)
+        final = os.path.join(self.model_dir, name)
+        tmp = tempfile.mkdtemp(prefix=f".{name}-", dir=self.model_dir)
+        try:
+            with open(os.path.join(tmp, "vectorizer.pkl"), "wb") as f:
+                pickle.dump(vectorizer, f)
+            with open(os.path.join(tmp, "fake_news_model.pkl"), "wb") as f:
+                pickle.dump(model, f)
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"version": version, "created": time.time(), **meta}, f, indent=2)
+            if os.path.exists(final):
+                shutil.rmtree(final)
+            os.replace(tmp, final)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        # Only ever forward: a slower process must not roll CURRENT back to an older version
+        current = read_pointer(self.model_dir)
+        if current is None or int(current[1:]) < version:
+            write_pointer(self.model_dir, name)
+
+        current = read_pointer(self.model_dir)
+        for old in published_versions(self.model_dir)[:-self.keep_versions]:
+            if old != version and version_name(old) != current:
+                shutil.rmtree(os.path.join(self.model_dir, version_name(old)), ignore_errors=True)
+                try:
+                    os.remove(os.path.join(self.model_dir, _claim_name(old)))
+                except FileNotFoundError:
+                    pass
+
+    def flush(self, timeout=None):
+        """Apply everything queued so far; returns once the learner has caught up"""
+        deadline = None if timeout is None else time.time() + timeout
+        target = self.received
+        with self._cond:
+            self._cond.notify()
+        while self.applied + self.failed < target and self._thread.is_alive():
+            if deadline is not None and time.time() > deadline:
+                return False
+            with self._cond:
+                if self._queue:
+                    self._cond.notify()
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        """Apply what is still queued and stop the learner"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self._log is not None:
+            self._log.close()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._queue)
+        return {
+            "version": self.version,
+            "source": self.source,
+            "received": self.received,
+            "applied": self.applied,
+            "pending": pending,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "rate_limited": self.rate_limited,
+            "last_update": self.last_update,
+            "last_error": self.last_error,
+        }
+
+
+# =============================================================================
+# PROMOTION
+# =============================================================================
+
+def apply_corrections(scorer, events, batch_events=UPDATE_EVENTS):
+    """
+    Copy of a linear scorer with events applied as log-loss gradient steps,
+    batch_events at a time and bounded like the learner's updates.
+    """
+    coef = np.array(scorer.coef_[0], dtype=np.float64)
+    intercept = float(scorer.intercept_[0])
+    for i in range(0, len(events), batch_events):
+        batch = events[i:i + batch_events]
+        X = scorer.transform([e["text"] for e in batch])
+        y = np.array([label_id(e["label"]) for e in batch], dtype=np.float64)
+        prob = 1.0 / (1.0 + np.exp(-(np.asarray(X @ coef).ravel() + intercept)))
+        grad = (prob - y) * min(1.0, MAX_UPDATE_WEIGHT / len(batch))
+        coef -= ONLINE_LEARNING_RATE * np.asarray(X.T @ grad).ravel()
+        intercept -= ONLINE_LEARNING_RATE * float(grad.sum())
+
+    updated = copy.copy(scorer)  # Shares the vocabulary and analyzer tables
+    updated.coef_ = coef.reshape(1, -1)
+    updated.intercept_ = np.array([intercept])
+    updated.model_version = None
+    return updated
+
+
+def promote(registry_dir=REGISTRY_DIR, feedback_log=FEEDBACK_LOG_PATH, make_current=True):
+    """
+    Publish the corrections logged since the CURRENT version to the registry.
+    Returns None when there is nothing new, else a dict with the new version.
+    """
+    scorer, _ = load_current(registry_dir)
+    manifest = next((m for m in list_versions(registry_dir) if m["model_version"] == scorer.model_version), {})
+    since = manifest.get("feedback_until", 0.0)
+
+    events = {}
+    for e in read_events(feedback_log_files(feedback_log)):
+        if e.get("source") in LABEL_SOURCES and e["ts"] > since:
+            events.setdefault(e.get("text_sha1") or feedback_hash(e["text"]), e)
+    events = sorted(events.values(), key=lambda e: e["ts"])
+    if not events:
+        return None
+
+    texts = [e["text"] for e in events]
+    labels = np.array([label_id(e["label"]) for e in events])
+    updated = apply_corrections(scorer, events)
+    published = publish(updated, registry_dir, make_current=make_current, meta={
+        "source": "online_promotion",
+        "base_model_version": scorer.model_version,
+        "feedback_events": len(events),
+        "feedback_until": events[-1]["ts"],
+    })
+    return {
+        "model_version": published["model_version"],
+        "base_model_version": scorer.model_version,
+        "events": len(events),
+        "agreed_before": int((scorer.predict(scorer.transform(texts)) == labels).sum()),
+        "agreed_after": int((updated.predict(updated.transform(texts)) == labels).sum()),
+        "current": make_current,
+    }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Online model updates")
+    parser.add_argument("--model-dir", default=ONLINE_MODEL_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Show the published online version")
+    ap = sub.add_parser("apply", help="Apply labeled events from JSONL files")
+    ap.add_argument("files", nargs="+", help="JSONL files with text and label (REAL/FAKE or 1/0)")
+    ap.add_argument("--feedback-log", default=None, help="Also log the events here, for promote")
+    pp = sub.add_parser("promote", help="Publish logged corrections to the model registry")
+    pp.add_argument("--registry", default=REGISTRY_DIR)
+    pp.add_argument("--feedback-log", default=FEEDBACK_LOG_PATH)
+    pp.add_argument("--no-activate", action="store_true", help="Publish without moving CURRENT")
+    args = parser.parse_args()
+
+    if args.command == "promote":
+        result = promote(args.registry, args.feedback_log, make_current=not args.no_activate)
+        if result is None:
+            print(f"No new corrections in {args.feedback_log} since the current version")
+            return 0
+        print(f"Published {result['model_version']} to {args.registry} from {result['events']} correction(s)"
+              f" on {result['base_model_version']}{' (now current)' if result['current'] else ''}")
+        print(f"  Agrees with {result['agreed_after']}/{result['events']} corrections"
+              f" (was {result['agreed_before']})")
+        return 0
+
+    if args.command == "status":
+        published = published_versions(args.model_dir)
+        current = load_published(args.model_dir)
+        if current is None:
+            print(f"No online model published in {args.model_dir}")
+            return 1
+        with open(os.path.join(args.model_dir, version_name(current[0]), "meta.json")) as f:
+            meta = json.load(f)
+        print(f"Current: {version_name(current[0])} • {len(published)} version(s) kept in {args.model_dir}")
+        print(f"  {json.dumps(meta)}")
+        return 0
+
+    learner = OnlineLearner(args.model_dir, feedback_log=args.feedback_log, update_events=1024)
+    start = time.perf_counter()
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    event = json.loads(line)
+                    learner.submit(event["text"], event["label"], "import")
+    learner.close()
+    s = learner.stats()
+    print(f"Applied {s['applied']}/{s['received']} events in {time.perf_counter() - start:.2f}s"
+          f" • {s['duplicates']} already learned • now at {version_name(s['version'])}")
+    if s["failed"]:
+        print(f"  {s['failed']} failed: {s['last_error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Adversarial robustness reports for the Fake News Detector.
+
+Builds many perturbations of each text (casing, punctuation stripping,
+synonym and character swaps, word dropout) and scores each text with all
+of its perturbations in one transform + predict_proba pass, then reports
+how far the probability moves. Passes are bounded at BATCH_ROWS rows, so
+large input files are scored in batches of texts.
+
+Report fields (one object per text, as in report_<timestamp>.json):
+  score              P(REAL) for the original text
+  adversarial_score  largest |probability shift| over all perturbations
+  bias_index         mean signed shift (> 0 leans REAL, < 0 leans FAKE)
+  confidence_weight  share of perturbations that keep the original label
+  level              LOW / MODERATE / HIGH from adversarial_score
+
+Usage:
+  python robustness.py "Shocking: aliens land in Ohio!!!"     # Writes report_<timestamp>.json
+  python robustness.py --input news.csv --flagged-only        # Reports for every FAKE verdict
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import string
+import argparse
+
+import numpy as np
+
+import detector
+from model_registry import REGISTRY_DIR, load_serving
+
+N_PERTURBATIONS = 200
+BATCH_ROWS = 20000  # Rows (originals + perturbations) per scoring pass
+LEVELS = [(0.1, "LOW"), (0.3, "MODERATE")]  # Anything above is HIGH
+
+SYNONYMS = {
+    "shocking": ["surprising", "startling"],
+    "unbelievable": ["incredible", "remarkable"],
+    "breaking": ["latest", "new"],
+    "secret": ["hidden", "private"],
+    "miracle": ["remarkable", "extraordinary"],
+    "cure": ["treatment", "remedy"],
+    "exposed": ["revealed", "uncovered"],
+    "discovered": ["found", "detected"],
+    "announces": ["reveals", "declares"],
+    "government": ["administration", "authorities"],
+    "scientists": ["researchers", "experts"],
+    "experts": ["specialists", "analysts"],
+    "doctors": ["physicians", "medics"],
+    "says": ["states", "claims"],
+    "claims": ["says", "alleges"],
+    "new": ["fresh", "novel"],
+    "big": ["large", "huge"],
+    "huge": ["massive", "big"],
+    "fake": ["false", "bogus"],
+    "true": ["real", "genuine"],
+    "report": ["study", "account"],
+    "study": ["research", "report"],
+    "shows": ["indicates", "reveals"],
+    "launches": ["starts", "unveils"],
+    "crisis": ["emergency", "disaster"],
+    "attack": ["assault", "strike"],
+    "win": ["victory", "triumph"],
+    "wins": ["secures", "takes"],
+    "dies": ["passes", "perishes"],
+    "banned": ["prohibited", "outlawed"],
+}
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]+")
+_PUNCT_TABLE = str.maketrans("", "", string.punctuation + "“”‘’")
+_EMPHASIS_RE = re.compile(r"[!?]+")
+
+
+def _join(tokens):
+    return " ".join(tokens)
+
+
+def perturb(text, n=N_PERTURBATIONS, seed=0):
+    """Return up to n distinct (kind, perturbed text) pairs; deterministic for a given seed"""
+    rng = random.Random(seed)
+    tokens = _WORD_RE.findall(text)
+    words = [i for i, t in enumerate(tokens) if t[0].isalnum() or t[0] == "_"]
+    out = {}
+
+    def add(kind, candidate):
+        if candidate != text and candidate not in out and len(out) < n:
+            out[candidate] = kind
+
+    # Casing and punctuation
+    add("casing", text.lower())
+    add("casing", text.upper())
+    add("casing", text.title())
+    add("casing", text.swapcase())
+    add("punctuation", text.translate(_PUNCT_TABLE))
+    add("punctuation", _EMPHASIS_RE.sub("", text))
+    add("punctuation", _EMPHASIS_RE.sub(".", text))
+
+    # Every single synonym swap, then every single-word dropout
+    for i in words:
+        for syn in SYNONYMS.get(tokens[i].lower(), []):
+            if tokens[i][0].isupper():
+                syn = syn.capitalize()
+            add("synonym", _join(tokens[:i] + [syn] + tokens[i + 1:]))
+    for i in words:
+        add("dropout", _join(tokens[:i] + tokens[i + 1:]))
+
+    # Random character swaps and multi-word dropout fill the remaining budget
+    long_words = [i for i in words if len(tokens[i]) >= 4]
+    is_word = [False] * len(tokens)
+    for i in words:
+        is_word[i] = True
+    attempts = 0
+    while len(out) < n and attempts < 2 * n and words:
+        attempts += 1
+        if long_words and rng.random() < 0.5:
+            swapped = list(tokens)
+            for i in rng.sample(long_words, min(len(long_words), rng.randint(1, 3))):
+                w = swapped[i]
+                j = rng.randrange(1, len(w) - 2)
+                swapped[i] = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+            add("char_swap", _join(swapped))
+        else:
+            rate = rng.uniform(0.1, 0.4)
+            kept = [t for t, w in zip(tokens, is_word) if not w or rng.random() >= rate]
+            add("dropout", _join(kept))
+
+    return [(kind, candidate) for candidate, kind in out.items()]
+
+
+def robustness_level(adversarial_score):
+    for threshold, name in LEVELS:
+        if adversarial_score < threshold:
+            return name
+    return "HIGH"
+
+
+def _report(text, p, variant_probs):
+    shifts = variant_probs - p
+    if len(shifts):
+        adversarial = float(np.max(np.abs(shifts)))
+        bias = float(np.mean(shifts))
+        kept = float(np.mean((variant_probs >= 0.5) == (p >= 0.5)))
+    else:
+        adversarial, bias, kept = 0.0, 0.0, 1.0
+    return {
+        "text": text,
+        "prediction": detector.CLASS_LABELS[int(p >= 0.5)],
+        "score": p,
+        "level": robustness_level(adversarial),
+        "bias_index": bias,
+        "adversarial_score": adversarial,
+        "confidence_weight": round(kept, 2),
+    }
+
+
+def iter_robustness_reports(texts, vectorizer, model, n_perturbations=N_PERTURBATIONS, seed=0,
+                            batch_rows=BATCH_ROWS):
+    """
+    Yield one report per text, in order. Texts are grouped so each
+    transform + predict_proba pass holds at most about batch_rows rows
+    (originals plus perturbations); a single text is never split.
+    """
+    def flush(group, batch):
+        _, probs = detector.score_texts(batch, vectorizer, model)
+        for text, pos, lo, hi in group:
+            yield _report(text, float(probs[pos]), probs[lo:hi])
+
+    group, batch = [], []
+    for i, text in enumerate(texts):
+        variants = [p for _, p in perturb(text, n_perturbations, seed + i)]
+        if group and len(batch) + 1 + len(variants) > batch_rows:
+            yield from flush(group, batch)
+            group, batch = [], []
+        group.append((text, len(batch), len(batch) + 1, len(batch) + 1 + len(variants)))
+        batch.append(text)
+        batch.extend(variants)
+    if group:
+        yield from flush(group, batch)
+
+
+def robustness_reports(texts, vectorizer, model, n_perturbations=N_PERTURBATIONS, seed=0,
+                       batch_rows=BATCH_ROWS):
+    """Reports for many texts, scored in bounded batches"""
+    return list(iter_robustness_reports(texts, vectorizer, model, n_perturbations, seed, batch_rows))
+
+
+def robustness_report(text, vectorizer, model, n_perturbations=N_PERTURBATIONS, seed=0):
+    return robustness_reports([text], vectorizer, model, n_perturbations, seed)[0]
+
+
+def read_texts(path, text_column="text"):
+    """Texts from a CSV column or a JSONL file"""
+    if path.endswith(".jsonl"):
+        from score_jsonl import parse_line
+        with open(path, "r", encoding="utf-8") as f:
+            return [parse_line(line, text_column)[1] for line in f if line.strip()]
+    import pandas as pd
+    return pd.read_csv(path)[text_column].fillna("").astype(str).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adversarial robustness reports")
+    parser.add_argument("text", nargs="?", help="Text to analyze")
+    parser.add_argument("--input", "-i", help="CSV or JSONL file of texts")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--output", "-o", help="Report path (default: report_<timestamp>.json)")
+    parser.add_argument("--perturbations", "-n", type=int, default=N_PERTURBATIONS, help="Perturbations per text")
+    parser.add_argument("--flagged-only", action="store_true", help="Only report texts predicted FAKE")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="Model registry whose CURRENT version is used")
+    parser.add_argument("--scorer-dir", default=None, help="Exported artifact directory (overrides --registry)")
+    args = parser.parse_args()
+
+    if args.input:
+        texts = read_texts(args.input, args.text_column)
+    elif args.text:
+        texts = [args.text]
+    else:
+        parser.error("Give a text or --input")
+
+    scorer, _ = load_serving(args.registry, args.scorer_dir)
+    if args.flagged_only:
+        labels, _ = detector.score_texts(texts, scorer, scorer)
+        texts = [t for t, label in zip(texts, labels) if label == detector.CLASS_LABELS[0]]
+
+    start = time.perf_counter()
+    reports = robustness_reports(texts, scorer, scorer, args.perturbations, args.seed)
+    elapsed = time.perf_counter() - start
+
+    out_path = args.output or f"report_{int(time.time())}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(reports[0] if len(reports) == 1 and not args.input else reports, f, indent=4, ensure_ascii=False)
+
+    print(f"✅ {len(reports)} report(s) written to {out_path} in {elapsed:.2f}s", file=sys.stderr)
+    for r in reports[:5]:
+        print(f"  {r['prediction']} {r['score']:.2f} • {r['level']} • shift {r['adversarial_score']:.3f}"
+              f" • kept {r['confidence_weight']:.0%} • {r['text'][:60]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
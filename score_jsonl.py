@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL scoring for the Fake News Detector.
+
+Reads one JSON object per line ({"text": "..."}; extra fields are kept)
+or a bare JSON string, scores in fixed-size chunks and writes one JSONL
+verdict per input line. Memory stays bounded by the chunk size. Progress
+is checkpointed after every chunk so an interrupted run can --resume.
+
+Usage:
+  python score_jsonl.py crawl.jsonl -o verdicts.jsonl            # File to file
+  python score_jsonl.py crawl.jsonl -o verdicts.jsonl --resume   # Continue after an interruption
+  zcat crawl.jsonl.gz | python score_jsonl.py - > verdicts.jsonl # Pipeline
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+
+import detector
+from model_registry import REGISTRY_DIR, load_serving
+
+CHUNK_SIZE = 2000
+
+
+def parse_line(line, text_field="text"):
+    """Return (record, text) for one input line; raises ValueError when it has no text"""
+    record = json.loads(line)
+    if isinstance(record, str):
+        return {}, record
+    if not isinstance(record, dict):
+        raise ValueError("Line is not a JSON object or string.")
+    text = record.get(text_field)
+    if not isinstance(text, str):
+        raise ValueError(f"Missing string field '{text_field}'.")
+    return record, text
+
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def save_checkpoint(path, state):
+    """Write atomically so a crash never leaves a half-written checkpoint"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def score_stream(lines, out, score_fn, model_version, chunk_size=CHUNK_SIZE,
+                 text_field="text", start_line=0, on_chunk=None):
+    """
+    Score an iterable of JSONL lines and write verdicts to out.
+    score_fn(texts) returns (labels, probs). on_chunk(stats) runs after
+    each chunk is written, e.g. to checkpoint. Returns the final stats.
+    """
+    stats = {"lines": start_line, "scored": 0, "errors": 0, "skipped": 0, "fake": 0, "real": 0}
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            break
+
+        entries = []
+        records, texts = [], []
+        for offset, line in enumerate(chunk):
+            line_no = stats["lines"] + offset + 1
+            if not line.strip():
+                stats["skipped"] += 1
+                continue
+            try:
+                record, text = parse_line(line, text_field)
+            except ValueError as e:
+                entries.append((line_no, {"line": line_no, "error": str(e)}))
+                stats["errors"] += 1
+                continue
+            entries.append((line_no, None))
+            records.append(record)
+            texts.append(text)
+
+        labels, probs = score_fn(texts)
+        scored = iter(zip(records, labels.tolist(), probs.tolist()))
+        buf = []
+        for line_no, error in entries:
+            if error is not None:
+                buf.append(json.dumps(error, ensure_ascii=False))
+                continue
+            record, label, prob = next(scored)
+            verdict = dict(record)
+            verdict.update({"line": line_no, "prediction": label, "probability": prob,
+                            "model_version": model_version})
+            buf.append(json.dumps(verdict, ensure_ascii=False))
+            stats["fake" if label == detector.CLASS_LABELS[0] else "real"] += 1
+        if buf:
+            out.write("\n".join(buf) + "\n")
+
+        stats["scored"] += len(texts)
+        stats["lines"] += len(chunk)
+        if on_chunk is not None:
+            on_chunk(stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a JSONL stream with the Fake News Detector")
+    parser.add_argument("input", help="JSONL file, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="Output JSONL file, or - for stdout")
+    parser.add_argument("--text-field", default="text", help="Field holding the text to score")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lines scored per chunk")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <output>.ckpt)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Worker processes for scoring")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="Model registry whose CURRENT version is used")
+    parser.add_argument("--scorer-dir", default=None, help="Exported artifact directory (overrides --registry)")
+    parser.add_argument("--vectorizer", default=detector.VECTOR_PATH)
+    parser.add_argument("--model", default=detector.MODEL_PATH)
+    args = parser.parse_args()
+
+    to_stdout = args.output == "-"
+    checkpoint_path = args.checkpoint or (None if to_stdout else args.output + ".ckpt")
+    if args.resume and to_stdout:
+        parser.error("--resume needs an output file")
+
+    start_line, out_bytes = 0, 0
+    checkpoint = load_checkpoint(checkpoint_path) if args.resume else None
+    if checkpoint:
+        if checkpoint.get("input") != args.input:
+            parser.error(f"Checkpoint was written for {checkpoint.get('input')}, not {args.input}")
+        start_line, out_bytes = checkpoint["line"], checkpoint["output_bytes"]
+        print(f"Resuming at line {start_line}", file=sys.stderr)
+
+    scorer, scorer_path = load_serving(args.registry, args.scorer_dir, args.vectorizer, args.model)
+    if checkpoint and checkpoint.get("model_version") != scorer.model_version:
+        parser.error(f"Checkpoint was scored with model {checkpoint.get('model_version')}, not {scorer.model_version}")
+    pool = None
+    if args.workers > 1:
+        from batch_score import ParallelScorer
+        pool = ParallelScorer(scorer_path, args.vectorizer, args.model, workers=args.workers)
+        score_fn = pool.score
+    else:
+        score_fn = lambda texts: detector.score_texts(texts, scorer, scorer)
+
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    if to_stdout:
+        out = sys.stdout
+    else:
+        # Drop anything written after the last checkpoint, then append
+        out = open(args.output, "r+" if checkpoint else "w", encoding="utf-8")
+        out.truncate(out_bytes)
+        out.seek(out_bytes)
+
+    def on_chunk(stats):
+        out.flush()
+        if checkpoint_path is None:
+            return
+        if not to_stdout:
+            os.fsync(out.fileno())
+        save_checkpoint(checkpoint_path, {
+            "input": args.input,
+            "line": stats["lines"],
+            "output_bytes": out.tell() if not to_stdout else None,
+            "model_version": scorer.model_version,
+        })
+
+    start = time.perf_counter()
+    try:
+        lines = islice(src, start_line, None)
+        stats = score_stream(lines, out, score_fn, scorer.model_version, args.chunk_size,
+                             args.text_field, start_line, on_chunk)
+    except KeyboardInterrupt:
+        if checkpoint_path:
+            print(f"Interrupted; rerun with --resume to continue from {checkpoint_path}", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+        if pool is not None:
+            pool.close()
+    elapsed = time.perf_counter() - start
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    processed = stats["lines"] - start_line
+    print(f"Done: {processed} lines in {elapsed:.2f}s ({processed / max(elapsed, 1e-9):,.0f} lines/s)", file=sys.stderr)
+    print(f"  Scored: {stats['scored']} • FAKE: {stats['fake']} • REAL: {stats['real']}"
+          f" • Errors: {stats['errors']} • Blank: {stats['skipped']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
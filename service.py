@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Headless scoring service for the Fake News Detector.
+JSON over HTTP, separate from the Streamlit UI. Standard library only.
+
+Usage:
+  python service.py                          # http://127.0.0.1:8000, one worker per CPU
+  python service.py --port 9000 --workers 4  # Custom port and worker count
+  python service.py --scorer-dir DIR         # Serve an exported artifact instead of the registry's CURRENT
+
+Endpoints:
+  GET  /health        {"status": "ok", "model_version": ...}
+  GET  /stats         Prediction cache and micro-batching statistics
+  POST /score         {"text": "...", "explain": false}
+  POST /score/batch   {"texts": ["...", ...], "explain": false}
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import detector
+from model_registry import REGISTRY_DIR, load_serving
+from microbatch import MicroBatcher, MAX_BATCH_SIZE as MICRO_BATCH_SIZE, MAX_WAIT_MS
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_SIZE = 10000
+CACHE_SIZE = 4096
+
+# Per-worker model state, filled by init_state
+_state = {}
+
+
+def init_state(scorer, max_batch=MICRO_BATCH_SIZE, batch_wait_ms=MAX_WAIT_MS):
+    _state["scorer"] = scorer
+    _state["explainer"] = detector.Explainer(scorer, scorer)
+    _state["cache"] = detector.PredictionCache(CACHE_SIZE, scorer.model_version)
+    # Concurrent /score requests without explanations share one transform + predict_proba
+    _state["batcher"] = MicroBatcher(
+        lambda texts: detector.score_texts(texts, scorer, scorer), max_batch, batch_wait_ms
+    )
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def analyze_one(text):
+    scorer = _state["scorer"]
+    return _state["cache"].get_or_compute(
+        text, lambda t: detector.analyze(t, scorer, scorer, _state["explainer"])
+    )
+
+
+def result_to_dict(result, explain=False):
+    payload = {
+        "prediction": result.label,
+        "probability": float(result.prob),
+        "model_version": _state["scorer"].model_version,
+    }
+    if explain:
+        payload["explanation"] = {
+            "reasons": detector.explain_reasoning(result),
+            "contributions": [[w, s] for w, s in result.contributions],
+            "flags": result.flags,
+        }
+    return payload
+
+
+def score_single(body):
+    text = body.get("text")
+    if not isinstance(text, str):
+        raise ValueError("'text' must be a string.")
+    if body.get("explain"):
+        return result_to_dict(analyze_one(text), True)
+    label, prob = _state["batcher"].score(text)
+    return {"prediction": label, "probability": prob, "model_version": _state["scorer"].model_version}
+
+
+def score_batch(body):
+    texts = body.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise ValueError("'texts' must be a list of strings.")
+    if len(texts) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} texts per request.")
+
+    if body.get("explain"):
+        return {"results": [result_to_dict(analyze_one(t), True) for t in texts]}
+
+    scorer = _state["scorer"]
+    labels, probs = detector.score_texts(texts, scorer, scorer)
+    version = scorer.model_version
+    return {"results": [
+        {"prediction": label, "probability": float(prob), "model_version": version}
+        for label, prob in zip(labels.tolist(), probs.tolist())
+    ]}
+
+
+def parse_content_length(value):
+    """Body length from a Content-Length header; ValueError unless it is a non-negative integer"""
+    if value is None or not value.strip():
+        return 0
+    value = value.strip()
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError("Invalid Content-Length header.")
+    return int(value)
+
+
+ROUTES = {
+    "/score": score_single,
+    "/score/batch": score_batch,
+}
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeNewsDetector/1.0"
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients stall on Nagle + delayed ACK for ~40ms per request
+    disable_nagle_algorithm = True
+    verbose = False
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "model_version": _state["scorer"].model_version})
+        elif self.path == "/stats":
+            self._send_json(200, {
+                "pid": os.getpid(),
+                "cache": _state["cache"].stats(),
+                "micro_batching": _state["batcher"].stats(),
+            })
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path)
+        try:
+            length = parse_content_length(self.headers.get("Content-Length"))
+        except ValueError as e:
+            # The body cannot be skipped without a valid length, so the connection is closed
+            self.close_connection = True
+            self._send_json(400, {"error": str(e)})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": "Request body too large."})
+            return
+        raw = self.rfile.read(length)
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object.")
+            self._send_json(200, handler(body))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def run_worker(sock, args, scorer):
+    """Serve requests from the shared listening socket"""
+    init_state(scorer, args.max_batch, args.batch_wait_ms)
+    server = ThreadingHTTPServer(sock.getsockname()[:2], ScoringHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake News Detector scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="Model registry whose CURRENT version is served")
+    parser.add_argument("--scorer-dir", default=None, help="Exported artifact directory (overrides --registry)")
+    parser.add_argument("--vectorizer", default=detector.VECTOR_PATH)
+    parser.add_argument("--model", default=detector.MODEL_PATH)
+    parser.add_argument("--max-batch", type=int, default=MICRO_BATCH_SIZE, help="Max requests per micro-batch")
+    parser.add_argument("--batch-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="Max time a request waits for its micro-batch to fill")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    ScoringHandler.verbose = args.verbose
+    sock = socket.create_server((args.host, args.port), backlog=1024)
+    workers = args.workers
+    if workers > 1 and not hasattr(os, "fork"):
+        print("Process workers need fork(); running a single worker.")
+        workers = 1
+
+    # Loaded once before forking: every worker serves the same version from shared pages
+    scorer, _ = load_serving(args.registry, args.scorer_dir, args.vectorizer, args.model)
+    scorer.transform([""])  # Builds the lazy analyzer tables before they would be copied per worker
+    print(f"Serving model {scorer.model_version} on http://{args.host}:{args.port} with {workers} worker(s)")
+    if workers == 1:
+        run_worker(sock, args, scorer)
+        return
+
+    # Pre-fork: every worker accepts on the same socket
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run_worker(sock, args, scorer)
+            os._exit(0)
+        children.append(pid)
+
+    def shutdown(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for _ in children:
+        os.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import gzip
+import json
+import glob
+import time
+
+from audit_log import AuditLog, text_hash, read_events, replay
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_texts_are_hashed_by_default(tmp_path):
+    path = str(tmp_path / "requests.jsonl")
+    log = AuditLog(path)
+    log.record("Secret headline", "FAKE", 0.2, 1.5, "abc")
+    log.close()
+    [event] = read_lines(path)
+    assert "text" not in event
+    assert event["text_sha1"] == text_hash("Secret headline")
+    assert event["prediction"] == "FAKE"
+
+
+def test_store_text_keeps_text(tmp_path):
+    path = str(tmp_path / "requests.jsonl")
+    log = AuditLog(path, store_text=True)
+    log.record("Kept headline", "REAL", 0.9, 1.0, "abc")
+    log.close()
+    assert read_lines(path)[0]["text"] == "Kept headline"
+
+
+def test_pending_events_are_capped(tmp_path):
+    log = AuditLog(str(tmp_path / "requests.jsonl"), flush_events=10 ** 6, flush_interval=60, max_pending=5)
+    for i in range(8):
+        log.log({"i": i})
+    assert log.stats()["pending"] == 5
+    assert log.dropped == 3
+    log.close()
+    assert log.written == 5
+
+
+def test_write_errors_are_counted_and_writer_recovers(tmp_path, monkeypatch):
+    path = str(tmp_path / "requests.jsonl")
+    log = AuditLog(path, flush_events=1, flush_interval=0.01)
+
+    def fail(events):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(log, "_write", fail)
+        log.log({"i": 0})
+        while log.write_errors == 0:
+            time.sleep(0.001)
+    log.log({"i": 1})
+    log.close()
+    s = log.stats()
+    assert s["write_errors"] == 1 and s["dropped"] == 1
+    assert "disk full" in s["last_error"]
+    assert [e["i"] for e in read_lines(path)] == [1]
+
+
+def test_rotation_gzips_and_keeps_backup_count(tmp_path):
+    path = str(tmp_path / "requests.jsonl")
+    log = AuditLog(path, max_bytes=200, backup_count=2, flush_events=1, flush_interval=0.01)
+    for i in range(10):
+        log.log({"i": i, "pad": "x" * 100})
+        while log.written <= i:  # One write per event, so every write past 200 bytes rotates
+            time.sleep(0.001)
+    log.close()
+    archives = sorted(glob.glob(str(tmp_path / "requests.*.jsonl.gz")))
+    assert len(archives) == 2
+    for archive in archives:
+        with gzip.open(archive, "rt") as f:
+            assert all(json.loads(line)["pad"] for line in f)
+    events = list(read_events(archives + [path]))
+    assert [e["i"] for e in events] == sorted(e["i"] for e in events)
+
+
+def test_replay_needs_stored_text(tmp_path, scorer):
+    hashed, kept = str(tmp_path / "hashed.jsonl"), str(tmp_path / "kept.jsonl")
+    for path, store_text in [(hashed, False), (kept, True)]:
+        log = AuditLog(path, store_text=store_text)
+        for text in ["Aliens built the pyramids", "Parliament passes budget"]:
+            prob = scorer.predict_proba(scorer.transform([text]))[0, 1]
+            log.record(text, "REAL" if prob > 0.5 else "FAKE", prob, 1.0, scorer.model_version)
+        log.close()
+
+    assert replay([hashed], scorer=scorer)["no_text"] == 2
+    summary = replay([kept], scorer=scorer)
+    assert summary["replayed"] == 2
+    assert summary["agreement"] == 1.0
+    assert summary["max_abs_shift"] < 1e-9
@@ -0,0 +1,19 @@
+import numpy as np
+
+import detector
+from batch_score import ParallelScorer
+from linear_scorer import save_scorer
+
+
+def test_parallel_scores_keep_input_order(tmp_path, scorer, sample_texts):
+    path = str(tmp_path / "scorer")
+    save_scorer(scorer, path)
+    expected_labels, expected_probs = detector.score_texts(sample_texts, scorer, scorer)
+
+    with ParallelScorer(path, workers=2, shard_size=7) as parallel:
+        labels, probs = parallel.score(sample_texts)
+        empty_labels, empty_probs = parallel.score([])
+
+    assert list(labels) == list(expected_labels)
+    np.testing.assert_allclose(probs, expected_probs, rtol=0, atol=1e-12)
+    assert len(empty_labels) == len(empty_probs) == 0
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from dedup import dedupe_texts, dedupe_frame, normalize_for_dedup
+
+
+def test_empty_and_single_inputs():
+    keep, stats = dedupe_texts([])
+    assert keep.shape == (0,) and stats["kept"] == 0 and stats["rows"] == 0
+    keep, stats = dedupe_texts(["Only one headline"])
+    assert keep.tolist() == [True] and stats["kept"] == 1
+    df, stats = dedupe_frame(pd.DataFrame({"text": [], "label": []}))
+    assert len(df) == 0
+
+
+def test_exact_duplicates_ignore_case_and_punctuation():
+    texts = ["Moon water confirmed!", "moon   water, confirmed", "Budget passes parliament"]
+    assert normalize_for_dedup(texts[0]) == normalize_for_dedup(texts[1])
+    keep, stats = dedupe_texts(texts, threshold=None)
+    assert keep.tolist() == [True, False, True]
+    assert stats["exact_duplicates"] == 1 and stats["near_duplicates"] == 0
+
+
+def test_near_duplicates_keep_first_occurrence():
+    base = ("the city council approved a new budget on tuesday that increases funding for public "
+            "schools roads and parks while holding property taxes flat for the third year in a row")
+    edited = base[:-len("row")] + "rows"  # One changed shingle
+    unrelated = ("researchers reported that a new battery chemistry retains most of its capacity "
+                 "after thousands of charge cycles in laboratory tests published this week")
+    keep, stats = dedupe_texts([base, unrelated, edited])
+    assert keep.tolist() == [True, True, False]
+    assert stats["near_duplicates"] == 1
+
+
+def test_distinct_texts_are_all_kept(sample_texts):
+    texts = list(dict.fromkeys(t for t in sample_texts if len(t.split()) > 8))
+    keep, stats = dedupe_texts(texts)
+    # Distinct headlines share a few shingles at most; nothing near the 0.8 threshold
+    assert stats["kept"] >= 0.9 * len(texts)
+    assert np.all(keep[:1])
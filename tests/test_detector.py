@@ -0,0 +1,163 @@
+import re
+import html
+import dataclasses
+
+import numpy as np
+import pytest
+
+import detector
+
+
+def test_analyze_shares_one_vectorization(fitted_pair):
+    vectorizer, model = fitted_pair
+    text = "Shocking: miracle cure discovered, doctors hate it!!!"
+    result = detector.analyze(text, vectorizer, model)
+
+    expected = model.predict_proba(vectorizer.transform([text]))[0][1]
+    assert result.prob == expected
+    assert result.label == detector.CLASS_LABELS[int(expected >= 0.5)]
+    assert (result.X != vectorizer.transform([text])).nnz == 0
+    assert result.suspicious_words() == [w for w, s in result.contributions if s < 0]
+    assert any(flag["kind"] == "clickbait" for flag in result.flags)
+
+
+def test_analyze_with_scorer_reports_feature_spans(scorer):
+    text = "Unbelievable: secret miracle cure exposed"
+    result = detector.analyze(text, scorer, scorer)
+    feats, starts, ends = result.feature_spans
+    names = scorer.get_feature_names_out()
+    assert len(feats)
+    for j, start, end in zip(feats, starts, ends):
+        span = text[start:end].lower()
+        first, *rest = names[j].split(" ")
+        assert span.startswith(first)
+        assert span.endswith(rest[-1] if rest else first)
+        if not rest:
+            assert span == first
+    assert detector.explain_reasoning(result)
+
+
+def test_score_texts_matches_per_text_scoring(fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    labels, probs = detector.score_texts(sample_texts, vectorizer, model)
+    for text, label, prob in zip(sample_texts, labels, probs):
+        expected = model.predict_proba(vectorizer.transform([text]))[0][1]
+        assert abs(prob - expected) < 1e-12
+        assert label == detector.CLASS_LABELS[int(expected >= 0.5)]
+    empty_labels, empty_probs = detector.score_texts([], vectorizer, model)
+    assert len(empty_labels) == len(empty_probs) == 0
+
+
+def test_explainer_matches_a_full_sort(fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    explainer = detector.Explainer(vectorizer, model)
+    names = vectorizer.get_feature_names_out()
+    coef = model.coef_[0]
+    for text in sample_texts[:40]:
+        X = vectorizer.transform([text])
+        scores = {names[i]: coef[i] * X[0, i] for i in X.nonzero()[1]}
+        expected = sorted(scores.values(), key=abs, reverse=True)[:5]
+        actual = explainer.top_contributions(X, top_n=5)
+        assert [s for _, s in actual] == pytest.approx(expected)
+        assert all(scores[name] == pytest.approx(s) for name, s in actual)
+    assert explainer.top_contributions(vectorizer.transform(["x"]), top_n=0) == []
+
+
+def test_prediction_cache_is_a_bounded_lru():
+    cache = detector.PredictionCache(maxsize=2, model_version="v1")
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return text.upper()
+
+    assert cache.get_or_compute("a", compute) == "A"
+    assert cache.get_or_compute("  a\n", compute) == "A"  # Same normalized text
+    cache.get_or_compute("b", compute)
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("c", compute)  # Evicts b, the least recently used
+    cache.get_or_compute("b", compute)
+    assert calls == ["a", "b", "c", "b"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 4, 2, 2)
+
+
+def test_prediction_cache_keys_include_the_model_version():
+    assert detector.PredictionCache(model_version="v1").key("text") != \
+        detector.PredictionCache(model_version="v2").key("text")
+    disabled = detector.PredictionCache(maxsize=0)
+    disabled.get_or_compute("a", str)
+    assert disabled.stats()["size"] == 0
+
+
+def test_stream_score_csv_writes_every_chunk(tmp_path, fitted_pair, sample_texts):
+    import pandas as pd
+    vectorizer, model = fitted_pair
+    source = tmp_path / "in.csv"
+    pd.DataFrame({"text": sample_texts}).to_csv(source, index=False)
+    out = tmp_path / "out.csv"
+
+    progress = list(detector.stream_score_csv(str(source), str(out), vectorizer, model, chunk_size=7))
+    assert len(progress) == -(-len(sample_texts) // 7)
+    assert [len(p["chunk"]) for p in progress[:-1]] == [7] * (len(progress) - 1)
+
+    result = pd.read_csv(out, keep_default_na=False)
+    labels, probs = detector.score_texts(pd.Series(sample_texts).fillna("").astype(str), vectorizer, model)
+    assert list(result["prediction"]) == list(labels)
+    assert list(result["confidence"]) == [f"{p*100:.1f}%" for p in probs]
+    assert progress[-1]["rows"] == len(sample_texts)
+    assert progress[-1]["fake"] == int((labels == detector.CLASS_LABELS[0]).sum())
+
+
+def test_stream_score_csv_edge_cases(tmp_path, fitted_pair):
+    vectorizer, model = fitted_pair
+    empty = tmp_path / "empty.csv"
+    empty.write_text("text\n")
+    out = tmp_path / "out.csv"
+    progress = list(detector.stream_score_csv(str(empty), str(out), vectorizer, model))
+    assert sum(p["rows"] for p in progress) == 0
+    assert out.read_text().strip() == "text,prediction,confidence"
+
+    wrong = tmp_path / "wrong.csv"
+    wrong.write_text("body\nhello\n")
+    with pytest.raises(ValueError, match="'text' column"):
+        list(detector.stream_score_csv(str(wrong), str(out), vectorizer, model))
+
+
+def highlighted(markup):
+    """Texts inside the highlight spans of highlight_suspicious markup"""
+    return re.findall(r"<span class='suspicious'[^>]*>(.*?)</span>", markup)
+
+
+def test_highlight_merges_overlapping_unigrams_and_bigrams():
+    text = "Big pharma hides the cure"
+    result = detector.AnalysisResult(
+        text=text, X=None, prob=0.1, label="FAKE",
+        contributions=[("big", -0.5), ("big pharma", -0.9), ("pharma", -0.4), ("cure", 0.3)],
+        contribution_features=[0, 1, 2, 3],
+        feature_spans=(np.array([0, 1, 2, 3]), np.array([0, 0, 4, 21]), np.array([3, 10, 10, 25])),
+    )
+    markup = detector.highlight_suspicious(result)
+    assert highlighted(markup) == ["Big pharma"]
+    assert re.sub(r"<[^>]+>", "", markup) == text
+
+
+def test_highlight_escapes_html_on_both_paths(scorer):
+    text = "İ <img src=x onerror=alert(1)> shocking miracle cure exposed"
+    result = detector.analyze(text, scorer, scorer)
+    assert result.feature_spans is not None  # "İ" lowercases to two characters
+    assert result.suspicious_words()
+    for res in (result, dataclasses.replace(result, feature_spans=None)):
+        markup = detector.highlight_suspicious(res)
+        assert "<img" not in markup and "&lt;img" in markup
+        assert highlighted(markup)
+        assert html.unescape(re.sub(r"<[^>]+>", "", markup)) == text
+
+
+def test_spans_map_back_when_lowercasing_changes_length(scorer):
+    text = "İstanbul: SHOCKING miracle cure"
+    feats, starts, ends = detector.analyze(text, scorer, scorer).feature_spans
+    names = scorer.get_feature_names_out()
+    assert len(feats)
+    for j, start, end in zip(feats, starts, ends):
+        assert text[start:end].lower() == names[j]
@@ -0,0 +1,90 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from compact_vocab import CompactVocabulary
+from fast_analyzer import FastAnalyzer, check_equivalence
+from linear_scorer import LinearScorer, MANIFEST_FILE, save_scorer, load_scorer
+
+
+def with_compact_vocab(scorer):
+    return LinearScorer(CompactVocabulary.from_dict(scorer.vocabulary_), scorer.idf_, scorer.coef_, scorer.intercept_,
+                        scorer.stop_words, scorer.ngram_range, scorer.lowercase, scorer.token_pattern,
+                        scorer.sublinear_tf, scorer.norm)
+
+
+def test_dict_vocabulary_matches_vectorizer(fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    scorer = LinearScorer.from_sklearn(vectorizer, model)
+    ok, diff = check_equivalence(vectorizer, scorer, sample_texts)
+    assert ok, diff
+    assert isinstance(scorer._fast_analyzer, FastAnalyzer)
+
+
+def test_compact_vocabulary_uses_lookup_without_tables(fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    scorer = with_compact_vocab(LinearScorer.from_sklearn(vectorizer, model))
+    ok, diff = check_equivalence(vectorizer, scorer, sample_texts)
+    assert ok, diff
+    assert scorer._fast_analyzer is None  # Never walks the terms to build the tables
+
+
+def test_compact_export_ships_memory_mapped_tables(tmp_path, fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    out = str(tmp_path / "scorer")
+    manifest = save_scorer(LinearScorer.from_sklearn(vectorizer, model), out, compact_vocab=True)
+    assert set(manifest["files"]["analyzer"]) == {"tokens", "unigram", "bigram_keys", "bigram_feats"}
+
+    loaded = load_scorer(out)
+    analyzer = loaded._fast_analyzer
+    assert isinstance(analyzer._tokens, CompactVocabulary)
+    assert isinstance(analyzer._unigram, np.memmap) and isinstance(analyzer._bigram_keys, np.memmap)
+    ok, diff = check_equivalence(vectorizer, loaded, sample_texts)
+    assert ok, diff
+
+    # Spans come from the same tables
+    text = "Scientists confirm water found on Moon, NASA says"
+    X, spans = loaded.transform_with_spans(text)
+    assert abs(X - vectorizer.transform([text])).max() < 1e-12
+    feats, starts, ends = spans
+    names = vectorizer.get_feature_names_out()
+    for j, start, end in zip(feats, starts, ends):
+        term = names[j].split(" ")
+        assert text[start:end].lower().startswith(term[0]) and text[start:end].lower().endswith(term[-1])
+
+
+def test_compact_export_without_tables_still_loads(tmp_path, fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    out = str(tmp_path / "scorer")
+    save_scorer(LinearScorer.from_sklearn(vectorizer, model), out, compact_vocab=True)
+    # What a format version 2 export looks like
+    path = os.path.join(out, MANIFEST_FILE)
+    with open(path) as f:
+        manifest = json.load(f)
+    del manifest["files"]["analyzer"]
+    manifest["format_version"] = 2
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+    loaded = load_scorer(out)
+    ok, diff = check_equivalence(vectorizer, loaded, sample_texts)
+    assert ok, diff
+    assert loaded._fast_analyzer is None
+
+
+@pytest.mark.parametrize("ngram_range", [(1, 1), (1, 3)])
+def test_other_ngram_ranges(demo_data, sample_texts, ngram_range):
+    texts, labels = demo_data
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=ngram_range, sublinear_tf=True)
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+    ok, diff = check_equivalence(vectorizer, LinearScorer.from_sklearn(vectorizer, model), sample_texts)
+    assert ok, diff
+
+
+def test_longer_ngrams_are_rejected():
+    with pytest.raises(ValueError):
+        FastAnalyzer.from_items([("one two three", 0)])
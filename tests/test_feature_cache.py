@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+
+import train_model
+from feature_cache import cache_key, texts_digest
+
+
+def test_second_run_is_served_from_the_cache(tmp_path, monkeypatch, sample_texts):
+    cache_dir = str(tmp_path / "cache")
+    first = train_model.vectorize_dataset(None, max_features=500, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    def no_fit(*args, **kwargs):
+        raise AssertionError("vectorizer refitted on a cache hit")
+    monkeypatch.setattr(train_model, "TfidfVectorizer", no_fit)
+    second = train_model.vectorize_dataset(None, max_features=500, cache_dir=cache_dir)
+
+    for a, b in zip(first[1:3], second[1:3]):
+        assert (a != b).nnz == 0
+    for a, b in zip(first[3:], second[3:]):
+        assert np.array_equal(a, b)
+    assert (first[0].transform(sample_texts) != second[0].transform(sample_texts)).nnz == 0
+
+
+def test_cache_key_covers_data_and_settings():
+    base = cache_key(texts_digest(["a"], [0]), {"max_features": 10}, {"test_size": 0.2})
+    assert base == cache_key(texts_digest(["a"], [0]), {"max_features": 10}, {"test_size": 0.2})
+    assert base != cache_key(texts_digest(["a"], [1]), {"max_features": 10}, {"test_size": 0.2})
+    assert base != cache_key(texts_digest(["a"], [0]), {"max_features": 20}, {"test_size": 0.2})
+    assert base != cache_key(texts_digest(["a"], [0]), {"max_features": 10}, {"test_size": 0.3})
@@ -0,0 +1,43 @@
+import json
+
+from heuristics import HeuristicEngine, PhraseAutomaton, DEFAULT_LEXICON, normalize
+
+
+def kinds(flags, kind):
+    return [f for f in flags if f["kind"] == kind]
+
+
+def test_phrases_match_on_word_boundaries_with_spans():
+    engine = HeuristicEngine({"clickbait_phrases": ["doctors hate", "shocking", "hate it"]})
+    text = "SHOCKING: Doctors hate it. Unshocking news."
+    found = [(f["match"], text[slice(*f["span"])]) for f in kinds(engine.scan(text), "clickbait")]
+    assert found == [("shocking", "SHOCKING"), ("doctors hate", "Doctors hate"), ("hate it", "hate it")]
+
+
+def test_quotes_are_folded_before_matching():
+    automaton = PhraseAutomaton(["you won't believe"])
+    text = "You won’t believe this"
+    assert normalize(text) == "you won't believe this"
+    assert [(p, s, e) for p, s, e in automaton.find(normalize(text))] == [("you won't believe", 0, 17)]
+
+
+def test_overlapping_phrases_are_all_reported():
+    automaton = PhraseAutomaton(["what happens", "happens next", "what happens next"])
+    found = sorted(p for p, _, _ in automaton.find("see what happens next"))
+    assert found == ["happens next", "what happens", "what happens next"]
+
+
+def test_punctuation_and_caps_rules():
+    engine = HeuristicEngine(DEFAULT_LEXICON)
+    flags = engine.scan("THIS IS ABSOLUTELY HUGE NEWS!!!")
+    assert [f["match"] for f in kinds(flags, "punctuation")] == ["!!!"]
+    assert kinds(flags, "caps")
+    assert not engine.scan("A calm and measured report.")
+
+
+def test_lexicon_file_and_fallback(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"clickbait_phrases": ["miracle cure"]}))
+    assert len(HeuristicEngine.from_file(str(path)).automaton) == 1
+    assert len(HeuristicEngine.from_file(str(tmp_path / "missing.json")).automaton) == \
+        len(DEFAULT_LEXICON["clickbait_phrases"])
@@ -0,0 +1,156 @@
+import os
+import sys
+import pickle
+import warnings
+import subprocess
+
+import numpy as np
+import pytest
+
+import detector
+from compact_vocab import CompactVocabulary
+from linear_scorer import (LinearScorer, save_scorer, load_scorer, quantize, prune_features, compare_scorers,
+                           check_against_sklearn, quantize_coef, dequantize_coef, artifact_bytes)
+
+
+def test_matches_sklearn(fitted_pair, sample_texts):
+    vectorizer, model = fitted_pair
+    scorer = LinearScorer.from_sklearn(vectorizer, model)
+    expected = vectorizer.transform(sample_texts)
+    actual = scorer.transform(sample_texts)
+    assert abs(expected - actual).max() < 1e-12
+    diff, ok = check_against_sklearn(vectorizer, model, sample_texts, tol=1e-12)
+    assert ok, diff
+    assert (scorer.predict(actual) == model.predict(expected)).all()
+
+
+@pytest.mark.parametrize("compact_vocab", [False, True])
+def test_round_trip(tmp_path, scorer, sample_texts, compact_vocab):
+    out = str(tmp_path / "scorer")
+    manifest = save_scorer(scorer, out, compact_vocab)
+    loaded = load_scorer(out)
+    assert loaded.model_version == manifest["model_version"] == scorer.model_version
+    assert isinstance(loaded.vocabulary_, CompactVocabulary) == compact_vocab
+    assert isinstance(loaded.idf_, np.memmap) or isinstance(loaded.idf_.base, np.memmap)
+    np.testing.assert_allclose(loaded.predict_proba(loaded.transform(sample_texts)),
+                               scorer.predict_proba(scorer.transform(sample_texts)), rtol=0, atol=1e-12)
+    # The vocabulary format is not part of the model version
+    assert save_scorer(loaded, str(tmp_path / "again"), not compact_vocab)["model_version"] == manifest["model_version"]
+
+
+def test_reexport_replaces_the_whole_directory(tmp_path, scorer):
+    out = str(tmp_path / "scorer")
+    save_scorer(scorer, out, compact_vocab=False)
+    save_scorer(scorer, out, compact_vocab=True)
+    assert "vocabulary.txt" not in os.listdir(out)
+    save_scorer(scorer, out, compact_vocab=False)
+    assert sorted(os.listdir(out)) == ["coef.npy", "idf.npy", "manifest.json", "vocabulary.txt"]
+    assert os.listdir(tmp_path) == ["scorer"]  # No temp or backup directories left behind
+
+
+def test_failed_export_keeps_the_previous_one(tmp_path, scorer, monkeypatch):
+    out = str(tmp_path / "scorer")
+    save_scorer(scorer, out)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(CompactVocabulary, "save", fail)
+    with pytest.raises(OSError):
+        save_scorer(scorer, out, compact_vocab=True)
+    assert load_scorer(out).model_version == scorer.model_version
+    assert os.listdir(tmp_path) == ["scorer"]
+
+
+@pytest.mark.parametrize("coef_dtype", ["float32", "float16", "int8"])
+def test_quantized_round_trip(tmp_path, scorer, sample_texts, coef_dtype):
+    quantized = quantize(scorer, coef_dtype)
+    save_scorer(quantized, str(tmp_path / coef_dtype))
+    loaded = load_scorer(str(tmp_path / coef_dtype))
+    assert loaded.coef_dtype == coef_dtype
+    np.testing.assert_allclose(loaded.coef_, quantized.coef_, rtol=0, atol=1e-12)
+    report = compare_scorers(scorer, loaded, sample_texts, repeats=1)
+    assert report["max_abs_shift"] < 0.05
+
+
+def test_int8_rounding_error_is_within_half_a_step():
+    coef = np.random.default_rng(0).normal(size=1000)
+    stored, scale = quantize_coef(coef, "int8")
+    assert stored.dtype == np.int8 and scale == pytest.approx(np.max(np.abs(coef)) / 127)
+    assert np.max(np.abs(dequantize_coef(stored, scale) - coef)) <= scale / 2 + 1e-12
+    assert quantize_coef(np.zeros(3), "int8")[1] == 1.0
+    with pytest.raises(ValueError):
+        quantize_coef(coef, "int4")
+
+
+def test_pruned_int8_export_is_smaller_and_reported(tmp_path, scorer, demo_data):
+    texts, labels = demo_data
+    compressed = quantize(prune_features(scorer, float(np.median(np.abs(scorer.coef_[0])))), "int8")
+    save_scorer(compressed, str(tmp_path / "small"))
+    loaded = load_scorer(str(tmp_path / "small"))
+    assert artifact_bytes(loaded) < artifact_bytes(scorer) / 2
+    np.testing.assert_allclose(loaded.predict_proba(loaded.transform(texts)),
+                               compressed.predict_proba(compressed.transform(texts)), atol=1e-12)
+
+    report = compare_scorers(scorer, loaded, texts, labels, repeats=1)
+    assert report["candidate"]["n_features"] == len(compressed.vocabulary_)
+    assert report["candidate"]["coef_dtype"] == "int8"
+    assert 0.0 <= report["verdict_agreement"] <= 1.0 and "accuracy" in report["reference"]
+    assert prune_features(scorer, 0.0).get_feature_names_out().tolist() == scorer.get_feature_names_out().tolist()
+
+
+def test_prune_drops_small_coefficients(scorer):
+    tol = float(np.median(np.abs(scorer.coef_[0])))
+    pruned = prune_features(scorer, tol)
+    assert 0 < len(pruned.vocabulary_) < len(scorer.vocabulary_)
+    assert np.all(np.abs(pruned.coef_[0]) >= tol)
+
+
+def test_stale_export_falls_back_to_pickles(tmp_path, fitted_pair, scorer):
+    vectorizer, model = fitted_pair
+    vec_path, model_path = str(tmp_path / "vectorizer.pkl"), str(tmp_path / "model.pkl")
+    for path, obj in [(vec_path, vectorizer), (model_path, model)]:
+        with open(path, "wb") as f:
+            pickle.dump(obj, f)
+    scorer_dir = str(tmp_path / "scorer")
+    save_scorer(scorer, scorer_dir, meta={"source_version": detector.artifact_version(vec_path, model_path)})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert detector.load_serving_scorer(scorer_dir, vec_path, model_path).model_version == scorer.model_version
+
+    # Retrain: the pickles change after the export
+    retrained = pickle.loads(pickle.dumps(model))
+    retrained.intercept_ = retrained.intercept_ + 1.0
+    with open(model_path, "wb") as f:
+        pickle.dump(retrained, f)
+    with pytest.warns(UserWarning, match="Re-export"):
+        served = detector.load_serving_scorer(scorer_dir, vec_path, model_path)
+    assert served.model_version == detector.artifact_version(vec_path, model_path)
+    assert served.intercept_[0] == pytest.approx(scorer.intercept_[0] + 1.0)
+
+
+def test_cli_compresses_any_pickles_or_version_into_the_registry(tmp_path, fitted_pair):
+    from model_registry import current_version, list_versions
+
+    vectorizer, model = fitted_pair
+    paths = {"vectorizer": tmp_path / "vectorizer.pkl", "model": tmp_path / "model.pkl"}
+    for key, obj in (("vectorizer", vectorizer), ("model", model)):
+        with open(paths[key], "wb") as f:
+            pickle.dump(obj, f)
+    registry = str(tmp_path / "registry")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run(*args):
+        subprocess.run([sys.executable, "linear_scorer.py", "--registry", registry, *map(str, args)],
+                       cwd=root, check=True, capture_output=True)
+
+    run("--vectorizer", paths["vectorizer"], "--model", paths["model"], "--publish", "--coef-dtype", "int8")
+    [first] = list_versions(registry)
+    assert current_version(registry) == first["model_version"] and first["coef_dtype"] == "int8"
+    assert first["source_version"] == detector.artifact_version(str(paths["vectorizer"]), str(paths["model"]))
+
+    run("--version", first["model_version"], "--publish", "--no-activate", "--coef-dtype", "float16")
+    second = list_versions(registry)[0]
+    assert second["coef_dtype"] == "float16" and second["source_model_version"] == first["model_version"]
+    assert current_version(registry) == first["model_version"]
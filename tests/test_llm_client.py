@@ -0,0 +1,130 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import detector
+from llm_client import LLMCascade, parse_llm_verdict
+
+
+def fixed_scorer(probs):
+    """score_fn returning the given probabilities for every batch"""
+    probs = np.asarray(probs, dtype=np.float64)
+
+    def score_fn(texts):
+        labels = np.where(probs >= 0.5, "REAL", "FAKE").astype(object)
+        return labels[:len(texts)], probs[:len(texts)]
+    return score_fn
+
+
+def test_parse_llm_verdict_accepts_token_or_bare_first_line():
+    assert parse_llm_verdict("VERDICT: FAKE\nThe claim has no source.") == "FAKE"
+    assert parse_llm_verdict("Reasoning first.\n**Verdict:** real") == "REAL"
+    assert parse_llm_verdict("\n  Real.\nIt cites named officials.") == "REAL"
+    assert parse_llm_verdict("**FAKE**") == "FAKE"
+
+
+def test_parse_llm_verdict_rejects_loose_mentions():
+    assert parse_llm_verdict("It is hard to tell whether this is real or fake.") is None
+    assert parse_llm_verdict("This is not FAKE news.\nProbably REAL.") is None
+    assert parse_llm_verdict("VERDICT: REAL\nVERDICT: FAKE") is None
+    assert parse_llm_verdict("") is None
+    assert parse_llm_verdict(None) is None
+
+
+def test_cascade_marks_where_each_verdict_came_from():
+    answers = {"agree": "REAL", "override": "FAKE", "unsure": None}
+
+    def llm_fn(text, prob):
+        return answers[text], "", "cloud"
+
+    with LLMCascade(fixed_scorer([0.6, 0.6, 0.6, 0.9]), band=(0.35, 0.65), llm_fn=llm_fn) as cascade:
+        labels, probs, sources = cascade.score(["agree", "override", "unsure", "confident"])
+        stats = cascade.stats()["llm"]
+
+    assert list(labels) == ["REAL", "FAKE", "REAL", "REAL"]
+    assert list(sources) == ["llm", "llm_override", "model", "model"]
+    assert list(probs) == [0.6, 0.6, 0.6, 0.9]
+    assert (stats["items"], stats["answered"], stats["failed"], stats["overridden"]) == (3, 2, 1, 1)
+
+
+def test_batch_results_show_the_verdict_source(tmp_path):
+    source = tmp_path / "in.csv"
+    pd.DataFrame({"text": ["a", "b"]}).to_csv(source, index=False)
+    out = tmp_path / "out.csv"
+
+    with LLMCascade(fixed_scorer([0.5, 0.95]), llm_fn=lambda text, prob: ("FAKE", "", "cloud")) as cascade:
+        list(detector.stream_score_csv(str(source), str(out), None, None, score_fn=cascade.score))
+
+    result = pd.read_csv(out)
+    assert list(result["prediction"]) == ["FAKE", "REAL"]
+    assert list(result["confidence"]) == ["50.0%", "95.0%"]
+    assert list(result["verdict_source"]) == ["llm_override", "model"]
+
+
+def test_circuit_breaker_stops_calling_a_failing_llm():
+    calls = []
+
+    def llm_fn(text, prob):
+        calls.append(text)
+        return None, "Request timed out.", "cloud (failed)"
+
+    cascade = LLMCascade(fixed_scorer([0.5] * 10), max_concurrency=1, llm_fn=llm_fn,
+                         breaker_failures=3, breaker_cooldown=60)
+    with cascade:
+        labels, _, sources = cascade.score([str(i) for i in range(10)])
+        stats = cascade.stats()["llm"]
+
+    assert len(calls) == 3
+    assert list(labels) == ["REAL"] * 10
+    assert set(sources) == {"model"}
+    assert (stats["failed"], stats["skipped"], stats["breaker_trips"]) == (3, 7, 1)
+    assert stats["breaker_open"]
+
+
+def test_circuit_breaker_closes_after_cooldown():
+    fail = [True]
+
+    def llm_fn(text, prob):
+        if fail[0]:
+            return None, "", "cloud (failed)"
+        return "FAKE", "VERDICT: FAKE", "cloud"
+
+    with LLMCascade(fixed_scorer([0.5] * 2), max_concurrency=1, llm_fn=llm_fn,
+                    breaker_failures=2, breaker_cooldown=0.0) as cascade:
+        cascade.score(["a", "b"])
+        fail[0] = False
+        labels, _, sources = cascade.score(["a", "b"])
+
+    assert list(labels) == ["FAKE", "FAKE"]
+    assert list(sources) == ["llm_override", "llm_override"]
+
+
+def test_unparseable_answers_do_not_trip_the_breaker():
+    with LLMCascade(fixed_scorer([0.5] * 6), max_concurrency=1, breaker_failures=2,
+                    llm_fn=lambda text, prob: (None, "Hard to say.", "cloud")) as cascade:
+        cascade.score(list("abcdef"))
+        stats = cascade.stats()["llm"]
+    assert (stats["failed"], stats["skipped"], stats["breaker_trips"]) == (6, 0, 0)
+
+
+def test_llm_client_does_not_import_streamlit():
+    code = "import sys, llm_client, batch_score; print('streamlit' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert out.stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("no_chunks", [False, True])
+def test_empty_input_has_the_same_header(tmp_path, monkeypatch, no_chunks):
+    source = tmp_path / "in.csv"
+    source.write_text("text\n")
+    if no_chunks:
+        monkeypatch.setattr(detector.pd, "read_csv", lambda *args, **kwargs: iter([]))
+    out = tmp_path / "out.csv"
+    with LLMCascade(fixed_scorer([]), llm_fn=lambda text, prob: ("FAKE", "", "cloud")) as cascade:
+        list(detector.stream_score_csv(str(source), str(out), None, None, score_fn=cascade.score))
+    assert out.read_text().strip() == "text,prediction,confidence,verdict_source"
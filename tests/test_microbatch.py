@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import detector
+from microbatch import Histogram, MicroBatcher
+
+
+def test_concurrent_requests_are_batched_and_answered_in_order(scorer, sample_texts):
+    gate = threading.Event()
+
+    def score_fn(batch):
+        gate.wait(5)
+        return detector.score_texts(batch, scorer, scorer)
+
+    with MicroBatcher(score_fn, max_batch_size=16, max_wait_ms=50) as batcher:
+        futures = [batcher.submit(text) for text in sample_texts[:40]]
+        gate.set()
+        results = [f.result(5) for f in futures]
+        stats = batcher.stats()
+
+    labels, probs = detector.score_texts(sample_texts[:40], scorer, scorer)
+    assert [label for label, _ in results] == list(labels)
+    assert [prob for _, prob in results] == pytest.approx(list(probs), abs=1e-12)
+    assert stats["batches"] < 40
+    assert stats["batch_size"]["max"] <= 16
+    assert stats["batch_size"]["count"] == stats["batches"]
+
+
+def test_threads_get_their_own_rows(scorer, sample_texts):
+    texts = sample_texts[:60]
+    with MicroBatcher(lambda batch: detector.score_texts(batch, scorer, scorer)) as batcher:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(batcher.score, texts))
+    labels, _ = detector.score_texts(texts, scorer, scorer)
+    assert [label for label, _ in results] == list(labels)
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def boom(batch):
+        raise RuntimeError("model exploded")
+
+    with MicroBatcher(boom, max_wait_ms=20) as batcher:
+        futures = [batcher.submit(str(i)) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="exploded"):
+                future.result(5)
+        assert batcher.stats()["errors"] >= 1
+
+
+def test_histogram_quantiles():
+    hist = Histogram((1, 2, 5, 10))
+    for value in [0.5, 1.5, 1.5, 4, 20]:
+        hist.observe(value)
+    assert hist.quantile(0.5) == 2
+    assert hist.quantile(1.0) == 20
+    snapshot = hist.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["buckets"][-1] == ["+inf", 1]
+    assert Histogram((1,)).quantile(0.5) == 0.0
@@ -0,0 +1,109 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from linear_scorer import save_scorer, quantize
+from model_registry import (HotReloader, publish, set_current, list_versions, current_version, read_pointer,
+                            write_pointer, load_current, load_serving, load_path)
+
+
+def variants(scorer, n):
+    """n scorers with distinct model versions"""
+    return [quantize(scorer, dtype) for dtype in ["float64", "float32", "float16", "int8"][:n]]
+
+
+def test_publish_swaps_current_and_prunes(tmp_path, scorer):
+    registry = str(tmp_path / "registry")
+    versions = [publish(s, registry, keep_versions=2)["model_version"] for s in variants(scorer, 3)]
+    assert len(set(versions)) == 3
+    assert current_version(registry) == versions[-1]
+    assert [m["model_version"] for m in list_versions(registry)] == versions[:0:-1]
+    assert not [name for name in os.listdir(registry) if name.startswith(".")]
+
+    # Rolling back keeps the rolled-back version through pruning
+    set_current(versions[1], registry)
+    publish(variants(scorer, 4)[3], registry, make_current=False, keep_versions=1)
+    assert current_version(registry) == versions[1]
+    assert versions[1] in os.listdir(registry)
+    with pytest.raises(ValueError):
+        set_current(versions[0], registry)
+
+
+def test_republishing_is_a_no_op(tmp_path, scorer):
+    registry = str(tmp_path / "registry")
+    first = publish(scorer, registry)
+    second = publish(scorer, registry)
+    assert first["model_version"] == second["model_version"]
+    assert len(list_versions(registry)) == 1
+    assert list_versions(registry)[0]["published"] == first["published"]
+
+
+def test_load_current_and_explicit_scorer_dir(tmp_path, scorer):
+    registry, export = str(tmp_path / "registry"), str(tmp_path / "export")
+    served, exported = variants(scorer, 2)
+    publish(served, registry)
+    save_scorer(exported, export)
+    missing = str(tmp_path / "missing.pkl")
+
+    loaded, path = load_current(registry, export, missing, missing)
+    assert loaded.model_version == served.model_version and path.startswith(registry)
+    loaded, path = load_serving(registry, export, missing, missing)
+    assert loaded.model_version == exported.model_version and path == export
+    assert load_path(path, missing, missing).model_version == exported.model_version
+
+
+def test_hot_reload_follows_the_pointer(tmp_path, scorer, sample_texts):
+    registry = str(tmp_path / "registry")
+    v1, v2 = variants(scorer, 2)
+    publish(v1, registry)
+    loading = threading.Event()
+
+    def build(s, path):
+        if s.model_version != v1.model_version:
+            loading.wait(10)  # Hold the new version in its background load
+        return s, path
+
+    reloader = HotReloader(registry, build=build, poll_interval=0)
+    assert reloader.version == v1.model_version
+    assert not reloader.poll()
+
+    publish(v2, registry)
+    held, _ = reloader.get()  # Starts the reload; the caller keeps the old version meanwhile
+    assert held.model_version == v1.model_version
+    loading.set()
+    assert reloader.wait(10)
+    new, path = reloader.get()
+    assert new.model_version == v2.model_version and reloader.reloads == 1
+    np.testing.assert_allclose(new.predict_proba(new.transform(sample_texts)),
+                               v2.predict_proba(v2.transform(sample_texts)), atol=1e-12)
+
+    # Rollback is a pointer swap too
+    set_current(v1.model_version, registry)
+    reloader.poll()
+    reloader.wait(10)
+    assert reloader.version == v1.model_version and reloader.reloads == 2
+
+
+def test_dangling_current_falls_back(tmp_path, scorer):
+    registry, export = str(tmp_path / "registry"), str(tmp_path / "export")
+    published, fallback = variants(scorer, 2)
+    publish(published, registry)
+    save_scorer(fallback, export)
+    missing = str(tmp_path / "missing.pkl")
+    write_pointer(registry, "0123456789ab")  # Pruned or removed by hand
+
+    with pytest.raises(FileNotFoundError):
+        load_current(registry, export, missing, missing)
+    reloader = HotReloader(registry, poll_interval=0, scorer_dir=export, vector_path=missing, model_path=missing)
+    assert reloader.version == fallback.model_version
+    assert "0123456789ab" in reloader.last_error
+
+    # Fixing the pointer recovers without a restart
+    set_current(published.model_version, registry)
+    reloader.poll()
+    reloader.wait(10)
+    assert reloader.version == published.model_version
+    assert reloader.last_error is None
+    assert read_pointer(registry) == published.model_version
@@ -0,0 +1,41 @@
+import json
+
+from model_search import SEARCH_SPACE, pareto_front, run_search, sample_configs, save_leaderboard
+
+
+def test_sample_configs_grid_and_subset():
+    grid = sample_configs(SEARCH_SPACE)
+    assert len(grid) == 4 * 2 * 5
+    subset = sample_configs(SEARCH_SPACE, n_iter=6, seed=1)
+    assert len(subset) == 6
+    assert subset == sample_configs(SEARCH_SPACE, n_iter=6, seed=1)
+    assert all(cfg in grid for cfg in subset)
+    assert len(sample_configs(SEARCH_SPACE, n_iter=1000)) == len(grid)
+
+
+def test_pareto_front_marks_undominated_rows():
+    rows = pareto_front([
+        {"accuracy": 0.90, "latency_us": 50.0},
+        {"accuracy": 0.85, "latency_us": 20.0},
+        {"accuracy": 0.85, "latency_us": 30.0},  # Dominated by the row above
+        {"accuracy": 0.80, "latency_us": 60.0},  # Dominated by both the first two
+        {"accuracy": 0.90, "latency_us": 50.0},  # Tie with the first: neither beats the other
+    ])
+    assert [r["pareto"] for r in rows] == [True, True, False, False, True]
+
+
+def test_run_search_cross_validates_every_config(tmp_path, demo_data):
+    texts, labels = demo_data
+    space = {"max_features": [200], "ngram_range": [(1, 1), (1, 2)], "C": [0.5, 2.0]}
+    rows = run_search(texts, labels, sample_configs(space), folds=2, workers=2)
+
+    assert len(rows) == 4
+    assert {(r["ngram_range"][1], r["C"]) for r in rows} == {(1, 0.5), (1, 2.0), (2, 0.5), (2, 2.0)}
+    assert all(0.0 <= r["accuracy"] <= 1.0 and r["latency_us"] > 0 for r in rows)
+    assert [(-r["accuracy"], r["latency_us"]) for r in rows] == sorted((-r["accuracy"], r["latency_us"]) for r in rows)
+    assert any(r["pareto"] for r in rows)
+
+    path = tmp_path / "leaderboard.json"
+    save_leaderboard(rows, str(path), {"folds": 2})
+    saved = json.loads(path.read_text())
+    assert saved["folds"] == 2 and saved["results"] == rows
@@ -0,0 +1,167 @@
+import os
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from model_registry import current_version, load_current, publish, read_pointer
+from online_learning import (OnlineLearner, MAX_UPDATE_WEIGHT, ONLINE_LEARNING_RATE, claim_version,
+                             feedback_hash, feedback_log_files, promote, read_feedback_hashes, version_name)
+
+REAL_TEXT = ("Scientists at MIT announce breakthrough in battery technology according to research "
+             "published in Nature Energy.")
+
+
+def log_odds(p):
+    return float(np.log(p / (1 - p)))
+
+
+def max_shift(weight):
+    # Weight times the step on the coefficients (|x| = 1) plus the small intercept step
+    return weight * ONLINE_LEARNING_RATE * 1.05
+
+
+@pytest.fixture
+def learner_factory(tmp_path):
+    learners = []
+
+    def make(**kwargs):
+        kwargs.setdefault("feedback_log", str(tmp_path / "feedback.jsonl"))
+        learner = OnlineLearner(str(tmp_path / "online"), update_events=10 ** 6, update_interval=60, **kwargs)
+        learners.append(learner)
+        return learner
+
+    yield make
+    for learner in learners:
+        learner.close()
+
+
+def test_only_explicit_labels_are_accepted(learner_factory):
+    learner = learner_factory()
+    with pytest.raises(ValueError):
+        learner.submit(REAL_TEXT, "FAKE", source="accuracy_challenge")
+    assert not learner.submit("   ", "FAKE")
+    assert learner.submit(REAL_TEXT, "FAKE")
+
+
+def test_repeated_corrections_count_once(learner_factory):
+    learner = learner_factory()
+    before = learner.predict([REAL_TEXT])[1][0]
+    accepted = [learner.submit(REAL_TEXT if i % 2 else REAL_TEXT.upper() + "!!", "FAKE") for i in range(40)]
+    assert sum(accepted) == 1
+    assert learner.flush(10)
+    s = learner.stats()
+    assert s["applied"] == 1 and s["duplicates"] == 39
+    after = learner.predict([REAL_TEXT])[1][0]
+    assert 0 < log_odds(before) - log_odds(after) <= max_shift(1.0)
+
+
+def test_duplicates_are_remembered_across_restarts(learner_factory, tmp_path):
+    first = learner_factory()
+    first.submit(REAL_TEXT, "FAKE")
+    first.close()
+    with open(tmp_path / "feedback.jsonl") as f:
+        assert json.loads(f.readline())["text_sha1"] == feedback_hash(REAL_TEXT)
+    second = learner_factory()
+    assert not second.submit(REAL_TEXT, "REAL")
+    assert second.duplicates == 1
+
+
+def test_sessions_are_rate_limited(learner_factory):
+    learner = learner_factory(max_per_session=3)
+    accepted = [learner.submit(f"headline number {i}", "FAKE", session="a") for i in range(5)]
+    assert accepted == [True, True, True, False, False]
+    assert learner.submit("another headline", "FAKE", session="b")
+    assert learner.rate_limited == 2
+
+
+def test_update_weight_is_capped(learner_factory, tmp_path):
+    learner = learner_factory()
+    before = learner.predict([REAL_TEXT])[1][0]
+    for i in range(40):
+        learner.submit(f"{REAL_TEXT} variant {i}", "FAKE")
+    learner.flush(10)
+    after = learner.predict([REAL_TEXT])[1][0]
+    assert log_odds(before) - log_odds(after) <= max_shift(MAX_UPDATE_WEIGHT)
+    with open(tmp_path / "online" / version_name(learner.version) / "meta.json") as f:
+        meta = json.load(f)
+    assert meta["events"] == 40 and meta["sample_weight"] == pytest.approx(MAX_UPDATE_WEIGHT / 40)
+
+
+def test_version_claims_are_unique_across_threads(tmp_path):
+    claimed = []
+    lock = threading.Lock()
+
+    def claim():
+        for _ in range(25):
+            v = claim_version(str(tmp_path))
+            with lock:
+                claimed.append(v)
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == list(range(1, 101))
+
+
+def test_two_learners_share_a_directory(learner_factory, tmp_path):
+    a = learner_factory()
+    b = learner_factory()
+    assert a.version == b.version  # b starts from the version a published
+
+    a.submit("first correction text", "FAKE")
+    a.flush(10)
+    b.submit("second correction text", "REAL")
+    b.flush(10)
+    # b built on a's update instead of overwriting it, and CURRENT only moved forward
+    assert b.version > a.version
+    assert read_pointer(str(tmp_path / "online")) == version_name(b.version)
+    with open(tmp_path / "online" / version_name(b.version) / "meta.json") as f:
+        assert json.load(f)["base_version"] == a.version
+
+    a.submit("third correction text", "FAKE")
+    a.flush(10)
+    assert a.version > b.version
+    assert read_pointer(str(tmp_path / "online")) == version_name(a.version)
+    published = [d for d in os.listdir(tmp_path / "online") if d.startswith("v")]
+    assert len(published) == len(set(published))
+
+
+def test_feedback_log_is_rotated_and_bounded(learner_factory, tmp_path):
+    log = str(tmp_path / "feedback.jsonl")
+    learner = learner_factory(feedback_max_bytes=600, feedback_backup_count=2)
+    for i in range(12):
+        learner.submit(f"{REAL_TEXT} batch {i}", "FAKE")
+        learner.flush(10)
+    learner.close()
+
+    files = feedback_log_files(log)
+    assert len(files) == 3 and files[-1] == log  # Two archives plus the live file
+    assert all(os.path.getsize(f) <= 600 for f in files)
+    remembered = read_feedback_hashes(log)
+    assert feedback_hash(f"{REAL_TEXT} batch 11") in remembered
+    assert feedback_hash(f"{REAL_TEXT} batch 0") not in remembered
+
+
+def test_promotion_publishes_corrections_to_the_registry(learner_factory, tmp_path, scorer):
+    registry = str(tmp_path / "registry")
+    base = publish(scorer, registry)["model_version"]
+    learner = learner_factory()
+    learner.submit(REAL_TEXT, "FAKE")
+    learner.close()
+
+    staged = promote(registry, str(tmp_path / "feedback.jsonl"), make_current=False)
+    assert current_version(registry) == base  # Published, but only an explicit promotion serves it
+    result = promote(registry, str(tmp_path / "feedback.jsonl"))
+    assert result["model_version"] == staged["model_version"] != base
+    assert current_version(registry) == result["model_version"] and result["events"] == 1
+
+    served, _ = load_current(registry)
+    before = scorer.predict_proba(scorer.transform([REAL_TEXT]))[0, 1]
+    after = served.predict_proba(served.transform([REAL_TEXT]))[0, 1]
+    assert 0 < log_odds(before) - log_odds(after) <= 2 * max_shift(1.0)
+    # Each correction is promoted once
+    assert promote(registry, str(tmp_path / "feedback.jsonl")) is None
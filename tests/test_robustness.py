@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import detector
+from robustness import perturb, robustness_level, robustness_reports, robustness_report
+
+
+def test_perturbations_are_distinct_deterministic_and_bounded():
+    text = "Shocking: scientists discovered a secret miracle cure!!!"
+    variants = perturb(text, n=50, seed=3)
+    assert len(variants) == 50
+    assert len({p for _, p in variants}) == 50
+    assert text not in {p for _, p in variants}
+    assert variants == perturb(text, n=50, seed=3)
+    kinds = {kind for kind, _ in variants}
+    assert {"casing", "punctuation", "synonym", "dropout"} <= kinds
+    assert perturb("", n=10) == []
+
+
+def test_batched_reports_match_scoring_each_text(scorer, sample_texts):
+    texts = sample_texts[:6]
+    reports = robustness_reports(texts, scorer, scorer, n_perturbations=30)
+    for i, (text, report) in enumerate(zip(texts, reports)):
+        variants = [p for _, p in perturb(text, 30, seed=i)]
+        _, probs = detector.score_texts([text] + variants, scorer, scorer)
+        shifts = probs[1:] - probs[0]
+        assert report["score"] == pytest.approx(probs[0])
+        assert report["adversarial_score"] == pytest.approx(float(np.max(np.abs(shifts))))
+        assert report["bias_index"] == pytest.approx(float(np.mean(shifts)))
+        assert report["level"] == robustness_level(report["adversarial_score"])
+
+
+def test_levels_and_single_report(scorer):
+    assert [robustness_level(s) for s in (0.0, 0.1, 0.29, 0.3, 0.9)] == ["LOW", "MODERATE", "MODERATE", "HIGH", "HIGH"]
+    report = robustness_report("!!!", scorer, scorer, n_perturbations=5)
+    assert report["text"] == "!!!"
+    assert 0.0 <= report["confidence_weight"] <= 1.0
+
+
+def test_reports_are_scored_in_bounded_batches(monkeypatch, scorer, sample_texts):
+    texts = sample_texts[:12]
+    expected = robustness_reports(texts, scorer, scorer, n_perturbations=20)
+
+    sizes = []
+    score_texts = detector.score_texts
+
+    def spy(batch, vectorizer, model):
+        sizes.append(len(batch))
+        return score_texts(batch, vectorizer, model)
+    monkeypatch.setattr(detector, "score_texts", spy)
+    batched = robustness_reports(texts, scorer, scorer, n_perturbations=20, batch_rows=50)
+
+    assert len(sizes) > 1 and max(sizes) <= 50
+    assert batched == expected
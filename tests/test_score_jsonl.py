@@ -0,0 +1,75 @@
+import io
+import json
+import sys
+
+import pytest
+
+import detector
+import score_jsonl
+from linear_scorer import save_scorer
+
+
+def write_input(path, texts):
+    lines = [json.dumps({"id": i, "text": t}) for i, t in enumerate(texts)]
+    lines[3] = "not json"
+    lines[5] = ""
+    lines[7] = json.dumps("a bare string line")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_score_stream_keeps_lines_and_fields(scorer, sample_texts):
+    lines = [json.dumps({"id": 1, "text": sample_texts[0]}), "", "[1, 2]", json.dumps({"id": 2, "body": "x"}),
+             json.dumps(sample_texts[1])]
+    out = io.StringIO()
+    stats = score_jsonl.score_stream(lines, out, lambda t: detector.score_texts(t, scorer, scorer), "v1",
+                                     chunk_size=2)
+    verdicts = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert [v["line"] for v in verdicts] == [1, 3, 4, 5]
+    assert verdicts[0]["id"] == 1 and verdicts[0]["model_version"] == "v1"
+    assert "error" in verdicts[1] and "'text'" in verdicts[2]["error"]
+    assert "prediction" in verdicts[3]
+    assert (stats["lines"], stats["scored"], stats["errors"], stats["skipped"]) == (5, 2, 2, 1)
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["score_jsonl.py", *map(str, args)])
+    score_jsonl.main()
+
+
+def test_resume_after_interruption_matches_a_clean_run(tmp_path, monkeypatch, scorer, sample_texts):
+    scorer_dir = tmp_path / "scorer"
+    save_scorer(scorer, str(scorer_dir))
+    source = tmp_path / "in.jsonl"
+    write_input(source, sample_texts[:25])
+    common = ["--scorer-dir", scorer_dir, "--chunk-size", 10]
+
+    clean = tmp_path / "clean.jsonl"
+    run_cli(monkeypatch, source, "-o", clean, *common)
+
+    # Interrupt during the second chunk
+    out = tmp_path / "out.jsonl"
+    real_score_texts = detector.score_texts
+    calls = []
+
+    def flaky(texts, vectorizer, model):
+        calls.append(len(texts))
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return real_score_texts(texts, vectorizer, model)
+
+    with monkeypatch.context() as m:
+        m.setattr(detector, "score_texts", flaky)
+        with pytest.raises(SystemExit) as exit_info:
+            run_cli(m, source, "-o", out, *common)
+    assert exit_info.value.code == 130
+    checkpoint = json.loads((tmp_path / "out.jsonl.ckpt").read_text())
+    assert checkpoint["line"] == 10
+
+    # A partially written chunk after the checkpoint is dropped on resume
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"line": 11, "partial": tr')
+    run_cli(monkeypatch, source, "-o", out, "--resume", *common)
+
+    assert out.read_text(encoding="utf-8") == clean.read_text(encoding="utf-8")
+    assert not (tmp_path / "out.jsonl.ckpt").exists()
@@ -0,0 +1,70 @@
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import service
+
+
+@pytest.fixture(scope="module")
+def server(scorer):
+    service.init_state(scorer)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), service.ScoringHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+    service._state["batcher"].close()
+
+
+def post(address, path, body, content_length=None):
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    data = json.dumps(body).encode("utf-8")
+    conn.putrequest("POST", path)
+    conn.putheader("Content-Type", "application/json")
+    conn.putheader("Content-Length", str(len(data)) if content_length is None else content_length)
+    conn.endheaders()
+    if content_length is None:
+        conn.send(data)
+    response = conn.getresponse()
+    payload = json.loads(response.read() or b"{}")
+    conn.close()
+    return response.status, payload
+
+
+def test_score_and_batch_agree(server, scorer):
+    status, single = post(server, "/score", {"text": "Shocking miracle cure!!!"})
+    assert status == 200
+    status, batch = post(server, "/score/batch", {"texts": ["Shocking miracle cure!!!"]})
+    assert status == 200
+    assert batch["results"][0]["prediction"] == single["prediction"]
+    assert abs(batch["results"][0]["probability"] - single["probability"]) < 1e-12
+    assert single["model_version"] == scorer.model_version
+
+
+def test_explain_returns_reasons(server):
+    status, payload = post(server, "/score", {"text": "Unbelievable secret exposed", "explain": True})
+    assert status == 200
+    assert payload["explanation"]["reasons"]
+
+
+@pytest.mark.parametrize("value", ["abc", "-5", "1e3", "+7"])
+def test_invalid_content_length_is_rejected(server, value):
+    status, payload = post(server, "/score", {}, content_length=value)
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+def test_oversized_body_is_rejected(server):
+    status, payload = post(server, "/score", {}, content_length=str(service.MAX_BODY_BYTES + 1))
+    assert status == 413
+
+
+def test_bad_payloads(server):
+    assert post(server, "/score", {"text": 3})[0] == 400
+    assert post(server, "/score/batch", {"texts": "nope"})[0] == 400
+    assert post(server, "/missing", {})[0] == 404
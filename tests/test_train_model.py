@@ -0,0 +1,38 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import train_model
+
+
+def synthetic_csv(path, n=300):
+    """Sorted (all fake, then all real) CSV with separable vocabularies"""
+    rng = np.random.default_rng(0)
+    fake = ["shocking", "miracle", "secret", "exposed", "unbelievable", "hoax"]
+    real = ["officials", "report", "quarterly", "committee", "announced", "budget"]
+    rows = [(" ".join(rng.choice(fake, 5)) + f" item{i}", 0) for i in range(n)]
+    rows += [(" ".join(rng.choice(real, 5)) + f" item{i}", 1) for i in range(n)]
+    pd.DataFrame(rows, columns=["text", "label"]).to_csv(path, index=False)
+
+
+def test_holdout_mask_is_stable_per_text():
+    texts = [f"headline {i}" for i in range(2000)]
+    mask = train_model.holdout_mask(texts, 0.1)
+    assert np.array_equal(mask, train_model.holdout_mask(list(texts), 0.1))
+    assert 0.05 < mask.mean() < 0.15
+    assert train_model.holdout_mask(["same", "same"], 0.5).tolist() in ([True, True], [False, False])
+
+
+def test_streaming_training_learns_from_sorted_chunks(tmp_path):
+    data = tmp_path / "train.csv"
+    synthetic_csv(data)
+    out_dir = tmp_path / "streaming"
+    train_model.train_streaming(str(data), passes=2, chunk_size=64, n_features=2 ** 12, out_dir=str(out_dir))
+
+    with open(out_dir / "fake_news_model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(out_dir / "vectorizer.pkl", "rb") as f:
+        vectorizer = pickle.load(f)
+    probs = model.predict_proba(vectorizer.transform(["shocking secret hoax exposed", "committee budget report"]))
+    assert probs[0, 1] < 0.5 < probs[1, 1]
@@ -1,22 +1,44 @@
 #!/usr/bin/env python3
 """
 Train the Fake News Detection model (TF-IDF + Logistic Regression).
-Creates models/fake_news_model.pkl and models/vectorizer.pkl.
+Creates models/fake_news_model.pkl and models/vectorizer.pkl, and
+publishes the serving scorer to the model registry (models/registry/),
+where a running app picks it up without a restart.
+
+--stream trains out of core instead: the CSV is read in chunks, features
+come from a stateless HashingVectorizer and an SGD logistic regression is
+updated with partial_fit, so the corpus never has to fit in memory.
+Streamed models are saved to models/streaming/.
 
 Usage:
   python train_model.py                    # Use built-in demo data
   python train_model.py --data path.csv    # Use your own CSV (text, label columns)
+  python train_model.py --no-activate      # Publish without switching the served version
+                                           # (implied below MIN_ACTIVATE_ROWS rows after dedup)
+  python train_model.py --max-features 2000000 --compact-vocab   # Large vocabulary, compact serving artifact
+  python train_model.py --data big.csv --stream --passes 3      # Out-of-core training on a multi-GB CSV
+  python train_model.py --data path.csv --search --search-iter 12   # Cross-validated hyperparameter search
 """
 
 import os
 import sys
+import time
+import zlib
 import pickle
 import argparse
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.metrics import accuracy_score, classification_report, log_loss
+
+from linear_scorer import LinearScorer
+from model_registry import REGISTRY_DIR, publish
+from model_search import (SEARCH_SPACE, CV_FOLDS, SEARCH_LEADERBOARD, sample_configs, run_search,
+                          save_leaderboard, print_leaderboard)
+from dedup import NEAR_DUP_THRESHOLD, dedupe_frame
+from feature_cache import FEATURE_CACHE_DIR, cache_key, file_digest, texts_digest, load_features, save_features
 
 # Built-in demo data (minimal but sufficient for a working model)
 DEMO_FAKE = [
@@ -53,9 +75,16 @@ def get_demo_data():
     return pd.concat([fake_df, real_df], ignore_index=True)
 
 
-def load_csv(path):
-    """Load CSV with 'text' and 'label' columns (label: 0=fake, 1=real)."""
-    df = pd.read_csv(path)
+STREAM_CHUNK_SIZE = 50000
+HASH_FEATURES = 2 ** 20
+HOLDOUT_FRACTION = 0.05
+STREAMING_MODEL_DIR = os.path.join("models", "streaming")
+MAX_HOLDOUT_ROWS = 50000
+MIN_ACTIVATE_ROWS = 200  # Smaller (e.g. deduplicated demo) datasets are published but not served
+
+
+def normalize_columns(df):
+    """Rename text/label columns to the standard names and map labels to 0/1."""
     if "text" not in df.columns:
         # Try common alternatives
         for col in ["title", "content", "article", "news"]:
@@ -77,13 +106,60 @@ def load_csv(path):
     return df[["text", "label"]].dropna()
 
 
-def train_and_save(data_path=None):
-    if data_path and os.path.exists(data_path):
+def load_csv(path):
+    """Load CSV with 'text' and 'label' columns (label: 0=fake, 1=real)."""
+    return normalize_columns(pd.read_csv(path))
+
+
+def iter_csv_chunks(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield normalized DataFrames of at most chunk_size rows."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        yield normalize_columns(chunk)
+
+
+def remove_duplicates(df, dedup=True, threshold=NEAR_DUP_THRESHOLD):
+    """Drop exact and near-duplicate texts before splitting, so copies can't leak into the test set."""
+    if not dedup:
+        return df
+    df, stats = dedupe_frame(df, threshold)
+    removed = stats["exact_duplicates"] + stats["near_duplicates"]
+    print(f"Dedup: removed {removed} of {stats['rows']} rows ({stats['exact_duplicates']} exact, "
+          f"{stats['near_duplicates']} near) in {stats['seconds']:.2f}s")
+    return df
+
+
+def vectorize_dataset(data_path=None, max_features=10000, use_cache=True, cache_dir=FEATURE_CACHE_DIR,
+                      ngram_max=2, dedup=True, dedup_threshold=NEAR_DUP_THRESHOLD):
+    """
+    Split and vectorize the dataset.
+    Returns (vectorizer, X_train_vec, X_test_vec, y_train, y_test); served
+    from the feature cache when the dataset and settings are unchanged.
+    """
+    vectorizer_params = {"max_features": max_features, "stop_words": "english", "ngram_range": (1, ngram_max)}
+    split_params = {"test_size": 0.2, "random_state": 42, "stratify": True,
+                    "dedup": dedup_threshold if dedup else None}
+
+    use_file = bool(data_path and os.path.exists(data_path))
+    key = None
+    if use_cache:
+        if use_file:
+            digest = file_digest(data_path)
+        else:
+            demo = get_demo_data()
+            digest = texts_digest(demo["text"], demo["label"])
+        key = cache_key(digest, vectorizer_params, split_params)
+        cached = load_features(key, vectorizer_params, cache_dir)
+        if cached is not None:
+            print(f"Feature cache hit ({key}): skipping vectorization")
+            return cached
+
+    if use_file:
         print(f"Loading data from {data_path}...")
         df = load_csv(data_path)
     else:
         print("Using built-in demo data...")
         df = get_demo_data()
+    df = remove_duplicates(df, dedup, dedup_threshold)
 
     print(f"Dataset: {len(df)} samples ({df['label'].sum()} real, {len(df) - df['label'].sum()} fake)")
 
@@ -91,16 +167,36 @@ def train_and_save(data_path=None):
     y = df["label"]
 
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+        X, y, test_size=split_params["test_size"], random_state=split_params["random_state"], stratify=y
     )
 
     print("Training TF-IDF vectorizer...")
-    vectorizer = TfidfVectorizer(max_features=10000, stop_words="english", ngram_range=(1, 2))
+    vectorizer = TfidfVectorizer(**vectorizer_params)
     X_train_vec = vectorizer.fit_transform(X_train)
     X_test_vec = vectorizer.transform(X_test)
+    y_train, y_test = y_train.to_numpy(), y_test.to_numpy()
+
+    if use_cache:
+        save_features(key, vectorizer, X_train_vec, X_test_vec, y_train, y_test, cache_dir)
+        print(f"Feature cache saved ({key})")
+    return vectorizer, X_train_vec, X_test_vec, y_train, y_test
+
+
+def train_and_save(data_path=None, max_features=10000, compact_vocab=False, C=1.0, max_iter=1000,
+                   use_cache=True, ngram_max=2, dedup=True, dedup_threshold=NEAR_DUP_THRESHOLD, activate=True):
+    start = time.time()
+    vectorizer, X_train_vec, X_test_vec, y_train, y_test = vectorize_dataset(
+        data_path, max_features, use_cache, ngram_max=ngram_max, dedup=dedup, dedup_threshold=dedup_threshold
+    )
+    print(f"Features ready in {time.time() - start:.2f}s ({X_train_vec.shape[0]} train, {X_test_vec.shape[0]} test)")
+    rows = X_train_vec.shape[0] + X_test_vec.shape[0]
+    if activate and rows < MIN_ACTIVATE_ROWS:
+        print(f"WARNING: only {rows} training rows (minimum {MIN_ACTIVATE_ROWS} to serve); "
+              f"the model will be published without becoming current")
+        activate = False
 
     print("Training Logistic Regression...")
-    model = LogisticRegression(max_iter=1000, random_state=42, C=1.0)
+    model = LogisticRegression(max_iter=max_iter, random_state=42, C=C)
     model.fit(X_train_vec, y_train)
 
     y_pred = model.predict(X_test_vec)
@@ -112,6 +208,124 @@ def train_and_save(data_path=None):
     model_path = "models/fake_news_model.pkl"
     vec_path = "models/vectorizer.pkl"
 
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    with open(vec_path, "wb") as f:
+        pickle.dump(vectorizer, f)
+
+    # Pickle-free, memory-mappable copy for serving
+    manifest = publish(LinearScorer.from_sklearn(vectorizer, model), REGISTRY_DIR, compact_vocab,
+                       meta={"test_accuracy": acc, "training_rows": rows}, make_current=activate)
+
+    print(f"\nSaved: {model_path}")
+    print(f"Saved: {vec_path}")
+    print(f"Published: {REGISTRY_DIR}/{manifest['model_version']}/"
+          f"{' (now current)' if activate else ' (activate with: python model_registry.py use ' + manifest['model_version'] + ')'}")
+    if activate:
+        print("You can now run: streamlit run app.py (a running app switches to this model on its own)")
+
+
+def search(data_path=None, n_iter=None, folds=CV_FOLDS, workers=None, out_path=SEARCH_LEADERBOARD,
+           dedup=True, dedup_threshold=NEAR_DUP_THRESHOLD):
+    if data_path and os.path.exists(data_path):
+        print(f"Loading data from {data_path}...")
+        df = load_csv(data_path)
+    else:
+        print("Using built-in demo data...")
+        df = get_demo_data()
+    df = remove_duplicates(df, dedup, dedup_threshold)
+
+    configs = sample_configs(SEARCH_SPACE, n_iter)
+    n_vec = len({(c["max_features"], tuple(c["ngram_range"])) for c in configs})
+    print(f"Searching {len(configs)} configurations ({n_vec} vectorizer settings x {folds} folds)...")
+
+    start = time.time()
+    rows = run_search(df["text"].fillna("").astype(str).tolist(), df["label"].tolist(),
+                      configs, folds, workers)
+    save_leaderboard(rows, out_path, {
+        "dataset": data_path or "demo", "samples": len(df), "folds": folds,
+        "searched": time.strftime("%Y-%m-%d %H:%M:%S"), "seconds": round(time.time() - start, 2),
+    })
+    print_leaderboard(rows)
+    print(f"\nSearch took {time.time() - start:.1f}s • Saved: {out_path}")
+    best = rows[0]
+    print(f"Train the best with: python train_model.py --max-features {best['max_features']} "
+          f"--ngram-max {best['ngram_range'][1]} --C {best['C']:g}")
+
+
+def holdout_mask(texts, fraction=HOLDOUT_FRACTION):
+    """Stable per-text holdout assignment, so every pass (and duplicate) lands on the same side."""
+    cutoff = int(fraction * 10000)
+    return np.fromiter((zlib.crc32(t.encode("utf-8")) % 10000 < cutoff for t in texts),
+                       dtype=bool, count=len(texts))
+
+
+def streaming_components(n_features=HASH_FEATURES):
+    """Hashed vectorizer + SGD classifier shared by --stream training and online updates"""
+    # Stateless features: no vocabulary to fit, so chunks can be transformed independently
+    vectorizer = HashingVectorizer(n_features=n_features, stop_words="english", ngram_range=(1, 2),
+                                   alternate_sign=False, norm="l2")
+    model = SGDClassifier(loss="log_loss", alpha=1e-6, random_state=42)
+    return vectorizer, model
+
+
+def train_streaming(data_path=None, passes=3, chunk_size=STREAM_CHUNK_SIZE, n_features=HASH_FEATURES,
+                    holdout_fraction=HOLDOUT_FRACTION, out_dir=STREAMING_MODEL_DIR):
+    if data_path and os.path.exists(data_path):
+        print(f"Streaming data from {data_path} in chunks of {chunk_size}...")
+        chunks = lambda: iter_csv_chunks(data_path, chunk_size)
+    else:
+        print("Using built-in demo data...")
+        demo = get_demo_data()
+        chunks = lambda: (demo.iloc[i:i + chunk_size] for i in range(0, len(demo), chunk_size))
+
+    vectorizer, model = streaming_components(n_features)
+    rng = np.random.default_rng(42)
+    holdout_texts, holdout_labels = [], []
+
+    for epoch in range(1, passes + 1):
+        start = time.time()
+        rows = 0
+        for chunk in chunks():
+            texts = chunk["text"].astype(str).tolist()
+            labels = chunk["label"].to_numpy()
+            held = holdout_mask(texts, holdout_fraction)
+            if epoch == 1:
+                for i in np.flatnonzero(held)[:MAX_HOLDOUT_ROWS - len(holdout_texts)]:
+                    holdout_texts.append(texts[i])
+                    holdout_labels.append(labels[i])
+
+            train_idx = np.flatnonzero(~held)
+            if len(train_idx) == 0:
+                continue
+            # Sorted corpora (all fake, then all real) would stall SGD without a shuffle
+            train_idx = rng.permutation(train_idx)
+            X_chunk = vectorizer.transform([texts[i] for i in train_idx])
+            model.partial_fit(X_chunk, labels[train_idx], classes=[0, 1])
+
+            rows += len(texts)
+            elapsed = time.time() - start
+            print(f"  Pass {epoch}: {rows:,} rows • {rows / max(elapsed, 1e-9):,.0f} rows/s", end="\r")
+
+        if not hasattr(model, "coef_"):
+            raise ValueError("No training rows found.")
+        if holdout_texts:
+            X_hold = vectorizer.transform(holdout_texts)
+            probs = model.predict_proba(X_hold)[:, 1]
+            acc = accuracy_score(holdout_labels, (probs >= 0.5).astype(int))
+            loss = log_loss(holdout_labels, probs, labels=[0, 1])
+            print(f"Pass {epoch}/{passes}: {rows:,} rows in {time.time() - start:.1f}s • "
+                  f"holdout accuracy {acc:.2%} • log loss {loss:.4f} ({len(holdout_texts)} rows)")
+        else:
+            print(f"Pass {epoch}/{passes}: {rows:,} rows in {time.time() - start:.1f}s • no holdout rows")
+
+    if holdout_texts:
+        y_pred = model.predict(vectorizer.transform(holdout_texts))
+        print(classification_report(holdout_labels, y_pred, labels=[0, 1], target_names=["Fake", "Real"]))
+
+    os.makedirs(out_dir, exist_ok=True)
+    model_path = os.path.join(out_dir, "fake_news_model.pkl")
+    vec_path = os.path.join(out_dir, "vectorizer.pkl")
     with open(model_path, "wb") as f:
         pickle.dump(model, f)
     with open(vec_path, "wb") as f:
@@ -119,11 +333,43 @@ def train_and_save(data_path=None):
 
     print(f"\nSaved: {model_path}")
     print(f"Saved: {vec_path}")
-    print("You can now run: streamlit run App.py")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", "-d", help="Path to CSV (columns: text, label)")
+    parser.add_argument("--max-features", type=int, default=10000, help="TF-IDF vocabulary size")
+    parser.add_argument("--compact-vocab", action="store_true",
+                        help="Store the serving vocabulary as hash-table arrays (for very large vocabularies)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Out-of-core training: chunked CSV, hashed features, partial_fit")
+    parser.add_argument("--passes", type=int, default=3, help="Passes over the data with --stream")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="CSV rows per chunk with --stream")
+    parser.add_argument("--hash-features", type=int, default=HASH_FEATURES, help="Hashed feature space with --stream")
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse regularization strength")
+    parser.add_argument("--max-iter", type=int, default=1000, help="Logistic Regression iterations")
+    parser.add_argument("--ngram-max", type=int, default=2, choices=[1, 2], help="Largest n-gram size")
+    parser.add_argument("--search", action="store_true",
+                        help="Cross-validated search over vectorizer and classifier settings")
+    parser.add_argument("--search-iter", type=int, default=None,
+                        help="Random configurations to try with --search (default: full grid)")
+    parser.add_argument("--cv", type=int, default=CV_FOLDS, help="Cross-validation folds with --search")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Worker processes with --search")
+    parser.add_argument("--no-dedup", action="store_true", help="Keep duplicate texts")
+    parser.add_argument("--dedup-threshold", type=float, default=NEAR_DUP_THRESHOLD,
+                        help="Jaccard similarity above which texts count as near duplicates")
+    parser.add_argument("--no-activate", action="store_true",
+                        help="Publish the model to the registry without making it the served version")
+    parser.add_argument("--no-feature-cache", action="store_true",
+                        help="Always re-vectorize instead of reusing cached feature matrices")
     args = parser.parse_args()
-    train_and_save(args.data)
+    if args.search:
+        search(args.data, args.search_iter, args.cv, args.workers,
+               dedup=not args.no_dedup, dedup_threshold=args.dedup_threshold)
+    elif args.stream:
+        train_streaming(args.data, args.passes, args.chunk_size, args.hash_features)
+    else:
+        train_and_save(args.data, args.max_features, args.compact_vocab, args.C, args.max_iter,
+                       use_cache=not args.no_feature_cache, ngram_max=args.ngram_max,
+                       dedup=not args.no_dedup, dedup_threshold=args.dedup_threshold,
+                       activate=not args.no_activate)